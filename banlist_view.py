@@ -0,0 +1,185 @@
+"""
+Banlist rendering for ReNeBan plugin
+Paginated /banlist pages rendered from the cache snapshot, with an LRU page cache
+"""
+
+import threading
+import time as time_module
+from collections import OrderedDict
+
+from . import strings, time_utils
+from .datafile_manager import DatafileManager
+from .user_manager import BaseDataModel, BaseModelList, EMPTY_USER_LIST
+
+# 分页的数据名 -> (标题文案, 无记录文案, 是否按会话取数据)
+SCOPES: dict[str, tuple[str, str, bool]] = {
+    "ban": ("group_banned_list", "no_group_banned", True),
+    "banall": ("global_banned_list", "no_global_banned", False),
+    "pass": ("group_passed_list", "no_group_passed", True),
+    "passall": ("global_passed_list", "no_global_passed", False),
+    "umoban": ("umo_banned_list", "no_umo_banned", False),
+    "umopass": ("umo_passed_list", "no_umo_passed", False),
+}
+
+# 页缓存按分钟分桶，剩余时间的显示最多滞后 1 分钟
+_CACHE_BUCKET_SECONDS = 60
+
+
+class PageOutOfRangeError(IndexError):
+    """
+    页码超出范围错误
+    """
+
+    def __init__(self, pages: int):
+        self.pages = pages
+        super().__init__(f"page out of range (total {pages})")
+
+
+def split_chunks(text: str, limit: int) -> list[str]:
+    """
+    按行将文本拆分为长度不超过 limit 的若干段（单行超长时按 limit 硬切）
+    """
+    if limit <= 0 or len(text) <= limit:
+        return [text]
+    chunks: list[str] = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if not current:
+            current = line
+        elif len(current) + 1 + len(line) <= limit:
+            current += "\n" + line
+        else:
+            chunks.append(current)
+            current = line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class BanlistRenderer:
+    """
+    名单渲染器
+
+    直接读取 DatafileManager 的缓存快照（不触发同步与写盘），每次只格式化一页的记录，
+    渲染结果按 (UMO, 数据名, 页码, 数据代数) 缓存在 LRU 表中，数据变更后代数递增，旧页自然失效。
+    """
+
+    def __init__(
+        self,
+        data_manager: DatafileManager,
+        page_size: int = 20,
+        chunk_chars: int = 2000,
+        max_cached_pages: int = 64,
+    ):
+        """
+        初始化名单渲染器
+
+        Args:
+            data_manager: 数据文件管理器
+            page_size: 每页记录数
+            chunk_chars: 单条消息的最大字符数，小于等于 0 时不拆分
+            max_cached_pages: 页缓存容量
+        """
+        self.data_manager = data_manager
+        self.page_size = max(1, page_size)
+        self.chunk_chars = chunk_chars
+        self.max_cached_pages = max_cached_pages
+        self._pages: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def clear(self) -> None:
+        """清空页缓存"""
+        with self._lock:
+            self._pages.clear()
+
+    def _records(self, scope: str, umo: str, now: int) -> list[BaseDataModel]:
+        """获取数据中未过期的记录（过期清理前先行过滤，使总数与页数准确）"""
+        data = self.data_manager.get_clear_data(scope, no_copy=True)
+        records: BaseModelList = (
+            data.get(umo, EMPTY_USER_LIST) if SCOPES[scope][2] else data
+        )
+        return [item for item in records if item.time == 0 or item.time > now]
+
+    def pages(self, scope: str, umo: str) -> int:
+        """获取数据的总页数（至少 1 页）"""
+        total = len(self._records(scope, umo, int(time_module.time())))
+        return max(1, -(-total // self.page_size))
+
+    def _render_section(self, scope: str, umo: str, page: int, now: int) -> str:
+        title_key, empty_key, _ = SCOPES[scope]
+        records = self._records(scope, umo, now)
+        total = len(records)
+        pages = max(1, -(-total // self.page_size))
+        if page > pages:
+            raise PageOutOfRangeError(pages)
+        start = (page - 1) * self.page_size
+        lines = [
+            strings.messages["banlist_strlist_format"].format(
+                id=item._get_id_field_value(),
+                time=time_utils.timelast_format(
+                    (item.time - now) if item.time != 0 else 0
+                ),
+                reason=item.reason if item.reason else strings.messages["no_reason"],
+            )
+            for item in records[start : start + self.page_size]
+        ]
+        header = strings.messages[title_key]
+        if pages > 1:
+            header += strings.messages["banlist_page_info"].format(
+                page=page, pages=pages, total=total, scope=scope
+            )
+        return header + ("".join(lines) if lines else strings.messages[empty_key])
+
+    def render(self, umo: str, scope: str | None = None, page: int = 1) -> list[str]:
+        """
+        渲染名单
+
+        Args:
+            umo: 当前会话
+            scope: 数据名，为 None 时渲染所有数据的第一页
+            page: 页码（从 1 开始）
+
+        Returns:
+            拆分为若干条消息的文本
+
+        Raises:
+            KeyError: 数据名未知
+            PageOutOfRangeError: 页码超出范围
+        """
+        if scope is not None and scope not in SCOPES:
+            raise KeyError(scope)
+        if page < 1:
+            raise PageOutOfRangeError(self.pages(scope, umo) if scope else 1)
+        now = int(time_module.time())
+        key = (
+            umo,
+            scope,
+            page,
+            self.data_manager.generation,
+            now // _CACHE_BUCKET_SECONDS,
+        )
+        with self._lock:
+            text = self._pages.get(key)
+            if text is not None:
+                self._pages.move_to_end(key)
+        if text is None:
+            if scope is None:
+                text = "\n\n".join(
+                    self._render_section(name, umo, 1, now) for name in SCOPES
+                )
+            else:
+                text = self._render_section(scope, umo, page, now)
+            with self._lock:
+                self._pages[key] = text
+                while len(self._pages) > self.max_cached_pages:
+                    self._pages.popitem(last=False)
+        return split_chunks(text, self.chunk_chars)
@@ -0,0 +1,351 @@
+"""
+Bulk import/export for ReNeBan plugin
+Streams blacklist records to and from JSONL/CSV files in bounded-memory chunks
+"""
+
+import csv
+import json
+import time as time_module
+from collections.abc import Callable, Iterator
+from itertools import chain, islice
+from pathlib import Path
+
+from .datafile_manager import DatafileManager
+from .user_manager import (
+    UserDataModel,
+    UserDataList,
+    UmoDataModel,
+    UmoDataList,
+    BaseDataModel,
+    BaseModelList,
+)
+
+from astrbot.api import logger
+
+# 数据名 -> (是否为字典结构, 列表类型, 记录类型)
+SCOPES: dict[str, tuple[bool, type[BaseModelList], type[BaseDataModel]]] = {
+    "ban": (True, UserDataList, UserDataModel),
+    "pass": (True, UserDataList, UserDataModel),
+    "banall": (False, UserDataList, UserDataModel),
+    "passall": (False, UserDataList, UserDataModel),
+    "umoban": (False, UmoDataList, UmoDataModel),
+    "umopass": (False, UmoDataList, UmoDataModel),
+    "group": (True, UmoDataList, UmoDataModel),
+    "groupban": (True, UserDataList, UserDataModel),
+    "grouppass": (True, UserDataList, UserDataModel),
+}
+
+# 文件字段：数据名, 键（ban/pass 为 UMO，会话组数据为组名，列表结构为空）, ID（UID 或 UMO）, 到期时间戳（0 为永久）, 理由,
+# 版本时间戳（毫秒）, 版本节点标识, 是否为墓碑（已删除的记录，仅用于 /ban-merge）
+FIELDS = ("scope", "key", "id", "time", "reason", "ts", "origin", "deleted")
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class BulkFormatError(ValueError):
+    """
+    文件格式错误（无法根据扩展名判断格式时抛出）
+    """
+
+    pass
+
+
+# 读取/写入文件时可能出现的错误（命令处理中统一报告给用户）
+BULK_IO_ERRORS = (BulkFormatError, UnicodeDecodeError, csv.Error, OSError)
+
+
+def detect_format(path: Path) -> str:
+    """
+    根据扩展名判断文件格式（jsonl 或 csv）
+    """
+    suffix = path.suffix.lower()
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix == ".csv":
+        return "csv"
+    raise BulkFormatError(f"无法识别的文件格式：{path.name}（仅支持 .jsonl 与 .csv）")
+
+
+class ImportReport:
+    """
+    导入报告
+    """
+
+    def __init__(self):
+        self.read: int = 0  # 读取的行数
+        self.added: int = 0  # 新增的记录数
+        self.merged: int = 0  # 与已有记录合并的记录数
+        self.expired: int = 0  # 已过期而跳过的记录数
+        self.tombstones: int = 0  # 墓碑（仅用于合并）而跳过的记录数
+        self.invalid: int = 0  # 格式无效而跳过的记录数
+        self.chunks: int = 0  # 应用的块数
+        self.elapsed: float = 0.0  # 耗时（秒）
+
+    def format(self) -> str:
+        """格式化为易读的文本"""
+        return (
+            f"读取 {self.read} 行，新增 {self.added} 条，合并 {self.merged} 条，"
+            f"跳过已过期 {self.expired} 条、墓碑 {self.tombstones} 条、无效 {self.invalid} 条，"
+            f"共 {self.chunks} 块，耗时 {self.elapsed:.2f}s"
+        )
+
+
+def is_truthy(value) -> bool:
+    """判断 JSONL/CSV 中的布尔字段是否为真（CSV 中为字符串）"""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def _parse_record(raw: dict, now: int) -> tuple[str, str, str, int, str | None] | str:
+    """
+    校验一条原始记录
+
+    Returns:
+        (数据名, 键, ID, 到期时间戳, 理由)；记录已过期时返回 "expired"，为墓碑时返回 "tombstone"，无效时返回错误描述
+    """
+    if is_truthy(raw.get("deleted")):
+        return "tombstone"
+    scope = raw.get("scope")
+    if scope not in SCOPES:
+        return f"未知的数据名 {scope!r}"
+    is_dict = SCOPES[scope][0]
+    key = raw.get("key") or ""
+    if not isinstance(key, str) or (is_dict and not key):
+        return f"{scope} 记录缺少键"
+    id_value = raw.get("id")
+    if not isinstance(id_value, str) or not id_value:
+        return "记录缺少 ID"
+    expire_time = raw.get("time", 0)
+    if isinstance(expire_time, str):
+        try:
+            expire_time = int(expire_time) if expire_time else 0
+        except ValueError:
+            return f"到期时间 {expire_time!r} 不是整数"
+    if not isinstance(expire_time, int) or expire_time < 0:
+        return f"到期时间 {expire_time!r} 不合法"
+    if expire_time != 0 and expire_time <= now:
+        return "expired"
+    reason = raw.get("reason") or None
+    if reason is not None and not isinstance(reason, str):
+        return "理由不是字符串"
+    return scope, key if is_dict else "", id_value, expire_time, reason
+
+
+def _iter_raw(path: Path, fmt: str) -> Iterator[dict | None]:
+    """
+    逐行读取原始记录（无法解析的行产生 None）
+    """
+    with path.open("r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield row
+            return
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+                continue
+            yield raw if isinstance(raw, dict) else None
+
+
+def _apply_chunk(
+    data: dict[str, dict[str, BaseModelList] | BaseModelList],
+    records: list[tuple[str, str, str, int, str | None]],
+    indexes: dict[tuple[str, str], dict[str, BaseDataModel]],
+    report: ImportReport,
+) -> None:
+    """
+    将一块记录应用到事务数据上（已有记录取较晚的到期时间，永久优先；未变化的记录保留原版本）
+    """
+    for scope, key, id_value, expire_time, reason in records:
+        is_dict, list_type, model_type = SCOPES[scope]
+        if is_dict:
+            if data[scope].get(key) is None:
+                data[scope][key] = list_type()
+            target_list: BaseModelList = data[scope][key]
+        else:
+            target_list: BaseModelList = data[scope]
+        # 每个目标列表在整个导入中只建一次 ID 索引
+        index = indexes.get((scope, key))
+        if index is None:
+            index = indexes[(scope, key)] = {
+                item._get_id_field_value(): item for item in target_list
+            }
+        item = index.get(id_value)
+        if item is None:
+            item = (
+                UmoDataModel(umo=id_value, time=expire_time, reason=reason)
+                if model_type is UmoDataModel
+                else UserDataModel(uid=id_value, time=expire_time, reason=reason)
+            )
+            target_list.append(item)
+            index[id_value] = item
+            report.added += 1
+        else:
+            merged_time = (
+                0 if 0 in (item.time, expire_time) else max(item.time, expire_time)
+            )
+            merged_reason = reason or item.reason
+            if merged_time != item.time or merged_reason != item.reason:
+                item.update_data(time=merged_time, reason=merged_reason)
+            report.merged += 1
+
+
+def _iter_chunks(
+    path: Path, fmt: str, chunk_size: int, report: ImportReport
+) -> Iterator[list[tuple[str, str, str, int, str | None]]]:
+    """
+    逐块读取并校验记录，产生每块中的有效记录（可能为空列表）
+    """
+    raw_iter = _iter_raw(path, fmt)
+    while True:
+        batch = list(islice(raw_iter, chunk_size))
+        if not batch:
+            return
+        now = int(time_module.time())
+        records: list[tuple[str, str, str, int, str | None]] = []
+        for raw in batch:
+            report.read += 1
+            parsed = _parse_record(raw, now) if raw is not None else "无法解析"
+            if parsed == "expired":
+                report.expired += 1
+            elif parsed == "tombstone":
+                report.tombstones += 1
+            elif isinstance(parsed, str):
+                report.invalid += 1
+                if report.invalid <= 10:
+                    logger.warning(
+                        f"导入 {path.name} 第 {report.read} 条记录无效：{parsed}"
+                    )
+            else:
+                records.append(parsed)
+        logger.info(f"导入 {path.name}：已读取 {report.read} 行")
+        yield records
+
+
+def import_records(
+    data_manager: DatafileManager,
+    path: Path,
+    fmt: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    """
+    从 JSONL/CSV 文件流式导入记录
+
+    文件逐块读取与校验，所有块在同一次事务中应用（一次复制、一次清理、一次落盘），
+    任一块出错时不写回任何修改；文件中没有有效记录时不开启事务。
+
+    Args:
+        data_manager: 数据文件管理器
+        path: 文件路径
+        fmt: 文件格式（jsonl 或 csv），为 None 时根据扩展名判断
+        chunk_size: 每块的记录数
+        progress: 每处理一块后调用的进度回调
+
+    Returns:
+        导入报告
+    """
+    fmt = fmt or detect_format(path)
+    report = ImportReport()
+    start = time_module.perf_counter()
+    chunks = _iter_chunks(path, fmt, chunk_size, report)
+    # 跳过开头没有有效记录的块
+    records = next(chunks, None)
+    while records is not None and not records:
+        if progress is not None:
+            progress(report)
+        records = next(chunks, None)
+    if records is not None:
+        with data_manager.transaction(list(SCOPES), from_cache=True) as data:
+            indexes: dict[tuple[str, str], dict[str, BaseDataModel]] = {}
+            for records in chain((records,), chunks):
+                if records:
+                    _apply_chunk(data, records, indexes, report)
+                    report.chunks += 1
+                if progress is not None:
+                    progress(report)
+    report.elapsed = time_module.perf_counter() - start
+    return report
+
+
+def _iter_records(
+    data_manager: DatafileManager, scopes: list[str]
+) -> Iterator[tuple[str, str, str, int, str | None, int | None, str | None, int]]:
+    """
+    遍历缓存中的记录与墓碑（不触发同步）
+    """
+    data = data_manager.get_clear_data(scopes, no_copy=True)
+    for scope in scopes:
+        value = data[scope]
+        groups = value.items() if isinstance(value, dict) else (("", value),)
+        for key, lst in groups:
+            # 复制引用列表，避免遍历期间被后台清理修改
+            for item in list(lst):
+                yield (
+                    scope,
+                    key,
+                    item._get_id_field_value(),
+                    item.time,
+                    item.reason,
+                    item.ts,
+                    item.origin,
+                    0,
+                )
+    # 墓碑以 time 为 0、deleted 为 1 的记录导出
+    scope_set = set(scopes)
+    for (scope, key, id_value), (ts, origin) in data_manager.tombstones.items():
+        if scope in scope_set:
+            yield scope, key, id_value, 0, None, ts, origin, 1
+
+
+def export_records(
+    data_manager: DatafileManager,
+    path: Path,
+    fmt: str | None = None,
+    scopes: list[str] | None = None,
+) -> int:
+    """
+    将记录流式导出至 JSONL/CSV 文件（先写入临时文件再替换）
+
+    Args:
+        data_manager: 数据文件管理器
+        path: 文件路径
+        fmt: 文件格式（jsonl 或 csv），为 None 时根据扩展名判断
+        scopes: 要导出的数据名，为 None 时导出全部
+
+    Returns:
+        导出的记录数
+    """
+    fmt = fmt or detect_format(path)
+    scopes = list(SCOPES) if scopes is None else scopes
+    unknown = [scope for scope in scopes if scope not in SCOPES]
+    if unknown:
+        raise ValueError(f"未知的数据名：{'、'.join(unknown)}")
+    if not data_manager.is_cache_valid():
+        data_manager.sync_and_clean_data(no_return=True)
+
+    count = 0
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for record in _iter_records(data_manager, scopes):
+                writer.writerow(
+                    ["" if value is None else value for value in record]
+                )
+                count += 1
+        else:
+            for record in _iter_records(data_manager, scopes):
+                f.write(
+                    json.dumps(dict(zip(FIELDS, record)), ensure_ascii=False) + "\n"
+                )
+                count += 1
+    tmp_path.replace(path)
+    return count
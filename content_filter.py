@@ -0,0 +1,184 @@
+"""
+Content filter for ReNeBan plugin
+Multi-keyword (Aho-Corasick) and combined-regex matching of message text
+"""
+
+import re
+from collections import deque
+
+from astrbot.api import logger
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick 多关键词自动机
+
+    构建耗时与关键词总长度成正比，匹配耗时与文本长度成正比，与关键词数量无关。
+    """
+
+    __slots__ = ("keywords", "_goto", "_fail", "_match")
+
+    def __init__(self, keywords: list[str]):
+        """
+        构建自动机
+
+        Args:
+            keywords: 关键词列表（空字符串会被忽略）
+        """
+        self.keywords = keywords
+        # 状态 0 为根节点
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # 在该状态结束的（最短后缀）关键词下标，-1 为无
+        self._match: list[int] = [-1]
+
+        for idx, keyword in enumerate(keywords):
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._match.append(-1)
+                state = next_state
+            if self._match[state] == -1:
+                self._match[state] = idx
+
+        # 按 BFS 顺序构建失败指针，并沿失败指针继承匹配结果
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail_target = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = (
+                    fail_target if fail_target != next_state else 0
+                )
+                if self._match[next_state] == -1:
+                    self._match[next_state] = self._match[self._fail[next_state]]
+
+    def search(self, text: str) -> int | None:
+        """
+        单次线性扫描文本，返回最先出现的关键词的下标（无匹配时返回 None）
+        """
+        goto = self._goto
+        fail = self._fail
+        match = self._match
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if match[state] != -1:
+                return match[state]
+        return None
+
+
+_LEADING_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+
+
+def _scope_inline_flags(pattern: str) -> str:
+    """
+    将规则开头的全局内联标记（如 (?i)）改写为只作用于该规则的 (?i:...)，
+    以便与其他规则合并（合并后的正则中全局标记必须位于开头）
+    """
+    flags = ""
+    pos = 0
+    while m := _LEADING_FLAGS.match(pattern, pos):
+        flags += m.group(1)
+        pos = m.end()
+    if not flags:
+        return pattern
+    # 详细模式下规则末尾可能是注释，换行后再闭合分组
+    tail = "\n)" if "x" in flags else ")"
+    return f"(?{flags}:{pattern[pos:]}{tail}"
+
+
+class ContentFilter:
+    """
+    消息内容过滤器
+
+    所有关键词编译为一个 Aho-Corasick 自动机，所有正则规则合并为一个正则，
+    匹配时各对文本扫描一遍。关键词匹配忽略大小写。
+    """
+
+    def __init__(self, keywords: list[str], patterns: list[str]):
+        """
+        编译过滤规则
+
+        Args:
+            keywords: 关键词列表
+            patterns: 正则规则列表（无法编译的规则会被跳过并记录日志）
+        """
+        self._keywords = [keyword for keyword in keywords if keyword]
+        self._automaton = AhoCorasick(
+            [keyword.casefold() for keyword in self._keywords]
+        )
+
+        valid_patterns: list[str] = []
+        # 含捕获组的规则（可能有反向引用或与其他规则重名的命名组）不参与合并，单独匹配
+        self._separate: list[tuple[re.Pattern, str]] = []
+        for pattern in patterns:
+            if not pattern:
+                continue
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                logger.error(f"内容过滤正则 {pattern!r} 无法编译：{e}，已跳过该规则")
+                continue
+            if compiled.groups:
+                self._separate.append((compiled, pattern))
+            else:
+                valid_patterns.append(pattern)
+        self._patterns = valid_patterns
+        # 每条规则包在一个命名组中，通过 lastgroup 得知命中的是哪一条
+        self._regex: re.Pattern | None = None
+        if valid_patterns:
+            try:
+                self._regex = re.compile(
+                    "|".join(
+                        f"(?P<_reneban_{idx}>{_scope_inline_flags(pattern)})"
+                        for idx, pattern in enumerate(valid_patterns)
+                    )
+                )
+            except re.error as e:
+                # 合并失败时退化为逐条匹配
+                logger.warning(f"内容过滤正则无法合并：{e}，将逐条匹配")
+                self._separate[:0] = [
+                    (re.compile(pattern), pattern) for pattern in valid_patterns
+                ]
+                self._patterns = []
+
+    def __bool__(self) -> bool:
+        return bool(self._keywords) or self._regex is not None or bool(self._separate)
+
+    @property
+    def rule_count(self) -> int:
+        return len(self._keywords) + len(self._patterns) + len(self._separate)
+
+    def match(self, text: str) -> str | None:
+        """
+        检查文本，返回命中的规则（关键词或正则原文），未命中时返回 None
+        """
+        if not text:
+            return None
+        if self._keywords:
+            hit = self._automaton.search(text.casefold())
+            if hit is not None:
+                # 返回配置中的原始关键词
+                return self._keywords[hit]
+        if self._regex is not None:
+            m = self._regex.search(text)
+            if m is not None:
+                return self._patterns[int(m.lastgroup.rsplit("_", 1)[1])]
+        for regex, pattern in self._separate:
+            if regex.search(text) is not None:
+                return pattern
+        return None
@@ -7,8 +7,12 @@ import json
 import copy
 import time as time_module
 import threading
+import uuid
+import weakref
 import msgpack
-from typing import Literal, overload
+from contextlib import contextmanager
+from collections.abc import Callable, Iterable, Iterator
+from typing import Literal, NamedTuple, overload
 from pathlib import Path
 from .user_manager import (
     UserDataModel,
@@ -19,25 +23,96 @@ from .user_manager import (
     BaseModelList,
     ModelListRegistry,
     MODEL_LIST_REGISTRY,
+    EMPTY_USER_LIST,
+    CLOCK,
+    intern_id,
 )
+from .metrics import METRICS, DEFAULT_BYTES_BUCKETS
+from .profiling import Tracer
+from .umo_pattern import UmoPatternIndex, UmoPatternTrie, is_umo_pattern
+from .scope_group import ScopeGroupIndex
+from .process_lock import InterProcessLock, DiskGeneration
+from .tombstones import TombstoneTable, TombstoneKey
 
 from astrbot.api import logger
 
+_CACHE_HITS = METRICS.counter("reneban_cache_hits_total", "缓存命中次数")
+_CACHE_MISSES = METRICS.counter("reneban_cache_misses_total", "缓存失效次数")
+_SYNC_TOTAL = METRICS.counter("reneban_sync_total", "数据同步次数")
+_SYNC_SECONDS = METRICS.histogram("reneban_sync_seconds", "数据同步耗时（秒）")
+_SYNC_LOCK_WAIT_SECONDS = METRICS.histogram(
+    "reneban_sync_lock_wait_seconds", "同步锁等待耗时（秒）"
+)
+_SYNC_BYTES = METRICS.histogram(
+    "reneban_sync_bytes", "单次同步写入字节数", DEFAULT_BYTES_BUCKETS
+)
+_BYTES_WRITTEN = METRICS.counter("reneban_bytes_written_total", "写入磁盘字节数")
+_WAL_REPLAYS = METRICS.counter("reneban_wal_replays_total", "WAL 崩溃重放次数")
+
+# 数据文件的临时文件后缀（流式写入后在 WAL 就绪时原子替换）
+_TMP_SUFFIX = ".tmp"
+# 流式写入时每次写入的记录数
+_STREAM_CHUNK_RECORDS = 1024
+# WAL 清单格式标记（旧版 WAL 为「文件名 -> 文件内容」，不含此键）
+_WAL_VERSION_KEY = "__wal_version__"
+_WAL_VERSION = 2
+
+
+class DataChangeEvent(NamedTuple):
+    """
+    数据变更通知（generation 为变更后的数据代数，data_names 为发生变更的数据名）
+
+    keys 为以会话/组名为键的数据中发生变更的键（由事务的 keys 参数提供），
+    不在其中的数据名表示变更范围未知，订阅者应视为整份数据都可能变更
+    """
+
+    generation: int
+    data_names: tuple[str, ...]
+    keys: dict[str, frozenset[str]] | None = None
+
+
+def _dumps(value) -> str:
+    """紧凑编码 JSON"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
 
 class DatafileManager:
     """
     Manages data files for ReNeBan plugin
     """
 
-    def __init__(self, data_dir: Path, cache_ttl: int = 60):
+    # 存活的实例（用于资源统计：插件重载后旧实例应被回收）
+    _instances: "weakref.WeakSet[DatafileManager]" = weakref.WeakSet()
+
+    def __init__(
+        self,
+        data_dir: Path,
+        cache_ttl: int = 60,
+        slow_threshold_ms: float = 500,
+        node_id: str | None = None,
+        tombstone_retention: int = 2592000,
+    ):
         """
         初始化数据文件管理器
 
         Args:
             data_dir: 数据目录的Path对象
             cache_ttl: 缓存存活时间（秒），默认60秒
+            slow_threshold_ms: 慢操作日志阈值（毫秒），默认500毫秒，小于等于0时关闭
+            node_id: 本节点标识（记录版本的 origin），为 None 时使用数据目录中保存的随机标识
+            tombstone_retention: 墓碑保留时间（秒），默认30天
         """
         self.data_dir = data_dir
+        DatafileManager._instances.add(self)
+        # 本节点标识，新建与修改的记录以 (逻辑时间戳, 节点标识) 为版本
+        self.node_id: str = node_id or self._load_node_id()
+        CLOCK.origin = self.node_id
+        # 删除记录的墓碑，合并其他节点的数据时避免恢复已删除的记录
+        self.tombstones = TombstoneTable(
+            data_dir / "tombstones.msgpack", tombstone_retention
+        )
+        # 阶段计时器，可通过 self.tracer.add_hook() 转发计时区间
+        self.tracer = Tracer(slow_threshold_ms)
         # 定义文件路径/文件名
         self.banlist_filename = "ban_list.json"
         self.banall_list_filename = "banall_list.json"
@@ -45,16 +120,25 @@ class DatafileManager:
         self.passall_list_filename = "passall_list.json"
         self.umo_ban_list_filename = "umo_ban_list.json"
         self.umo_pass_list_filename = "umo_pass_list.json"
+        self.group_list_filename = "scope_group_list.json"
+        self.group_ban_list_filename = "group_ban_list.json"
+        self.group_pass_list_filename = "group_pass_list.json"
 
         self._WAL_path = self.data_dir / ".WAL.msgpack"
         self._WAL_ready_path = self.data_dir / ".WAL.ready"
 
-        # sync锁
-        self._sync_lock = threading.Lock()
+        # sync锁（可重入，以便 transaction() 在持锁期间调用 get_data/write_data）
+        self._sync_lock = threading.RLock()
+        # 跨进程锁与磁盘代数（多个进程共用同一数据目录时协调提交并感知其他进程的变更）
+        self._process_lock = InterProcessLock(self.data_dir / ".lock")
+        self._disk_generation = DiskGeneration(self.data_dir / ".generation")
 
         # 写入提交变量
         self._commits: dict[str, str] = {}
 
+        # 累计写入磁盘的字节数（含 WAL），用于评估写放大
+        self.bytes_written: int = 0
+
         # 初始化缓存相关变量
         self._passlist_cache: dict[str, UserDataList]  # 会话解禁列表缓存
         self._banlist_cache: dict[str, UserDataList]  # 会话禁用列表缓存
@@ -62,18 +146,117 @@ class DatafileManager:
         self._banall_list_cache: UserDataList  # 全局禁用列表缓存
         self._umo_ban_list_cache: UmoDataList  # UMO禁用列表缓存
         self._umo_pass_list_cache: UmoDataList  # UMO解禁列表缓存
+        self._group_list_cache: dict[str, UmoDataList]  # 会话组成员缓存
+        self._group_ban_list_cache: dict[str, UserDataList]  # 会话组禁用列表缓存
+        self._group_pass_list_cache: dict[str, UserDataList]  # 会话组解禁列表缓存
+        self._group_index_cache: ScopeGroupIndex = (
+            ScopeGroupIndex()
+        )  # 会话组反向索引缓存
+        self._umo_pattern_cache: UmoPatternIndex = (
+            UmoPatternIndex()
+        )  # 通配 UMO 规则索引缓存
         self._cache_timestamp: int = 0  # 缓存创建时间戳
+        self.generation: int = 0  # 数据代数，每次重建缓存时递增，可用于判断派生数据是否过期
         self._cache_ttl: int = cache_ttl  # 缓存存活时间（秒）
+        self._record_counts: dict[str, int] = {}  # 上次同步时各数据的记录数
+
+        # 数据变更订阅者
+        self._subscribers: list[Callable[[DataChangeEvent], None]] = []
+        self._pending_change: DataChangeEvent | None = None
+        # 当前事务声明的变更键（见 transaction 的 keys 参数）
+        self._change_keys: dict[str, frozenset[str]] = {}
 
         # 初始化文件
         self._initialize_files()
 
-        if self._WAL_path.exists() and self._WAL_ready_path.exists():
-            # 崩溃重放
-            self._WAL_write(False)
+        with self._process_lock:
+            # 持有跨进程锁，避免重放其他进程正在提交的 WAL
+            if self._WAL_path.exists() and self._WAL_ready_path.exists():
+                # 崩溃重放
+                _WAL_REPLAYS.inc()
+                with self.tracer.operation("wal_replay"):
+                    self._WAL_write(False)
 
         self.sync_and_clean_data(no_return=True)
 
+    @classmethod
+    def live_instances(cls) -> int:
+        """存活的实例数"""
+        return len(cls._instances)
+
+    def close(self) -> None:
+        """
+        释放资源（插件卸载/重载时调用）
+
+        等待进行中的同步完成，完成尚未完成的 WAL 替换，将缓存列表从过期清理任务中移除并丢弃缓存，
+        取消所有订阅并关闭跨进程锁文件。关闭后缓存无效，再次读取（含 get_clear_data()）时会重新从磁盘加载数据。
+        """
+        with self._sync_lock:
+            with self._process_lock:
+                if self._WAL_path.exists() and self._WAL_ready_path.exists():
+                    self._WAL_write(False)
+            self._commits = {}
+            if self._passlist_cache is not None:
+                MODEL_LIST_REGISTRY.unregister_all(
+                    self._iter_lists(
+                        self._banall_list_cache,
+                        self._passall_list_cache,
+                        self._banlist_cache,
+                        self._passlist_cache,
+                        self._umo_ban_list_cache,
+                        self._umo_pass_list_cache,
+                        self._group_list_cache,
+                        self._group_ban_list_cache,
+                        self._group_pass_list_cache,
+                    )
+                )
+            self._passlist_cache = None
+            self._banlist_cache = None
+            self._passall_list_cache = None
+            self._banall_list_cache = None
+            self._umo_ban_list_cache = None
+            self._umo_pass_list_cache = None
+            self._group_list_cache = None
+            self._group_ban_list_cache = None
+            self._group_pass_list_cache = None
+            self._group_index_cache = ScopeGroupIndex()
+            self._umo_pattern_cache = UmoPatternIndex()
+            self._cache_timestamp = 0
+            self._record_counts = {}
+            self._subscribers.clear()
+            self._pending_change = None
+            self._process_lock.close()
+
+    def _load_node_id(self) -> str:
+        """读取数据目录中保存的节点标识，不存在时生成并保存"""
+        path = self.data_dir / "node_id"
+        try:
+            node_id = path.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            node_id = ""
+        if not node_id:
+            node_id = uuid.uuid4().hex[:12]
+            path.write_text(node_id, encoding="utf-8")
+        return node_id
+
+    def record_tombstones(self, keys: Iterable[TombstoneKey]) -> None:
+        """
+        为被显式删除的记录（/dec-* 取消、/ban-reset、/dec-by 等）写入墓碑
+
+        自然到期与清理冗余数据而移除的记录不写入墓碑，调用方只需在删除处传入被删除记录的键。
+
+        Args:
+            keys: 被删除记录的 (数据名, 键, ID)，列表结构的键为空字符串
+        """
+        keys = list(keys)
+        if not keys:
+            return
+        with self._sync_lock, self._process_lock:
+            self.tombstones.load()
+            for key in keys:
+                self.tombstones.put(key, CLOCK.stamp(), CLOCK.origin)
+            self.tombstones.save()
+
     def _initialize_files(self):
         """初始化所有必要数据文件"""
         # 迁移：旧版 passlist.json -> 新版 pass_list.json，banlist同理
@@ -94,6 +277,9 @@ class DatafileManager:
         for path in [
             self.data_dir / self.passlist_filename,
             self.data_dir / self.banlist_filename,
+            self.data_dir / self.group_list_filename,
+            self.data_dir / self.group_ban_list_filename,
+            self.data_dir / self.group_pass_list_filename,
         ]:
             path.touch(exist_ok=True)
             if path.stat().st_size == 0:
@@ -117,7 +303,7 @@ class DatafileManager:
         Returns:
             bool: 如果缓存存在且未过期则返回 True，否则返回 False
         """
-        return (
+        valid = (
             all(
                 cache is not None
                 for cache in [
@@ -127,10 +313,17 @@ class DatafileManager:
                     self._banall_list_cache,
                     self._umo_ban_list_cache,
                     self._umo_pass_list_cache,
+                    self._group_list_cache,
+                    self._group_ban_list_cache,
+                    self._group_pass_list_cache,
                 ]
             )
             and int(time_module.time()) - self._cache_timestamp < self._cache_ttl
+            # 其他进程提交了变更（一次 stat 判断）
+            and not self._disk_generation.changed()
         )
+        (_CACHE_HITS if valid else _CACHE_MISSES).inc()
+        return valid
 
     def _invalidate_and_reload_cache(
         self,
@@ -140,6 +333,9 @@ class DatafileManager:
         pass_data: dict[str, UserDataList],
         umoban_data: UmoDataList,
         umopass_data: UmoDataList,
+        group_data: dict[str, UmoDataList],
+        groupban_data: dict[str, UserDataList],
+        grouppass_data: dict[str, UserDataList],
     ) -> None:
         """
         内部方法：清理并重新加载缓存
@@ -150,7 +346,44 @@ class DatafileManager:
         self._banall_list_cache = banall_data
         self._umo_ban_list_cache = umoban_data
         self._umo_pass_list_cache = umopass_data
+        self._group_list_cache = group_data
+        self._group_ban_list_cache = groupban_data
+        self._group_pass_list_cache = grouppass_data
+        # 只有缓存中的列表是权威数据，由后台任务定期清理过期记录
+        MODEL_LIST_REGISTRY.register_all(
+            self._iter_lists(
+                banall_data,
+                passall_data,
+                ban_data,
+                pass_data,
+                umoban_data,
+                umopass_data,
+                group_data,
+                groupban_data,
+                grouppass_data,
+            )
+        )
+        self._group_index_cache = ScopeGroupIndex(group_data)
+        self._umo_pattern_cache = UmoPatternIndex(
+            ban_data.keys(),
+            pass_data.keys(),
+            (item.umo for item in umoban_data),
+            (item.umo for item in umopass_data),
+        )
         self._cache_timestamp = int(time_module.time())
+        self.generation += 1
+
+    def get_umo_patterns(self) -> UmoPatternIndex:
+        """
+        获取通配 UMO 规则索引（随缓存重建，与 get_clear_data() 返回的数据一致）
+        """
+        return self._umo_pattern_cache
+
+    def get_group_index(self) -> ScopeGroupIndex:
+        """
+        获取会话组反向索引（随缓存重建，与 get_clear_data() 返回的数据一致）
+        """
+        return self._group_index_cache
 
     def _safe_pathjoin(self, dir_path: Path, filename: str) -> Path:
         """
@@ -176,6 +409,33 @@ class DatafileManager:
         Returns:
             解析后的JSON数据，字典结构的键为字符串，值为UserDataList；列表结构为UserDataList
         """
+        with self.tracer.span("read_file", file=filename) as span:
+            result = self._read_file_inner(filename)
+            span.attrs["records"] = self._count_records(result)
+            return result
+
+    @staticmethod
+    def _count_records(data: dict[str, UserDataList] | BaseModelList) -> int:
+        """统计数据中的记录条数"""
+        if isinstance(data, dict):
+            return sum(len(value) for value in data.values())
+        return len(data)
+
+    @staticmethod
+    def _iter_lists(
+        *datas: dict[str, BaseModelList] | BaseModelList,
+    ) -> Iterator[BaseModelList]:
+        """遍历数据中的所有列表"""
+        for data in datas:
+            if isinstance(data, dict):
+                yield from data.values()
+            else:
+                yield data
+
+    def _read_file_inner(
+        self, filename: str
+    ) -> dict[str, UserDataList] | BaseModelList:
+        """_read_file 的实现"""
         file_path = self._safe_pathjoin(self.data_dir, filename)
         if not file_path.exists():
             logger.error(f"{file_path} 不存在")
@@ -200,7 +460,12 @@ class DatafileManager:
             data = json.loads(raw_data)
 
         # 根据文件路径判断结构并转换为相应的对象
-        if file_path.name in (self.banlist_filename, self.passlist_filename):
+        if file_path.name in (
+            self.banlist_filename,
+            self.passlist_filename,
+            self.group_ban_list_filename,
+            self.group_pass_list_filename,
+        ):
             # 验证数据类型是字典
             if not isinstance(data, dict):
                 logger.error(
@@ -217,12 +482,16 @@ class DatafileManager:
                         f"文件 {file_path} 中键 '{key}' 的值应该是列表类型，但实际是 {type(value).__name__}。跳过该键。"
                     )
                     continue
-                result[key] = UserDataList(
+                result[intern_id(key)] = UserDataList(
                     [
                         UserDataModel(
                             uid=item["uid"],
                             time=item["time"],
                             reason=item.get("reason"),
+                            ts=item.get("ts") if isinstance(item.get("ts"), int) else 0,
+                            origin=(
+                                item.get("origin") if isinstance(item.get("origin"), str) else None
+                            ),
                         )
                         for item in value
                         if isinstance(item, dict)
@@ -237,6 +506,47 @@ class DatafileManager:
                     ]
                 )
             return result
+        elif file_path.name == self.group_list_filename:
+            # 验证数据类型是字典
+            if not isinstance(data, dict):
+                logger.error(
+                    f"文件 {file_path} 应该是字典类型，但实际是 {type(data).__name__}。返回空字典。"
+                )
+                return {}
+
+            # 这是字典结构 {组名: [成员UMO]}
+            result = {}
+            for key, value in data.items():
+                # 验证字典中的值是列表类型
+                if not isinstance(value, list):
+                    logger.error(
+                        f"文件 {file_path} 中键 '{key}' 的值应该是列表类型，但实际是 {type(value).__name__}。跳过该键。"
+                    )
+                    continue
+                result[intern_id(key)] = UmoDataList(
+                    [
+                        UmoDataModel(
+                            umo=item["umo"],
+                            time=item["time"],
+                            reason=item.get("reason"),
+                            ts=item.get("ts") if isinstance(item.get("ts"), int) else 0,
+                            origin=(
+                                item.get("origin") if isinstance(item.get("origin"), str) else None
+                            ),
+                        )
+                        for item in value
+                        if isinstance(item, dict)
+                        and "umo" in item
+                        and "time" in item
+                        and isinstance(item["umo"], str)
+                        and isinstance(item["time"], int)
+                        and (
+                            item.get("reason") is None
+                            or isinstance(item.get("reason"), str)
+                        )
+                    ]
+                )
+            return result
         elif file_path.name in (self.banall_list_filename, self.passall_list_filename):
             # 验证数据类型是列表
             if not isinstance(data, list):
@@ -252,6 +562,10 @@ class DatafileManager:
                         uid=item["uid"],
                         time=item["time"],
                         reason=item.get("reason"),
+                        ts=item.get("ts") if isinstance(item.get("ts"), int) else 0,
+                        origin=(
+                            item.get("origin") if isinstance(item.get("origin"), str) else None
+                        ),
                     )
                     for item in data
                     if isinstance(item, dict)
@@ -283,6 +597,10 @@ class DatafileManager:
                         umo=item["umo"],
                         time=item["time"],
                         reason=item.get("reason"),
+                        ts=item.get("ts") if isinstance(item.get("ts"), int) else 0,
+                        origin=(
+                            item.get("origin") if isinstance(item.get("origin"), str) else None
+                        ),
                     )
                     for item in data
                     if isinstance(item, dict)
@@ -309,42 +627,86 @@ class DatafileManager:
             filename: 要写入的文件名（支持使用“/”创建子目录）
             data: 要写入的数据
         """
-        # 将 ModelList/Model 对象转换为普通字典/列表
-        if isinstance(data, BaseModelList):
-            serializable_data: list[dict[str, str | int]] = data.to_list()
-        elif isinstance(data, dict):
-            serializable_data: dict[str, list[dict[str, str | int]]] = {}
-            for key, value in data.items():
-                if isinstance(value, UserDataList):
-                    serializable_data[key] = value.to_list()
-                else:
-                    logger.error(f"无法序列化数据：{value}")
-                    serializable_data[key] = value
-        else:
-            logger.error(f"无法序列化数据：{data}")
-            serializable_data = data
+        with self.tracer.span(
+            "serialize", file=filename, records=self._count_records(data)
+        ):
+            self._write_file_commit_inner(filename, data)
 
-        # 写入 self._commits
-        self._commits[filename] = json.dumps(
-            serializable_data, indent=4, ensure_ascii=False
-        )
+    def _write_file_commit_inner(
+        self, filename: str, data: dict[str, UserDataList] | BaseModelList
+    ):
+        """_write_file_commit 的实现"""
+        file_path = self._safe_pathjoin(self.data_dir, filename)
+        tmp_path = file_path.with_name(file_path.name + _TMP_SUFFIX)
+        with tmp_path.open("wb") as f:
+            if isinstance(data, BaseModelList):
+                written = self._stream_list(f, data, "[\n", "\n]")
+            elif isinstance(data, dict):
+                written = f.write(b"{")
+                for idx, (key, value) in enumerate(data.items()):
+                    prefix = ("\n" if idx == 0 else ",\n") + _dumps(key) + ":"
+                    if isinstance(value, BaseModelList):
+                        written += self._stream_list(f, value, prefix + "[\n", "\n]")
+                    else:
+                        logger.error(f"无法序列化数据：{value}")
+                        written += f.write((prefix + _dumps(value)).encode("utf-8"))
+                written += f.write(b"\n}")
+            else:
+                logger.error(f"无法序列化数据：{data}")
+                written = f.write(_dumps(data).encode("utf-8"))
+        self.bytes_written += written
+        _BYTES_WRITTEN.inc(written)
+
+        # 写入 self._commits（文件名 -> 临时文件名）
+        self._commits[filename] = tmp_path.name
+
+    @staticmethod
+    def _stream_list(f, lst: BaseModelList, head: str, tail: str) -> int:
+        """
+        将列表逐块写入二进制文件（每行一条紧凑编码的记录），返回写入的字节数
+        """
+        written = 0
+        buffer = [head]
+        first = True
+        with lst._lock:
+            for item in lst:
+                buffer.append(("" if first else ",\n") + _dumps(item.to_dict()))
+                first = False
+                if len(buffer) >= _STREAM_CHUNK_RECORDS:
+                    written += f.write("".join(buffer).encode("utf-8"))
+                    buffer.clear()
+        buffer.append(tail)
+        written += f.write("".join(buffer).encode("utf-8"))
+        return written
 
     def _write_commits(self):
         """
         将提交写入相应的文件
 
-        注意：本 WAL 机制目前仅提供应用进程级崩溃恢复保护
-        不使用 fsync / atomic rename，因此不保证系统级崩溃（如断电）时的数据安全
+        各文件已流式写入临时文件，WAL 中只记录「文件名 -> 临时文件名」清单，
+        WAL 就绪后逐个以 rename 原子替换目标文件；重放时重新执行尚未完成的替换。
+        注意：不使用 fsync，因此不保证系统级崩溃（如断电）时的数据安全
         """
         if self._WAL_path.exists() and self._WAL_ready_path.exists():
             # 通常因用户手动创建了相关文件导致
             WAL_backup_filename = f"WAL_{str(int(time_module.time()))}.bak"
             self._WAL_path.rename(self.data_dir / WAL_backup_filename)
             logger.warning(f"存在 WAL 文件，已将其重命名为 {WAL_backup_filename}")
-        self._WAL_path.write_bytes(msgpack.packb(self._commits, use_bin_type=True))
+        with self.tracer.span("wal_write") as span:
+            written = self._WAL_path.write_bytes(
+                msgpack.packb(
+                    {_WAL_VERSION_KEY: _WAL_VERSION, "files": self._commits},
+                    use_bin_type=True,
+                )
+            )
+            span.attrs["bytes"] = written
+        self.bytes_written += written
+        _BYTES_WRITTEN.inc(written)
         # 用户可能手动创建了 WAL ready 文件，而没有创建 WAL 文件
         self._WAL_ready_path.touch(exist_ok=True)
         self._WAL_write(True)
+        # 替换已完成，释放提交清单
+        self._commits = {}
 
     def _WAL_write(self, from_syncfun: bool):
         """
@@ -354,18 +716,26 @@ class DatafileManager:
             from_syncfun: 若调用来源是 sync_and_clean_data() 方法，则请置为True；若调用来源是 __init__() （崩溃重放），则请置为False
         """
 
-        def unpack_WAL() -> dict[str, str]:
+        def unpack_WAL() -> tuple[dict[str, str], bool]:
             """
             WAL 文件解包器
+
+            Returns:
+                (文件名 -> 临时文件名/文件内容, 是否为临时文件清单)；旧版 WAL 直接保存文件内容
             """
             try:
                 data = msgpack.unpackb(self._WAL_path.read_bytes(), raw=False)
                 if not isinstance(data, dict):
                     raise ValueError("WAL 解包出的对象类型不合法")
+                is_manifest = data.get(_WAL_VERSION_KEY) == _WAL_VERSION
+                if is_manifest:
+                    data = data.get("files")
+                    if not isinstance(data, dict):
+                        raise ValueError("WAL 解包出的对象类型不合法")
                 for key, value in data.items():
                     if not isinstance(key, str) or not isinstance(value, str):
                         raise ValueError("WAL 解包出的对象类型不合法")
-                return data
+                return data, is_manifest
             except Exception as e:
                 WAL_backup_filename = "WAL_" + str(int(time_module.time())) + ".bak"
                 self._WAL_path.rename(self.data_dir / WAL_backup_filename)
@@ -373,18 +743,36 @@ class DatafileManager:
                     f"在 WAL 解包时出现异常：{e}\n已将其重命名为 {WAL_backup_filename}，并跳过本次数据写入"
                 )
                 # 直接返回空字典，即无任何需写入数据
-                return {}
+                return {}, True
 
-        datas: dict[str, str] = self._commits if from_syncfun else unpack_WAL()
-        for filename, data in datas.items():
-            file_path = self._safe_pathjoin(self.data_dir, filename)
-            if file_path.is_dir() and file_path.exists():
-                logger.error(f"{file_path} 是一个目录，无法写入数据，将跳过该写入操作")
-                continue
-            file_path.write_text(data, encoding="utf-8")
-        self._WAL_ready_path.unlink()
-        # 可能因解包失败导致 WAL 文件不存在
-        self._WAL_path.unlink(missing_ok=True)
+        with self.tracer.span("file_write") as span:
+            datas, is_manifest = (
+                (self._commits, True) if from_syncfun else unpack_WAL()
+            )
+            total_written = 0
+            for filename, data in datas.items():
+                file_path = self._safe_pathjoin(self.data_dir, filename)
+                if file_path.is_dir() and file_path.exists():
+                    logger.error(
+                        f"{file_path} 是一个目录，无法写入数据，将跳过该写入操作"
+                    )
+                    continue
+                if not is_manifest:
+                    # 旧版 WAL：直接写入文件内容
+                    total_written += file_path.write_bytes(data.encode("utf-8"))
+                    continue
+                tmp_path = file_path.with_name(data)
+                if not tmp_path.name.endswith(_TMP_SUFFIX) or not tmp_path.exists():
+                    # 重放时临时文件可能已在崩溃前完成替换
+                    continue
+                tmp_path.replace(file_path)
+            self._WAL_ready_path.unlink()
+            # 可能因解包失败导致 WAL 文件不存在
+            self._WAL_path.unlink(missing_ok=True)
+            span.attrs["files"] = len(datas)
+            span.attrs["bytes"] = total_written
+        self.bytes_written += total_written
+        _BYTES_WRITTEN.inc(total_written)
 
     @overload
     def get_data(self, data_name: str) -> dict[str, UserDataList] | BaseModelList: ...
@@ -432,6 +820,48 @@ class DatafileManager:
                 have_data=dict(zip(data_name, data)),
             )
 
+    @contextmanager
+    def transaction(
+        self,
+        data_name: str | list[str],
+        from_cache: bool = False,
+        keys: Iterable[str] | None = None,
+    ):
+        """
+        事务：读取数据，交由代码块修改后一次性写回，期间持有同步锁与跨进程锁
+
+        代码块内抛出异常时不写回任何修改。
+
+        Args:
+            data_name: 要修改的数据名（单个字符串或列表，语义同 get_data）
+            from_cache: 缓存有效时直接从缓存取副本，省去读取时的一次同步（适合连续的批量事务）
+            keys: 代码块只修改以会话/组名为键的数据中的这些键时可提供，随变更通知下发，
+                使订阅者只需处理这些键
+
+        Yields:
+            与 get_data(data_name) 返回值相同结构的数据副本
+        """
+        with self._sync_lock, self._process_lock:
+            if from_cache and self.is_cache_valid():
+                data = self.get_clear_data(data_name)
+            else:
+                data = self.get_data(data_name)
+            yield data
+            if keys is not None:
+                datas = {data_name: data} if isinstance(data_name, str) else data
+                self._change_keys = {
+                    name: frozenset(keys)
+                    for name, value in datas.items()
+                    if isinstance(value, dict)
+                }
+            try:
+                if isinstance(data_name, str):
+                    self.write_data(data_name, data)
+                else:
+                    self.write_data(list(data.keys()), list(data.values()))
+            finally:
+                self._change_keys = {}
+
     def _clear_redundant_banned(
         self,
         banall_data: UserDataList,
@@ -440,6 +870,8 @@ class DatafileManager:
         pass_data: dict[str, UserDataList],
         umoban_data: UmoDataList,
         umopass_data: UmoDataList,
+        group_index: ScopeGroupIndex | None = None,
+        groupban_data: dict[str, UserDataList] | None = None,
     ) -> tuple[
         UserDataList,
         UserDataList,
@@ -449,8 +881,10 @@ class DatafileManager:
         UmoDataList,
     ]:
         """
-        清除冗余的禁用数据
+        清除冗余的禁用数据（group_index 与 groupban_data 用于判断会话 pass 是否仍有对应的会话组 ban）
         """
+        group_index = ScopeGroupIndex() if group_index is None else group_index
+        groupban_data = {} if groupban_data is None else groupban_data
 
         # 1. 处理 pass > ban 的情况：如果 pass_time > ban_time（且 ban_time != 0）或 pass_time == 0，移除 ban
         for umo in list(ban_data.keys()):
@@ -519,10 +953,20 @@ class DatafileManager:
         )
 
         # 3. 清理冗余的pass记录：pass_umo依赖ban_umo，pass_all依赖ban_all&任意的ban_umo，pass依赖与它一致的umo的ban&ban_all&任意的ban_umo
-        # 3a. 清理pass_umo：只保留有对应ban_umo的umo
+        # 3a. 清理pass_umo：只保留有对应ban_umo（含匹配的通配规则）的umo
         banumo_umos: set[str] = {item.umo for item in umoban_data}
+        banumo_patterns = UmoPatternTrie(
+            umo for umo in banumo_umos if is_umo_pattern(umo)
+        )
         umopass_data = UmoDataList(
-            [item for item in umopass_data if item.umo in banumo_umos]
+            [
+                item
+                for item in umopass_data
+                if item.umo in banumo_umos
+                # 通配的pass_umo与通配的ban_umo之间的覆盖关系不作判断，保守保留
+                or (banumo_patterns and is_umo_pattern(item.umo))
+                or banumo_patterns.match(item.umo)
+            ]
         )
         # 3b. 清理pass_all：只保留有对应ban_all的uid
         # 在umoban_data不为空的情况下，clear_all不执行
@@ -531,13 +975,32 @@ class DatafileManager:
             passall_data = UserDataList(
                 [item for item in passall_data if item.uid in banall_uids]
             )
-            # 3c. 清理pass：只保留有对应ban或banall的uid
+            # 3c. 清理pass：只保留有对应ban（含匹配的通配规则）或banall的uid
             # 在umoban_data不为空的情况下，clear不执行
+            ban_patterns = UmoPatternTrie(
+                key for key in ban_data.keys() if is_umo_pattern(key)
+            )
             for umo in list(pass_data.keys()):
                 combined_ban_uids: set[str] = set(banall_uids)
                 combined_ban_uids.update(
-                    item.uid for item in ban_data.get(umo, UserDataList())
+                    item.uid for item in ban_data.get(umo, EMPTY_USER_LIST)
                 )
+                # 通配的pass与通配的ban之间的覆盖关系不作判断，保守地计入所有通配ban
+                for pattern in (
+                    ban_patterns.match(umo)
+                    if not is_umo_pattern(umo)
+                    else [key for key in ban_data.keys() if is_umo_pattern(key)]
+                ):
+                    combined_ban_uids.update(item.uid for item in ban_data[pattern])
+                # 会话所属组的ban（通配的pass同样保守地计入所有组ban）
+                for group in (
+                    group_index.groups_of(umo)
+                    if not is_umo_pattern(umo)
+                    else groupban_data.keys()
+                ):
+                    combined_ban_uids.update(
+                        item.uid for item in groupban_data.get(group, EMPTY_USER_LIST)
+                    )
                 pass_data[umo] = UserDataList(
                     [item for item in pass_data[umo] if item.uid in combined_ban_uids]
                 )
@@ -555,6 +1018,64 @@ class DatafileManager:
 
         return banall_data, passall_data, ban_data, pass_data, umoban_data, umopass_data
 
+    def _clear_redundant_group(
+        self,
+        banall_data: UserDataList,
+        umoban_data: UmoDataList,
+        group_data: dict[str, UmoDataList],
+        groupban_data: dict[str, UserDataList],
+        grouppass_data: dict[str, UserDataList],
+    ) -> tuple[
+        dict[str, UmoDataList],
+        dict[str, UserDataList],
+        dict[str, UserDataList],
+    ]:
+        """
+        清除冗余的会话组数据（规则与会话级 pass/ban 一致）
+        """
+        # 1. 处理 group_pass > group_ban 的情况
+        for group in list(groupban_data.keys()):
+            if group in grouppass_data:
+                pass_time_map: dict[str, int] = {
+                    item.uid: item.time for item in grouppass_data[group]
+                }
+                groupban_data[group] = UserDataList(
+                    [
+                        ban_item
+                        for ban_item in groupban_data[group]
+                        if ban_item.uid not in pass_time_map
+                        or (
+                            pass_time_map[ban_item.uid] < ban_item.time
+                            and pass_time_map[ban_item.uid] != 0
+                        )
+                        or (ban_item.time == 0 and pass_time_map[ban_item.uid] != 0)
+                    ]
+                )
+
+        # 2. 清理group_pass：只保留有对应group_ban或banall的uid（umoban_data不为空时不执行）
+        if not umoban_data:
+            banall_uids: set[str] = {item.uid for item in banall_data}
+            for group in list(grouppass_data.keys()):
+                combined_ban_uids: set[str] = set(banall_uids)
+                combined_ban_uids.update(
+                    item.uid for item in groupban_data.get(group, EMPTY_USER_LIST)
+                )
+                grouppass_data[group] = UserDataList(
+                    [
+                        item
+                        for item in grouppass_data[group]
+                        if item.uid in combined_ban_uids
+                    ]
+                )
+
+        # 清除空键（没有成员的组视为不存在，但其 ban/pass 记录保留，重新加入成员后继续生效）
+        for data in (group_data, groupban_data, grouppass_data):
+            for key in list(data.keys()):
+                if not data[key]:
+                    del data[key]
+
+        return group_data, groupban_data, grouppass_data
+
     @overload
     def sync_and_clean_data(
         self,
@@ -581,7 +1102,7 @@ class DatafileManager:
 
         Args:
             no_return: 是否不返回数据，默认返回
-            need_data: 若需要返回数据，则此处为需要的数据名（ban/pass/banall/passall/umoban/umopass）
+            need_data: 若需要返回数据，则此处为需要的数据名（ban/pass/banall/passall/umoban/umopass/group/groupban/grouppass）
             have_data: 替代从磁盘中读出的数据，通常用于写入相关方法
             no_copy: 直接返回相应的对象，该对象与缓存指向的对象一致
 
@@ -589,50 +1110,135 @@ class DatafileManager:
             清理后的数据/None
         """
         # 获取锁，避免并发问题
-        with self._sync_lock:
-            # 提交置空
-            self._commits = {}
-            # 取数据（优先从 have_data 获取）
-            # 将 None 初始化为空字典（因为我懒得加 if 了）
-            have_data: dict[str, dict[str, UserDataList] | BaseModelList] = (
-                {} if have_data is None else have_data
-            )
-            banall_data: UserDataList = (
-                copy.deepcopy(have_data["banall"])
-                if "banall" in have_data
-                and isinstance(have_data["banall"], UserDataList)
-                else self._read_file(self.banall_list_filename)
-            )
-            passall_data: UserDataList = (
-                copy.deepcopy(have_data["passall"])
-                if "passall" in have_data
-                and isinstance(have_data["passall"], UserDataList)
-                else self._read_file(self.passall_list_filename)
-            )
-            ban_data: dict[str, UserDataList] = (
-                copy.deepcopy(have_data["ban"])
-                if "ban" in have_data and isinstance(have_data["ban"], dict)
-                else self._read_file(self.banlist_filename)
-            )
-            pass_data: dict[str, UserDataList] = (
-                copy.deepcopy(have_data["pass"])
-                if "pass" in have_data and isinstance(have_data["pass"], dict)
-                else self._read_file(self.passlist_filename)
-            )
-            umoban_data: UmoDataList = (
-                copy.deepcopy(have_data["umoban"])
-                if "umoban" in have_data
-                and isinstance(have_data["umoban"], UmoDataList)
-                else self._read_file(self.umo_ban_list_filename)
-            )
-            umopass_data: UmoDataList = (
-                copy.deepcopy(have_data["umopass"])
-                if "umopass" in have_data
-                and isinstance(have_data["umopass"], UmoDataList)
-                else self._read_file(self.umo_pass_list_filename)
+        lock_wait_start = time_module.perf_counter()
+        with self._sync_lock, self._process_lock:
+            sync_start = time_module.perf_counter()
+            _SYNC_LOCK_WAIT_SECONDS.observe(sync_start - lock_wait_start)
+            # 记录读取时的磁盘代数（此后其他进程的提交会使缓存失效）
+            self._disk_generation.refresh()
+            with self.tracer.operation("sync_and_clean_data") as root:
+                result = self._sync_and_clean_data_locked(
+                    root.attrs, no_return, need_data, have_data, no_copy
+                )
+            _SYNC_TOTAL.inc()
+            _SYNC_SECONDS.observe(time_module.perf_counter() - sync_start)
+            change, self._pending_change = self._pending_change, None
+        if change is not None:
+            self._notify(change)
+        return result
+
+    def subscribe(
+        self, callback: Callable[[DataChangeEvent], None]
+    ) -> Callable[[], None]:
+        """
+        订阅数据变更通知
+
+        每次同步后若有数据发生变更（写入，或清理过期/外部修改使记录数变化），
+        在同步线程中以 DataChangeEvent 调用 callback；回调应尽快返回，其异常会被记录并忽略。
+
+        Returns:
+            取消订阅的函数
+        """
+        self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _notify(self, change: DataChangeEvent) -> None:
+        """通知所有订阅者"""
+        for callback in list(self._subscribers):
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"数据变更回调 {callback!r} 出现异常：{e}")
+
+    def _load_data(
+        self,
+        have_data: dict[str, dict[str, UserDataList] | BaseModelList],
+        data_name: str,
+        filename: str,
+        data_type: type,
+    ) -> dict[str, UserDataList] | BaseModelList:
+        """
+        取数据（优先从 have_data 深拷贝，否则从磁盘读取）
+        """
+        if data_name in have_data and isinstance(have_data[data_name], data_type):
+            with self.tracer.span("deepcopy", data=data_name) as span:
+                data = copy.deepcopy(have_data[data_name])
+                span.attrs["records"] = self._count_records(data)
+                return data
+        return self._read_file(filename)
+
+    def _sync_and_clean_data_locked(
+        self,
+        stats: dict,
+        no_return: bool,
+        need_data: list[str] | None,
+        have_data: dict[str, dict[str, UserDataList] | BaseModelList] | None,
+        no_copy: bool,
+    ) -> dict[str, dict[str, UserDataList] | BaseModelList] | None:
+        """
+        sync_and_clean_data 的实现（调用时须持有 _sync_lock），stats 用于记录各数据的记录数
+        """
+        bytes_before = self.bytes_written
+        # 提交置空
+        self._commits = {}
+        # 取数据（优先从 have_data 获取）
+        # 将 None 初始化为空字典（因为我懒得加 if 了）
+        have_data: dict[str, dict[str, UserDataList] | BaseModelList] = (
+            {} if have_data is None else have_data
+        )
+        banall_data: UserDataList = self._load_data(
+            have_data, "banall", self.banall_list_filename, UserDataList
+        )
+        passall_data: UserDataList = self._load_data(
+            have_data, "passall", self.passall_list_filename, UserDataList
+        )
+        ban_data: dict[str, UserDataList] = self._load_data(
+            have_data, "ban", self.banlist_filename, dict
+        )
+        pass_data: dict[str, UserDataList] = self._load_data(
+            have_data, "pass", self.passlist_filename, dict
+        )
+        umoban_data: UmoDataList = self._load_data(
+            have_data, "umoban", self.umo_ban_list_filename, UmoDataList
+        )
+        umopass_data: UmoDataList = self._load_data(
+            have_data, "umopass", self.umo_pass_list_filename, UmoDataList
+        )
+        group_data: dict[str, UmoDataList] = self._load_data(
+            have_data, "group", self.group_list_filename, dict
+        )
+        groupban_data: dict[str, UserDataList] = self._load_data(
+            have_data, "groupban", self.group_ban_list_filename, dict
+        )
+        grouppass_data: dict[str, UserDataList] = self._load_data(
+            have_data, "grouppass", self.group_pass_list_filename, dict
+        )
+        # 清理前的记录数，用于判断本次同步是否实际修改了数据
+        loaded_counts: dict[str, int] = {
+            name: self._count_records(data)
+            for name, data in (
+                ("banall", banall_data),
+                ("passall", passall_data),
+                ("ban", ban_data),
+                ("pass", pass_data),
+                ("umoban", umoban_data),
+                ("umopass", umopass_data),
+                ("group", group_data),
+                ("groupban", groupban_data),
+                ("grouppass", grouppass_data),
             )
+        }
 
-            # 开始清理
+        # 开始清理
+        with self.tracer.span("clear_redundant"):
+            group_data, groupban_data, grouppass_data = self._clear_redundant_group(
+                banall_data, umoban_data, group_data, groupban_data, grouppass_data
+            )
             (
                 banall_data,
                 passall_data,
@@ -647,54 +1253,99 @@ class DatafileManager:
                 pass_data,
                 umoban_data,
                 umopass_data,
+                ScopeGroupIndex(group_data),
+                groupban_data,
             )
 
-            MODEL_LIST_REGISTRY._clear_task()
-
-            self._write_file_commit(self.banall_list_filename, banall_data)
-            self._write_file_commit(self.passall_list_filename, passall_data)
-            self._write_file_commit(self.banlist_filename, ban_data)
-            self._write_file_commit(self.passlist_filename, pass_data)
-            self._write_file_commit(self.umo_ban_list_filename, umoban_data)
-            self._write_file_commit(self.umo_pass_list_filename, umopass_data)
-
-            self._write_commits()
-
-            self._invalidate_and_reload_cache(
-                banall_data,
-                passall_data,
-                ban_data,
-                pass_data,
-                umoban_data,
-                umopass_data,
+        with self.tracer.span("clear_task"):
+            MODEL_LIST_REGISTRY.clear_lists(
+                self._iter_lists(
+                    banall_data,
+                    passall_data,
+                    ban_data,
+                    pass_data,
+                    umoban_data,
+                    umopass_data,
+                    group_data,
+                    groupban_data,
+                    grouppass_data,
+                )
             )
 
-            if no_return:
-                return None
+        self._write_file_commit(self.banall_list_filename, banall_data)
+        self._write_file_commit(self.passall_list_filename, passall_data)
+        self._write_file_commit(self.banlist_filename, ban_data)
+        self._write_file_commit(self.passlist_filename, pass_data)
+        self._write_file_commit(self.umo_ban_list_filename, umoban_data)
+        self._write_file_commit(self.umo_pass_list_filename, umopass_data)
+        self._write_file_commit(self.group_list_filename, group_data)
+        self._write_file_commit(self.group_ban_list_filename, groupban_data)
+        self._write_file_commit(self.group_pass_list_filename, grouppass_data)
+
+        self._write_commits()
+
+        self._invalidate_and_reload_cache(
+            banall_data,
+            passall_data,
+            ban_data,
+            pass_data,
+            umoban_data,
+            umopass_data,
+            group_data,
+            groupban_data,
+            grouppass_data,
+        )
 
-            full_data: dict[str, dict[str, UserDataList] | BaseModelList] = {
-                "banall": banall_data,
-                "passall": passall_data,
-                "ban": ban_data,
-                "pass": pass_data,
-                "umoban": umoban_data,
-                "umopass": umopass_data,
+        full_data: dict[str, dict[str, UserDataList] | BaseModelList] = {
+            "banall": banall_data,
+            "passall": passall_data,
+            "ban": ban_data,
+            "pass": pass_data,
+            "umoban": umoban_data,
+            "umopass": umopass_data,
+            "group": group_data,
+            "groupban": groupban_data,
+            "grouppass": grouppass_data,
+        }
+        for key, value in full_data.items():
+            stats[key] = self._count_records(value)
+        changed = tuple(
+            key
+            for key in full_data
+            if key in have_data
+            or stats[key] != self._record_counts.get(key, stats[key])
+        )
+        self._record_counts = {key: stats[key] for key in full_data}
+        if have_data or any(stats[key] != loaded_counts[key] for key in full_data):
+            # 数据有实际变更时递增磁盘代数，其他进程据此重建缓存
+            self._disk_generation.bump()
+        if changed:
+            # 清理未移除记录的数据，其变更范围即事务声明的键
+            keys = {
+                key: self._change_keys[key]
+                for key in changed
+                if key in self._change_keys and stats[key] == loaded_counts[key]
             }
+            self._pending_change = DataChangeEvent(self.generation, changed, keys)
+        stats["bytes"] = self.bytes_written - bytes_before
+        _SYNC_BYTES.observe(stats["bytes"])
+
+        if no_return:
+            return None
 
-            if not no_copy:
+        if not no_copy:
+            with self.tracer.span("copy_result"):
                 full_data = {
                     key: copy.deepcopy(value) for key, value in full_data.items()
                 }
 
-            if need_data:
-                if all(key in full_data for key in need_data):
-                    return {key: full_data[key] for key in need_data}
-                else:
-                    missing = "、".join(
-                        [key for key in need_data if key not in full_data]
-                    )
-                    raise ValueError(f"Missing required data field: {missing}")
-            return full_data
+        if need_data:
+            if all(key in full_data for key in need_data):
+                return {key: full_data[key] for key in need_data}
+            else:
+                missing = "、".join([key for key in need_data if key not in full_data])
+                raise ValueError(f"Missing required data field: {missing}")
+        return full_data
 
     @overload
     def get_clear_data(
@@ -717,6 +1368,9 @@ class DatafileManager:
         Returns:
             包含指定名称的数据项的字典（dict[str, dict[str, UserDataList] | BaseModelList]）或指定名称的数据项（dict[str, UserDataList] | BaseModelList）
         """
+        if self._banall_list_cache is None:
+            # 缓存尚未加载或已被 close() 丢弃（各缓存总是一同重建/丢弃），先从磁盘加载
+            self.sync_and_clean_data(no_return=True)
         full_data = {
             "banall": self._banall_list_cache,
             "passall": self._passall_list_cache,
@@ -724,6 +1378,9 @@ class DatafileManager:
             "pass": self._passlist_cache,
             "umoban": self._umo_ban_list_cache,
             "umopass": self._umo_pass_list_cache,
+            "group": self._group_list_cache,
+            "groupban": self._group_ban_list_cache,
+            "grouppass": self._group_pass_list_cache,
         }
         if not no_copy:
             full_data = {key: copy.deepcopy(value) for key, value in full_data.items()}
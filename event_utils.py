@@ -1,16 +1,86 @@
+import math
+import sys
+import threading
+import time as time_module
+from collections import OrderedDict
+from collections.abc import Iterator
+
 from astrbot.api.event import AstrMessageEvent
 import astrbot.api.message_components as Comp
 from astrbot.api.star import Context
 from .user_manager import (
-    UserDataModel,
     UserDataList,
-    UmoDataModel,
-    UmoDataList,
     BaseDataModel,
     BaseModelList,
+    EMPTY_USER_LIST,
 )
 from .datafile_manager import DatafileManager
 from .exceptions import AtUserCountError
+from .umo_pattern import UmoPatternIndex
+from .metrics import METRICS
+from .verdict_cache import VerdictCache
+
+_IS_BANNED_SECONDS = METRICS.histogram("reneban_is_banned_seconds", "禁用判定耗时（秒）")
+_VERDICT_BANNED = METRICS.counter("reneban_verdict_banned_total", "判定为禁用的次数")
+_VERDICT_ALLOWED = METRICS.counter("reneban_verdict_allowed_total", "判定为放行的次数")
+
+
+class UmoResolver:
+    """
+    UMO 解析缓存
+
+    unique_session 配置按配置对象缓存，配置对象更换或超过 refresh_interval 秒后重新读取；
+    隔离会话下拼接出的 UMO 以 (platform_id, message_type, group_id) 为键驻留在容量为 max_entries 的 LRU 表中，
+    命中时直接返回同一个字符串对象，不再拼接新的字符串。
+    """
+
+    def __init__(self, max_entries: int = 4096, refresh_interval: float = 5.0):
+        self.max_entries = max_entries
+        self.refresh_interval = refresh_interval
+        self._config_id: int | None = None
+        self._unique_session = False
+        self._checked_at = 0.0
+        self._umos: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._umos)
+
+    def unique_session(self, context: Context) -> bool:
+        """获取 unique_session 配置（带缓存）"""
+        now = time_module.monotonic()
+        config = context.get_config()
+        if (
+            id(config) != self._config_id
+            or now - self._checked_at >= self.refresh_interval
+        ):
+            self._unique_session = bool(config["platform_settings"]["unique_session"])
+            self._config_id = id(config)
+            self._checked_at = now
+        return self._unique_session
+
+    def group_umo(self, platform_id: str, message_type: str, group_id: str) -> str:
+        """获取群聊的 UMO（驻留字符串）"""
+        key = (platform_id, message_type, group_id)
+        with self._lock:
+            umo = self._umos.get(key)
+            if umo is not None:
+                self._umos.move_to_end(key)
+                return umo
+            umo = sys.intern(f"{platform_id}:{message_type}:{group_id}")
+            self._umos[key] = umo
+            if len(self._umos) > self.max_entries:
+                self._umos.popitem(last=False)
+            return umo
+
+    def clear(self) -> None:
+        """清空缓存（下次解析时重新读取配置）"""
+        with self._lock:
+            self._umos.clear()
+            self._config_id = None
+
+
+UMO_RESOLVER = UmoResolver()
 
 
 class EventUtils:
@@ -38,72 +108,156 @@ class EventUtils:
         # 返回第一个（也是唯一一个）At 用户，如果没有则返回 None
         return at_users[0] if at_users else None
 
+    @staticmethod
+    def get_event_ats(event: AstrMessageEvent) -> list[str]:
+        """
+        获取所有被at的用户uid（不含bot自身，去重并保持顺序）
+        """
+        return list(
+            dict.fromkeys(
+                str(seg.qq)
+                for seg in event.get_messages()
+                if isinstance(seg, Comp.At) and str(seg.qq) != event.get_self_id()
+            )
+        )
+
+    @staticmethod
+    def get_event_plain_args(event: AstrMessageEvent) -> list[str]:
+        """
+        获取命令在纯文本段中的参数（去掉 At 段与命令名本身，按空白拆分）
+        """
+        return EventUtils.get_event_plain_text(event).split()[1:]
+
+    @staticmethod
+    def get_event_plain_text(event: AstrMessageEvent) -> str:
+        """
+        获取消息中所有纯文本段拼接后的文本
+        """
+        return "".join(
+            seg.text for seg in event.get_messages() if isinstance(seg, Comp.Plain)
+        )
+
     @staticmethod
     def is_banned(
         enable: bool,
         data_manager: DatafileManager,
         context: Context,
         event: AstrMessageEvent,
+        verdict_cache: VerdictCache | None = None,
     ) -> tuple[bool, str | None]:
         """
         判断用户是否被禁用，以及其理由
         """
+        with _IS_BANNED_SECONDS.time():
+            # 获取UMO与UID
+            umo = EventUtils.get_event_umo(context, event)
+            uid = event.get_sender_id()
+            result = EventUtils.check_banned(
+                enable, data_manager, umo, uid, verdict_cache
+            )
+        (_VERDICT_BANNED if result[0] else _VERDICT_ALLOWED).inc()
+        return result
+
+    @staticmethod
+    def check_banned(
+        enable: bool,
+        data_manager: DatafileManager,
+        umo: str,
+        uid: str,
+        verdict_cache: VerdictCache | None = None,
+    ) -> tuple[bool, str | None]:
+        """
+        根据 UMO 与 UID 判断用户是否被禁用，以及其理由（is_banned 的核心逻辑，不依赖事件对象）
+
+        传入 verdict_cache 时优先使用缓存的判定结果，未命中时计算并写入缓存。
+        """
         # 禁用功能未启用
         if not enable:
             return (False, None)
 
-        # 检查缓存是否有效
-        if data_manager.is_cache_valid():
-            data_dict: dict[str, dict[str, UserDataList] | BaseModelList] = (
-                data_manager.get_clear_data()
-            )
-        else:
-            data_dict: dict[str, dict[str, UserDataList] | BaseModelList] = (
-                data_manager.get_data()
-            )
+        # 检查缓存是否有效（只读查找，直接使用缓存对象而不深拷贝）
+        if not data_manager.is_cache_valid():
+            data_manager.sync_and_clean_data(no_return=True)
 
-        # 获取UMO与UID
-        umo = EventUtils.get_event_umo(context, event)
-        uid = event.get_sender_id()
+        now = time_module.time()
+        if verdict_cache:
+            verdict = verdict_cache.get(umo, uid, now)
+            if verdict is not None:
+                return verdict
+        generation = data_manager.generation
+        verdict, deadline = EventUtils._evaluate(data_manager, umo, uid, now)
+        if verdict_cache:
+            verdict_cache.put(umo, uid, generation, verdict, deadline)
+        return verdict
 
-        # pass
-        pass_data: UserDataModel | None = (
-            data_dict["pass"].get(umo, UserDataList()).find_by_id(uid)
-        )
-        if pass_data:
-            return (False, pass_data.reason)
-        # ban
-        ban_data: UserDataModel | None = (
-            data_dict["ban"].get(umo, UserDataList()).find_by_id(uid)
+    @staticmethod
+    def _evaluate(
+        data_manager: DatafileManager, umo: str, uid: str, now: float
+    ) -> tuple[tuple[bool, str | None], float]:
+        """
+        按优先级依次查找记录，返回判定结果及其截止时间
+
+        已过期但尚未被后台任务清理的记录视为不存在；
+        截止时间为决定判定结果的记录的到期时间戳（永久记录或未命中任何记录时为无穷大）。
+        """
+        for lst, id_value, banned in EventUtils._candidates(data_manager, umo, uid):
+            item: BaseDataModel | None = lst.find_by_id(id_value, no_copy=True)
+            if item is None or (item.time != 0 and item.time < now):
+                continue
+            return ((banned, item.reason), item.time if item.time != 0 else math.inf)
+        return ((False, None), math.inf)
+
+    @staticmethod
+    def _candidates(
+        data_manager: DatafileManager, umo: str, uid: str
+    ) -> Iterator[tuple[BaseModelList, str, bool]]:
+        """
+        按优先级惰性生成待查找的 (列表, ID, 命中时是否禁用)
+        """
+        data_dict: dict[str, dict[str, UserDataList] | BaseModelList] = (
+            data_manager.get_clear_data(no_copy=True)
         )
-        if ban_data:
-            return (True, ban_data.reason)
+        patterns: UmoPatternIndex = data_manager.get_umo_patterns()
+
+        # pass/ban
+        yield (data_dict["pass"].get(umo, EMPTY_USER_LIST), uid, False)
+        yield (data_dict["ban"].get(umo, EMPTY_USER_LIST), uid, True)
+        # 通配 UMO 的 pass/ban（按具体程度依次查找）
+        for pattern in patterns.pass_.match(umo):
+            yield (data_dict["pass"].get(pattern, EMPTY_USER_LIST), uid, False)
+        for pattern in patterns.ban.match(umo):
+            yield (data_dict["ban"].get(pattern, EMPTY_USER_LIST), uid, True)
+        # 会话组的 pass/ban（介于会话与全局之间）
+        groups: tuple[str, ...] = data_manager.get_group_index().groups_of(umo)
+        for group in groups:
+            yield (data_dict["grouppass"].get(group, EMPTY_USER_LIST), uid, False)
+        for group in groups:
+            yield (data_dict["groupban"].get(group, EMPTY_USER_LIST), uid, True)
         # pass-all
-        passall_data: UserDataModel | None = data_dict["passall"].find_by_id(uid)
-        if passall_data:
-            return (False, passall_data.reason)
+        yield (data_dict["passall"], uid, False)
         # ban-all
-        banall_data: UserDataModel | None = data_dict["banall"].find_by_id(uid)
-        if banall_data:
-            return (True, banall_data.reason)
+        yield (data_dict["banall"], uid, True)
         # pass-umo
-        passumo_data: UmoDataModel | None = data_dict["umopass"].find_by_id(umo)
-        if passumo_data:
-            return (False, passumo_data.reason)
+        yield (data_dict["umopass"], umo, False)
         # ban-umo
-        banumo_data: UmoDataModel | None = data_dict["umoban"].find_by_id(umo)
-        if banumo_data:
-            return (True, banumo_data.reason)
-        return (False, None)
+        yield (data_dict["umoban"], umo, True)
+        # 通配的 pass-umo/ban-umo
+        for pattern in patterns.umopass.match(umo):
+            yield (data_dict["umopass"], pattern, False)
+        for pattern in patterns.umoban.match(umo):
+            yield (data_dict["umoban"], pattern, True)
 
     @staticmethod
     def get_event_umo(context: Context, event: AstrMessageEvent) -> str:
         """
         获取 umo 信息 （当 unique_session 为 True 时，仍返回 platform_id:message_type:group_id 以便处理）
         """
-        if (
-            context.get_config()["platform_settings"]["unique_session"]
-            and event.get_group_id()
-        ):
-            return f"{event.session.platform_id}:{event.session.message_type.value}:{event.get_group_id()}"
+        if UMO_RESOLVER.unique_session(context):
+            group_id = event.get_group_id()
+            if group_id:
+                return UMO_RESOLVER.group_umo(
+                    event.session.platform_id,
+                    event.session.message_type.value,
+                    group_id,
+                )
         return event.unified_msg_origin
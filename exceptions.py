@@ -48,3 +48,19 @@ class PermanentRecordTimeSubtractionError(PermanentRecordTimeError):
     """
 
     pass
+
+
+class RecordNotFoundError(LookupError):
+    """
+    记录不存在错误（在 DatafileManager.transaction() 代码块内找不到要操作的记录时抛出，以放弃写回）
+    """
+
+    pass
+
+
+class RecordExistsError(LookupError):
+    """
+    记录已存在错误（在 DatafileManager.transaction() 代码块内要添加的记录已存在时抛出，以放弃写回）
+    """
+
+    pass
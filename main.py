@@ -1,10 +1,14 @@
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, StarTools
 from astrbot.api import logger, AstrBotConfig
+import asyncio
+import shutil
 import time as time_module
+from collections.abc import Callable, Iterable
+from pathlib import Path
 
 from . import strings, time_utils
-from .datafile_manager import DatafileManager
+from .datafile_manager import DatafileManager, DataChangeEvent
 from .user_manager import (
     BaseModelList,
     BaseDataModel,
@@ -14,8 +18,29 @@ from .user_manager import (
     UmoDataList,
     ModelListRegistry,
     MODEL_LIST_REGISTRY,
+    EMPTY_USER_LIST,
+    EMPTY_UMO_LIST,
+    REASON_TABLE,
+)
+from .event_utils import EventUtils, UMO_RESOLVER
+from .trace_utils import TraceRecorder, TraceReplayer, ReplayReport, FILTER_COMMAND
+from .metrics import METRICS
+from .profiling import SamplingProfiler, profiled
+from .memory_utils import measure_memory, measure_resources
+from .content_filter import ContentFilter
+from .rate_limiter import FloodGuard
+from .strike_manager import StrikeTable, GLOBAL_SCOPE, ladder_time
+from .bulk_io import import_records, export_records, BULK_IO_ERRORS
+from .replication import ReplicationPublisher, ReplicationFollower
+from .merge import merge_records
+from .record_index import RecordIndexCache, IndexedRecord, SEARCH_RESULT_LIMIT
+from .verdict_cache import VerdictCache
+from .banlist_view import (
+    BanlistRenderer,
+    PageOutOfRangeError,
+    SCOPES as BANLIST_SCOPES,
+    split_chunks,
 )
-from .event_utils import EventUtils
 from .exceptions import *
 
 
@@ -26,178 +51,718 @@ class ReNeBan(Star):
         self.enable = config.get("enable", True)
         # 从插件配置中获取缓存存活时间，默认为60秒
         cache_ttl = config.get("cache_ttl", 60)
+        # 在事件循环上启动过期清理任务（构造时没有运行中的事件循环则推迟到首条消息）
         MODEL_LIST_REGISTRY.start()
         # 初始化数据文件管理器
+        data_dir = StarTools.get_data_dir()
         self.data_manager = DatafileManager(
-            StarTools.get_data_dir(), cache_ttl=cache_ttl
+            data_dir,
+            cache_ttl=cache_ttl,
+            slow_threshold_ms=config.get("slow_sync_threshold_ms", 500),
+            node_id=config.get("node_id") or None,
+            tombstone_retention=self._parse_config_time(
+                config.get("tombstone_retention", "30d"), "tombstone_retention", 2592000
+            ),
+        )
+        # 从插件配置中获取内容过滤规则，命中后自动禁用
+        self.content_filter = ContentFilter(
+            config.get("content_keywords", []), config.get("content_patterns", [])
+        )
+        self.content_ban_time = self._parse_config_time(
+            config.get("content_ban_time", "1h"), "content_ban_time", 3600
+        )
+        # 从插件配置中获取刷屏防护参数，超过限制的消息被丢弃，并可自动禁用
+        self.flood_guard = FloodGuard(
+            config.get("flood_limit", 0),
+            config.get("flood_window", 10),
+            config.get("flood_max_entries", 100000),
+        )
+        flood_ban_time = config.get("flood_ban_time", "")
+        self.flood_ban_time: int | None = (
+            self._parse_config_time(flood_ban_time, "flood_ban_time", 600)
+            if flood_ban_time
+            else None
+        )
+        # 从插件配置中获取违规阶梯，第 n 次违规按第 n 级时长禁用
+        self.strike_ladder: list[int] = [
+            self._parse_config_time(timestr, "strike_ladder", 3600)
+            for timestr in config.get("strike_ladder", ["10m", "1h", "1d", "7d"])
+        ] or [600, 3600, 86400, 604800]
+        self.strikes = StrikeTable(
+            data_dir / "strike_list.msgpack",
+            self._parse_config_time(
+                config.get("strike_decay", "30d"), "strike_decay", 2592000
+            ),
+        )
+        # 自动禁用（内容过滤/刷屏防护）是否按违规阶梯计算时长
+        self.strike_auto_ban: bool = config.get("strike_auto_ban", False)
+        # 分页名单渲染器（/banlist）
+        self.banlist_renderer = BanlistRenderer(
+            self.data_manager,
+            config.get("banlist_page_size", 20),
+            config.get("banlist_chunk_chars", 2000),
+        )
+        # 到期/理由/ID 二级索引（/banlist --expiring、/ban-search、/dec-by）
+        self.record_index = RecordIndexCache(self.data_manager)
+        # 从插件配置中获取判定缓存容量，同一 (会话, 用户) 的重复判定直接命中缓存
+        self.verdict_cache = VerdictCache(
+            self.data_manager, config.get("verdict_cache_size", 10000)
+        )
+        # 按需采样器（/ban-profile）
+        self.profiler = SamplingProfiler()
+        # 从插件配置中获取复制模式（publish：发布本节点的变更；follow：应用共享目录中的变更）
+        self.replication_publisher: ReplicationPublisher | None = None
+        self.replication_follower: ReplicationFollower | None = None
+        replication_mode = config.get("replication_mode", "off")
+        replication_dir = config.get("replication_dir", "")
+        if replication_mode in ("publish", "follow") and not replication_dir:
+            logger.error("未配置 replication_dir，复制功能未启用")
+        elif replication_mode == "publish":
+            self.replication_publisher = ReplicationPublisher(
+                self.data_manager,
+                Path(replication_dir),
+                config.get("replication_scopes") or None,
+            )
+            self.replication_publisher.start()
+        elif replication_mode == "follow":
+            self.replication_follower = ReplicationFollower(
+                self.data_manager,
+                Path(replication_dir),
+                data_dir / "replication.checkpoint",
+                config.get("replication_interval", 2),
+            )
+            self.replication_follower.start()
+        # 从插件配置中获取是否开启流量采集，默认为关闭
+        self.trace_recorder: TraceRecorder | None = (
+            TraceRecorder(data_dir / "trace.msgpack")
+            if config.get("trace_capture", False)
+            else None
         )
 
-    @filter.command("banlist")
-    async def banlist(self, event: AstrMessageEvent):
+    @staticmethod
+    def _parse_config_time(timestr: str, key: str, default: int) -> int:
         """
-        显示当前群禁用名单
+        解析配置中的时间字符串，格式错误时记录日志并返回默认值
         """
-        # 禁用功能未启用
-        if not self.enable:
-            group_banned_text = (
-                strings.messages["group_banned_list"]
-                + strings.messages["no_group_banned"]
-            )
-            global_banned_text = (
-                strings.messages["global_banned_list"]
-                + strings.messages["no_global_banned"]
-            )
-            group_passed_text = (
-                strings.messages["group_passed_list"]
-                + strings.messages["no_group_passed"]
+        try:
+            return time_utils.timestr_to_int(str(timestr))
+        except TimestrValueError:
+            logger.error(f"配置项 {key} 的时间字符串 {timestr!r} 格式错误，已使用默认值")
+            return default
+
+    # ---- 供其他插件调用的查询接口（直接读取内存缓存，不触发写盘） ----
+
+    def is_banned(self, uid: str, umo: str) -> tuple[bool, str | None]:
+        """
+        判断用户在指定会话中是否被禁用，以及其理由（判定规则与消息过滤器一致）
+
+        Args:
+            uid: 用户 ID
+            umo: 会话（unified_msg_origin）
+
+        Returns:
+            (是否被禁用, 理由)
+        """
+        return EventUtils.check_banned(
+            self.enable, self.data_manager, umo, uid, self.verdict_cache
+        )
+
+    def check_many(
+        self, targets: Iterable[tuple[str, str]]
+    ) -> list[tuple[bool, str | None]]:
+        """
+        批量判断 (UID, UMO) 是否被禁用，结果顺序与输入一致
+        """
+        if not self.data_manager.is_cache_valid():
+            self.data_manager.sync_and_clean_data(no_return=True)
+        return [
+            EventUtils.check_banned(
+                self.enable, self.data_manager, umo, uid, self.verdict_cache
             )
-            global_passed_text = (
-                strings.messages["global_passed_list"]
-                + strings.messages["no_global_passed"]
+            for uid, umo in targets
+        ]
+
+    def get_record(
+        self, scope: str, id_value: str, key: str | None = None
+    ) -> dict[str, str | int] | None:
+        """
+        获取一条记录
+
+        Args:
+            scope: 数据名（ban/pass/banall/passall/umoban/umopass/group/groupban/grouppass）
+            id_value: 记录 ID（UID 或 UMO）
+            key: ban/pass 的 UMO 或会话组数据的组名，列表结构的数据无需提供
+
+        Returns:
+            记录字典（uid/umo、time、reason），不存在或已过期时返回 None
+
+        Raises:
+            KeyError: 数据名未知
+            ValueError: 字典结构的数据未提供 key
+        """
+        if not self.data_manager.is_cache_valid():
+            self.data_manager.sync_and_clean_data(no_return=True)
+        data = self.data_manager.get_clear_data(scope, no_copy=True)
+        if isinstance(data, dict):
+            if key is None:
+                raise ValueError(f"{scope} 需要提供 key")
+            data = data.get(key, EMPTY_USER_LIST)
+        item = data.find_by_id(id_value, no_copy=True)
+        if item is None or (item.time != 0 and item.time <= time_module.time()):
+            return None
+        return item.to_dict()
+
+    def subscribe(
+        self, callback: Callable[[DataChangeEvent], None]
+    ) -> Callable[[], None]:
+        """
+        订阅数据变更通知，返回取消订阅的函数（详见 DatafileManager.subscribe()）
+        """
+        return self.data_manager.subscribe(callback)
+
+    def _add_record(
+        self,
+        data_name: str,
+        target: str,
+        update_time: int,
+        reason: str | None,
+        key: str | None = None,
+    ) -> None:
+        """
+        在一次事务中为目标增加记录，已有记录则叠加时长
+        会阻塞（加锁并落盘），异步处理器中应经 asyncio.to_thread 调用
+
+        Args:
+            data_name: 数据名
+            target: UID 或 UMO
+            update_time: 时长（0 为永久）
+            reason: 理由
+            key: 以会话或组名为键的数据（ban/pass/groupban/grouppass）的键
+
+        Raises:
+            PermanentRecordTimeError: 已有永久记录
+        """
+        with self.data_manager.transaction(
+            data_name, keys=None if key is None else (key,)
+        ) as data:
+            if key is None:
+                target_list: BaseModelList = data
+            else:
+                if data.get(key) is None:
+                    data[key] = UserDataList()
+                target_list: BaseModelList = data[key]
+            if not target_list.add_time_to_data(target, update_time, reason):
+                expire_time = (
+                    (int(time_module.time()) + update_time) if update_time != 0 else 0
+                )
+                target_list.append(
+                    UmoDataModel(umo=target, time=expire_time, reason=reason)
+                    if isinstance(target_list, UmoDataList)
+                    else UserDataModel(uid=target, time=expire_time, reason=reason)
+                )
+
+    def _subtract_record(
+        self,
+        data_name: str,
+        target: str,
+        remove_time: int,
+        reason: str | None,
+        key: str | None = None,
+    ) -> None:
+        """
+        在一次事务中减少目标记录的时长，记录被取消时写入墓碑
+        会阻塞（加锁并落盘），异步处理器中应经 asyncio.to_thread 调用
+
+        Args:
+            data_name: 数据名
+            target: UID 或 UMO
+            remove_time: 时长（0 为删除记录）
+            reason: 理由
+            key: 以会话或组名为键的数据（ban/pass/groupban/grouppass）的键
+
+        Raises:
+            RecordNotFoundError: 没有该目标的记录
+            PermanentRecordTimeError: 对永久记录减少非零时长
+        """
+        with self.data_manager.transaction(
+            data_name, keys=None if key is None else (key,)
+        ) as data:
+            target_list: BaseModelList = (
+                data if key is None else data.get(key, EMPTY_USER_LIST)
             )
-            umo_banned_text = (
-                strings.messages["umo_banned_list"] + strings.messages["no_umo_banned"]
+            if not target_list.subtract_time_from_data(target, remove_time, reason):
+                raise RecordNotFoundError(target)
+            # time 为 1 表示记录已被取消，视为删除
+            cancelled = target_list.find_by_id(target, no_copy=True).time == 1
+        if cancelled:
+            self.data_manager.record_tombstones([(data_name, key or "", target)])
+
+    def _add_group_member(self, group: str, umo: str) -> None:
+        """
+        在一次事务中将会话加入会话组（组不存在时自动创建）
+        会阻塞（加锁并落盘），异步处理器中应经 asyncio.to_thread 调用
+
+        Raises:
+            RecordExistsError: 会话已在组内
+        """
+        with self.data_manager.transaction("group", keys=(group,)) as group_data:
+            if group_data.get(group) is None:
+                group_data[group] = UmoDataList()
+            if group_data[group].find_by_id(umo):
+                raise RecordExistsError(umo)
+            group_data[group].append(UmoDataModel(umo=umo, time=0))
+
+    def _remove_group_member(self, group: str, umo: str) -> None:
+        """
+        在一次事务中将会话移出会话组并写入墓碑
+        会阻塞（加锁并落盘），异步处理器中应经 asyncio.to_thread 调用
+
+        Raises:
+            RecordNotFoundError: 会话不在组内
+        """
+        with self.data_manager.transaction("group", keys=(group,)) as group_data:
+            if not group_data.get(group, EMPTY_UMO_LIST).remove_by_id(umo):
+                raise RecordNotFoundError(umo)
+        self.data_manager.record_tombstones([("group", group, umo)])
+
+    def _remove_records(self, targets: dict[tuple[str, str], set[str]]) -> int:
+        """
+        在一次事务中删除指定记录并写入墓碑，每个列表只重建一次
+        会阻塞（加锁并落盘），异步处理器中应经 asyncio.to_thread 调用
+
+        Args:
+            targets: (数据名, 键) -> 要删除的 ID 集合
+
+        Returns:
+            删除的记录数
+        """
+        removed: list[tuple[str, str, str]] = []
+        with self.data_manager.transaction(
+            sorted({scope for scope, _ in targets})
+        ) as data:
+            for (scope, key), ids in targets.items():
+                container = data[scope]
+                lst: BaseModelList = container.get(key) if key else container
+                if lst is None:
+                    continue
+                kept = type(lst)(
+                    [item for item in lst if item._get_id_field_value() not in ids]
+                )
+                removed.extend(
+                    (scope, key or "", item._get_id_field_value())
+                    for item in lst
+                    if item._get_id_field_value() in ids
+                )
+                if key:
+                    container[key] = kept
+                else:
+                    data[scope] = kept
+        self.data_manager.record_tombstones(removed)
+        return len(removed)
+
+    def _reset_uid(self, uid: str) -> None:
+        """
+        在一次事务中删除用户的所有记录与违规计数并写入墓碑
+        会阻塞（加锁并落盘），异步处理器中应经 asyncio.to_thread 调用
+        """
+        self.strikes.reset_uid(uid)
+        removed: list[tuple[str, str, str]] = []
+        with self.data_manager.transaction(
+            ["ban", "pass", "banall", "passall", "groupban", "grouppass"]
+        ) as user_datas:
+            for data_name in ("ban", "pass", "groupban", "grouppass"):
+                for key in list(user_datas[data_name].keys()):
+                    if user_datas[data_name][key].remove_by_id(uid):
+                        removed.append((data_name, key, uid))
+            for data_name in ("banall", "passall"):
+                if user_datas[data_name].remove_by_id(uid):
+                    removed.append((data_name, "", uid))
+        self.data_manager.record_tombstones(removed)
+
+    def _reset_umo(self, umo: str) -> None:
+        """
+        在一次事务中删除会话的所有记录并将其移出所有会话组，写入墓碑
+        会阻塞（加锁并落盘），异步处理器中应经 asyncio.to_thread 调用
+        """
+        removed: list[tuple[str, str, str]] = []
+        with self.data_manager.transaction(["umoban", "umopass", "group"]) as umo_datas:
+            for data_name in ("umoban", "umopass"):
+                if umo_datas[data_name].remove_by_id(umo):
+                    removed.append((data_name, "", umo))
+            for group, members in umo_datas["group"].items():
+                if members.remove_by_id(umo):
+                    removed.append(("group", group, umo))
+        self.data_manager.record_tombstones(removed)
+
+    def _apply_strike(
+        self, umo: str | None, uid: str, reason: str | None
+    ) -> tuple[int, int]:
+        """
+        记录一次违规，并按违规阶梯禁用用户（umo 为 None 时为全局）
+
+        Returns:
+            (违规计数, 本次禁用时长)
+
+        Raises:
+            PermanentRecordTimeError: 已有永久记录（此时不计入本次违规）
+        """
+        scope = GLOBAL_SCOPE if umo is None else umo
+        count = self.strikes.add(scope, uid)
+        update_time = ladder_time(self.strike_ladder, count)
+        try:
+            self._add_record(
+                "banall" if umo is None else "ban", uid, update_time, reason, umo
             )
-            umo_passed_text = (
-                strings.messages["umo_passed_list"] + strings.messages["no_umo_passed"]
+        except PermanentRecordTimeError:
+            self.strikes.undo(scope, uid)
+            raise
+        return count, update_time
+
+    def _auto_ban(self, umo: str, uid: str, update_time: int, reason: str) -> None:
+        """
+        在指定会话内自动禁用用户（已有记录则叠加时长，已有永久记录则保持不变）
+        开启 strike_auto_ban 时按违规阶梯计算时长（会阻塞，过滤器中经 asyncio.to_thread 调用）
+        """
+        try:
+            if self.strike_auto_ban:
+                self._apply_strike(umo, uid, reason)
+            else:
+                self._add_record("ban", uid, update_time, reason, umo)
+        except PermanentRecordTimeError:
+            return
+        logger.warning(f"已在 {umo} 自动禁用 {uid}，理由：{reason}")
+
+    @staticmethod
+    def _split_targets(targets: str) -> list[str]:
+        """
+        拆分以逗号（半角或全角）分隔的 UID/UMO 列表，去重并保持顺序
+        """
+        return list(
+            dict.fromkeys(
+                target.strip()
+                for target in targets.replace("，", ",").split(",")
+                if target.strip()
             )
+        )
+
+    def _parse_batch_args(
+        self,
+        event: AstrMessageEvent,
+        targets: str,
+        args: list[str | None],
+        max_args: int,
+        use_ats: bool = True,
+    ) -> tuple[list[str], list[str | None]] | None:
+        """
+        解析批量命令的目标与其余参数
+
+        消息中含有 At 时，目标为所有被 at 的用户，其余参数从纯文本段中重新解析（At 会占用位置参数）；
+        否则目标为以逗号分隔的 UID/UMO 列表。
+
+        Returns:
+            (目标列表, 长度为 max_args 的其余参数列表)，语法错误时返回 None
+        """
+        ats: list[str] = EventUtils.get_event_ats(event) if use_ats else []
+        if ats:
+            target_list = ats
+            rest: list[str | None] = list(EventUtils.get_event_plain_args(event))
         else:
-            # 获取UMO
-            umo = EventUtils.get_event_umo(self.context, event)
-            data: dict[str, dict[str, UserDataList] | BaseModelList] = (
-                self.data_manager.get_data()
+            target_list = self._split_targets(targets)
+            rest = [arg for arg in args if arg is not None]
+        if not target_list or len(rest) > max_args:
+            return None
+        return target_list, rest + [None] * (max_args - len(rest))
+
+    def _batch_add(
+        self,
+        data_name: str,
+        targets: list[str],
+        update_time: int,
+        reason: str | None,
+        umo: str | None = None,
+    ) -> dict[str, bool]:
+        """
+        在一次事务中为多个目标增加记录（已有记录则叠加时长），只进行一次清理与落盘
+        会阻塞（加锁并落盘），异步处理器中应经 asyncio.to_thread 调用
+
+        Args:
+            data_name: 数据名（ban/pass 需提供 umo）
+            targets: UID 或 UMO 列表
+            update_time: 时长（0 为永久）
+            reason: 理由
+            umo: ban/pass 的会话
+
+        Returns:
+            {目标: 是否成功}，已有永久记录的目标为 False
+        """
+        results: dict[str, bool] = {}
+        with self.data_manager.transaction(data_name) as data:
+            if isinstance(data, dict):
+                if data.get(umo) is None:
+                    data[umo] = UserDataList()
+                target_list: BaseModelList = data[umo]
+            else:
+                target_list: BaseModelList = data
+            expire_time = (
+                (int(time_module.time()) + update_time) if update_time != 0 else 0
             )
-            # get_pass
-            try:
-                group_passed_list = data["pass"][umo]
-            except KeyError:
-                group_passed_list = UserDataList()
-            # get_pass-all
-            global_passed_list: UserDataList = data["passall"]
-            # get_ban
-            try:
-                group_banned_list = data["ban"][umo]
-            except KeyError:
-                group_banned_list = UserDataList()
-            # get_ban-all
-            global_banned_list: UserDataList = data["banall"]
-            # get_pass-umo
-            umo_passed_list: UmoDataList = data["umopass"]
-            # get_ban-umo
-            umo_banned_list: UmoDataList = data["umoban"]
-
-            # 生成结果
-            group_banned_str_list = [
-                strings.messages["banlist_strlist_format"].format(
-                    id=item.uid,
-                    time=time_utils.timelast_format(
-                        (item.time - int(time_module.time())) if item.time != 0 else 0
-                    ),
-                    reason=item.reason
-                    if item.reason
-                    else strings.messages["no_reason"],
-                )
-                for item in group_banned_list
-            ]
-            if not group_banned_str_list:
-                group_banned_str_list.append(strings.messages["no_group_banned"])
+            for target in targets:
+                try:
+                    if not target_list.add_time_to_data(target, update_time, reason):
+                        target_list.append(
+                            UmoDataModel(umo=target, time=expire_time, reason=reason)
+                            if isinstance(target_list, UmoDataList)
+                            else UserDataModel(
+                                uid=target, time=expire_time, reason=reason
+                            )
+                        )
+                    results[target] = True
+                except PermanentRecordTimeError:
+                    results[target] = False
+        return results
 
-            global_banned_str_list = [
-                strings.messages["banlist_strlist_format"].format(
-                    id=item.uid,
-                    time=time_utils.timelast_format(
-                        (item.time - int(time_module.time())) if item.time != 0 else 0
-                    ),
-                    reason=item.reason
-                    if item.reason
-                    else strings.messages["no_reason"],
+    @staticmethod
+    def _batch_report(
+        action: str, scope: str, time: str, reason: str | None, results: dict[str, bool]
+    ) -> str:
+        """生成批量命令的逐项结果"""
+        success = sum(results.values())
+        return strings.messages["batch_done"].format(
+            action=action,
+            scope=scope,
+            time=time_utils.time_format(time),
+            reason=strings.reason_format(reason),
+            success=success,
+            failed=len(results) - success,
+            details="".join(
+                strings.messages["batch_result_format"].format(
+                    target=target,
+                    result=strings.messages[
+                        "batch_success" if ok else "batch_permanent"
+                    ],
                 )
-                for item in global_banned_list
-            ]
-            if not global_banned_str_list:
-                global_banned_str_list.append(strings.messages["no_global_banned"])
+                for target, ok in results.items()
+            ),
+        )
 
-            group_passed_str_list = [
-                strings.messages["banlist_strlist_format"].format(
-                    id=item.uid,
-                    time=time_utils.timelast_format(
-                        (item.time - int(time_module.time())) if item.time != 0 else 0
-                    ),
-                    reason=item.reason
-                    if item.reason
-                    else strings.messages["no_reason"],
+    def _format_records(self, title: str, records: list[IndexedRecord]) -> list[str]:
+        """
+        将索引查询结果格式化为若干条消息（最多显示 SEARCH_RESULT_LIMIT 条）
+        """
+        now = int(time_module.time())
+        lines = [
+            strings.messages["record_strlist_format"].format(
+                id=record.id,
+                scope=f"{record.scope}@{record.key}" if record.key else record.scope,
+                time=time_utils.timelast_format(
+                    (record.time - now) if record.time != 0 else 0
+                ),
+                reason=record.reason if record.reason else strings.messages["no_reason"],
+            )
+            for record in records[:SEARCH_RESULT_LIMIT]
+        ]
+        if not lines:
+            return [title + strings.messages["no_record_found"]]
+        if len(records) > SEARCH_RESULT_LIMIT:
+            lines.append(
+                strings.messages["record_list_truncated"].format(
+                    limit=SEARCH_RESULT_LIMIT, total=len(records)
                 )
-                for item in group_passed_list
-            ]
-            if not group_passed_str_list:
-                group_passed_str_list.append(strings.messages["no_group_passed"])
+            )
+        return split_chunks(title + "".join(lines), self.banlist_renderer.chunk_chars)
 
-            global_passed_str_list = [
-                strings.messages["banlist_strlist_format"].format(
-                    id=item.uid,
-                    time=time_utils.timelast_format(
-                        (item.time - int(time_module.time())) if item.time != 0 else 0
-                    ),
-                    reason=item.reason
-                    if item.reason
-                    else strings.messages["no_reason"],
-                )
-                for item in global_passed_list
-            ]
-            if not global_passed_str_list:
-                global_passed_str_list.append(strings.messages["no_global_passed"])
+    def _query_records(self, field: str, value: str) -> list[IndexedRecord] | None:
+        """
+        按过滤条件查询索引（field 为 id/reason/expiring），条件不合法时返回 None
 
-            umo_banned_str_list = [
-                strings.messages["banlist_strlist_format"].format(
-                    id=item.umo,
-                    time=time_utils.timelast_format(
-                        (item.time - int(time_module.time())) if item.time != 0 else 0
-                    ),
-                    reason=item.reason
-                    if item.reason
-                    else strings.messages["no_reason"],
-                )
-                for item in umo_banned_list
-            ]
-            if not umo_banned_str_list:
-                umo_banned_str_list.append(strings.messages["no_umo_banned"])
+        Raises:
+            TimestrValueError: expiring 的时长格式错误
+        """
+        index = self.record_index.get()
+        if field == "id":
+            return index.by_id_prefix(value)
+        if field == "reason":
+            return index.by_reason(value)
+        if field == "expiring":
+            return index.expiring_within(time_utils.timestr_to_int(value))
+        return None
 
-            umo_passed_str_list = [
-                strings.messages["banlist_strlist_format"].format(
-                    id=item.umo,
-                    time=time_utils.timelast_format(
-                        (item.time - int(time_module.time())) if item.time != 0 else 0
-                    ),
-                    reason=item.reason
-                    if item.reason
-                    else strings.messages["no_reason"],
-                )
-                for item in umo_passed_list
-            ]
-            if not umo_passed_str_list:
-                umo_passed_str_list.append(strings.messages["no_umo_passed"])
+    def _record_trace(
+        self,
+        event: AstrMessageEvent,
+        command: str,
+        uid: str | None,
+        umo: str | None = None,
+    ):
+        """
+        流量采集开启时，记录一次命令调用（umo 为空时使用事件所在会话）
+        """
+        if self.trace_recorder is None:
+            return
+        if umo is None:
+            umo = EventUtils.get_event_umo(self.context, event)
+        self.trace_recorder.record(umo, uid, command)
 
-            group_banned_text = strings.messages["group_banned_list"] + "".join(
-                group_banned_str_list
-            )
-            global_banned_text = strings.messages["global_banned_list"] + "".join(
-                global_banned_str_list
-            )
-            group_passed_text = strings.messages["group_passed_list"] + "".join(
-                group_passed_str_list
+    def _replay_trace(self, trace_path: Path, speed: float) -> tuple[Path, ReplayReport]:
+        """
+        将采集文件回放至数据目录下全新的 replay 子目录（不影响线上数据）
+        会阻塞（回放期间按速度等待并落盘），异步处理器中应经 asyncio.to_thread 调用
+
+        Returns:
+            (回放数据目录, 回放报告)
+        """
+        replay_dir = self.data_manager.data_dir / "replay"
+        shutil.rmtree(replay_dir, ignore_errors=True)
+        replay_dir.mkdir()
+        # 沿用本节点标识，回放不改变全局逻辑时钟的 origin
+        replay_manager = DatafileManager(replay_dir, node_id=self.data_manager.node_id)
+        try:
+            report = TraceReplayer(replay_manager, trace_path).replay(speed, self.enable)
+        finally:
+            replay_manager.close()
+        return replay_dir, report
+
+    @filter.command("banlist")
+    async def banlist(
+        self,
+        event: AstrMessageEvent,
+        scope: str | None = None,
+        page: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        显示当前群禁用名单（分页，直接读取缓存，不触发同步）
+        格式：/banlist [数据名（ban/banall/pass/passall/umoban/umopass）] [页码（默认1）]
+        """
+        if end is None and scope == "--expiring":
+            # /banlist --expiring [时长（默认1d）]：列出即将到期的记录
+            timestr = page or "1d"
+            try:
+                duration = time_utils.timestr_to_int(timestr)
+            except TimestrValueError as e:
+                yield event.plain_result(
+                    strings.messages["invalid_timestr_error"].format(
+                        timestr=e.invalid_timestr
+                    )
+                )
+                return
+            # 禁用功能未启用时与 /banlist 一致，不列出任何记录
+            records = (
+                self.record_index.get().expiring_within(duration)
+                if self.enable
+                else []
             )
-            global_passed_text = strings.messages["global_passed_list"] + "".join(
-                global_passed_str_list
+            for chunk in self._format_records(
+                strings.messages["expiring_list"].format(
+                    time=time_utils.time_format(timestr)
+                ),
+                records,
+            ):
+                yield event.plain_result(chunk)
+            return
+        page = page or "1"
+        if end is not None or not page.isdigit():
+            # 若end存在或页码不是非负整数，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("banlist"))
+            return
+        # 禁用功能未启用
+        if not self.enable:
+            yield event.plain_result(
+                "\n\n".join(
+                    strings.messages[title_key] + strings.messages[empty_key]
+                    for title_key, empty_key, _ in BANLIST_SCOPES.values()
+                )
             )
-            umo_banned_text = strings.messages["umo_banned_list"] + "".join(
-                umo_banned_str_list
+            return
+        # 获取UMO
+        umo = EventUtils.get_event_umo(self.context, event)
+        try:
+            chunks = self.banlist_renderer.render(umo, scope, int(page))
+        except KeyError:
+            yield event.plain_result(strings.command_error("banlist"))
+            return
+        except PageOutOfRangeError as e:
+            yield event.plain_result(
+                strings.messages["banlist_page_out_of_range"].format(pages=e.pages)
             )
-            umo_passed_text = strings.messages["umo_passed_list"] + "".join(
-                umo_passed_str_list
+            return
+        for chunk in chunks:
+            yield event.plain_result(chunk)
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-search")
+    async def ban_search(
+        self,
+        event: AstrMessageEvent,
+        field: str,
+        value: str,
+        end: str | None = None,
+    ):
+        """
+        按 ID 前缀或理由搜索所有范围内的记录（使用二级索引，不遍历名单）
+        格式：/ban-search <id|reason> <ID前缀|理由>
+        示例：/ban-search reason 打广告
+        """
+        if end is not None or field not in ("id", "reason"):
+            # 若end存在或过滤字段不合法，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-search"))
+            return
+        records = self._query_records(field, value)
+        for chunk in self._format_records(
+            strings.messages["search_result"].format(field=field, value=value),
+            records,
+        ):
+            yield event.plain_result(chunk)
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("dec-by")
+    @profiled
+    async def dec_by(
+        self,
+        event: AstrMessageEvent,
+        field: str,
+        value: str,
+        scopes: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        删除所有符合过滤条件的记录（在一次事务中完成）
+        格式：/dec-by <id|reason|expiring> <ID前缀|理由|时长> [数据名,...（默认全部）]
+        示例：/dec-by reason 误封 ban,banall
+        """
+        if end is not None or field not in ("id", "reason", "expiring"):
+            # 若end存在或过滤字段不合法，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("dec-by"))
+            return
+        try:
+            records = self._query_records(field, value)
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
             )
+            return
+        if scopes is not None:
+            scope_filter = set(self._split_targets(scopes))
+            records = [record for record in records if record.scope in scope_filter]
+        if not records:
+            yield event.plain_result(strings.messages["dec_no_record"])
+            return
 
-        result = f"{group_banned_text}\n\n{global_banned_text}\n\n{group_passed_text}\n\n{global_passed_text}\n\n{umo_banned_text}\n\n{umo_passed_text}"
-        yield event.plain_result(result)
+        # 按 (数据名, 键) 分组，每个列表只重建一次
+        targets: dict[tuple[str, str], set[str]] = {}
+        for record in records:
+            targets.setdefault((record.scope, record.key), set()).add(record.id)
+        removed = await asyncio.to_thread(self._remove_records, targets)
+
+        # 批量删除只记录一条采集记录
+        self._record_trace(event, "dec-by", None)
+        yield event.plain_result(
+            strings.messages["dec_by_done"].format(
+                field=field, value=value, count=removed
+            )
+        )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
     @filter.command("ban-enable")
@@ -223,77 +788,882 @@ class ReNeBan(Star):
             f"已临时禁用禁用功能(in {EventUtils.get_event_umo(self.context, event)} - {event.get_sender_name()}({event.get_sender_id()}))"
         )
 
-    @filter.command("ban-help")
-    async def ban_help(self, event: AstrMessageEvent):
-        """
-        显示reneban帮助信息
-        """
-        yield event.plain_result(strings.messages["help_text"])
-
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("ban")
-    async def ban_user(
+    @filter.command("ban-stats")
+    async def ban_stats(self, event: AstrMessageEvent, end: str | None = None):
+        """
+        显示运行时指标摘要，并导出 Prometheus 文本文件至数据目录
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-stats"))
+            return
+        prom_path = self.data_manager.data_dir / "metrics.prom"
+        measure_resources()
+        METRICS.write_prometheus(prom_path)
+        yield event.plain_result(
+            strings.messages["ban_stats"].format(
+                summary=METRICS.summary(), path=prom_path
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-mem")
+    async def ban_mem(
+        self, event: AstrMessageEvent, top: str = "5", end: str | None = None
+    ):
+        """
+        显示黑名单数据的内存占用（各数据/记录类型/重复字符串/占用最大的 UMO）
+        格式：/ban-mem [显示数量（默认5）]
+        """
+        if end is not None or not top.isdigit():
+            # 若end存在或显示数量不是非负整数，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-mem"))
+            return
+        report = measure_memory(self.data_manager)
+        yield event.plain_result(
+            strings.messages["ban_mem"].format(
+                report=report.format(int(top)),
+                resources=measure_resources().format(),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-import")
+    async def ban_import(
+        self,
+        event: AstrMessageEvent,
+        filename: str,
+        chunk_size: str = "5000",
+        end: str | None = None,
+    ):
+        """
+        从数据目录中的 JSONL/CSV 文件流式导入记录，逐块读取并在一次事务中应用
+        格式：/ban-import <文件名> [每块记录数（默认5000）]
+        示例：/ban-import blacklist.jsonl
+        """
+        if end is not None or not chunk_size.isdigit() or int(chunk_size) <= 0:
+            # 若end存在或块大小不是正整数，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-import"))
+            return
+        path = self.data_manager._safe_pathjoin(self.data_manager.data_dir, filename)
+        if path == self.data_manager.data_dir or not path.is_file():
+            yield event.plain_result(
+                strings.messages["bulk_file_not_found"].format(filename=filename)
+            )
+            return
+        yield event.plain_result(
+            strings.messages["bulk_import_started"].format(filename=filename)
+        )
+        try:
+            # 在线程中执行，避免阻塞事件循环
+            report = await asyncio.to_thread(
+                import_records, self.data_manager, path, None, int(chunk_size)
+            )
+        except BULK_IO_ERRORS as e:
+            yield event.plain_result(
+                strings.messages["bulk_error"].format(filename=filename, error=e)
+            )
+            return
+        self._record_trace(event, "ban-import", None)
+        yield event.plain_result(
+            strings.messages["bulk_import_done"].format(
+                filename=filename, report=report.format()
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-merge")
+    async def ban_merge(
+        self, event: AstrMessageEvent, filename: str, end: str | None = None
+    ):
+        """
+        以后写者胜规则合并其他节点导出的 JSONL/CSV 文件（含墓碑），所有修改在一次事务中完成
+        格式：/ban-merge <文件名>
+        示例：/ban-merge peer_blacklist.jsonl
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-merge"))
+            return
+        path = self.data_manager._safe_pathjoin(self.data_manager.data_dir, filename)
+        if path == self.data_manager.data_dir or not path.is_file():
+            yield event.plain_result(
+                strings.messages["bulk_file_not_found"].format(filename=filename)
+            )
+            return
+        try:
+            # 在线程中执行，避免阻塞事件循环
+            report = await asyncio.to_thread(merge_records, self.data_manager, path)
+        except BULK_IO_ERRORS as e:
+            yield event.plain_result(
+                strings.messages["bulk_error"].format(filename=filename, error=e)
+            )
+            return
+        self._record_trace(event, "ban-merge", None)
+        yield event.plain_result(
+            strings.messages["bulk_merge_done"].format(
+                filename=filename, report=report.format()
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-export")
+    async def ban_export(
+        self,
+        event: AstrMessageEvent,
+        filename: str,
+        scopes: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        将记录流式导出至数据目录中的 JSONL/CSV 文件
+        格式：/ban-export <文件名> [数据名,...（默认全部）]
+        示例：/ban-export blacklist.csv banall,umoban
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-export"))
+            return
+        path = self.data_manager._safe_pathjoin(self.data_manager.data_dir, filename)
+        if path == self.data_manager.data_dir or path.is_dir():
+            yield event.plain_result(
+                strings.messages["bulk_file_not_found"].format(filename=filename)
+            )
+            return
+        try:
+            count = await asyncio.to_thread(
+                export_records,
+                self.data_manager,
+                path,
+                None,
+                self._split_targets(scopes) if scopes else None,
+            )
+        except (*BULK_IO_ERRORS, ValueError) as e:
+            yield event.plain_result(
+                strings.messages["bulk_error"].format(filename=filename, error=e)
+            )
+            return
+        yield event.plain_result(
+            strings.messages["bulk_export_done"].format(filename=filename, count=count)
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-profile")
+    async def ban_profile(
+        self, event: AstrMessageEvent, calls: str = "1000", end: str | None = None
+    ):
+        """
+        对接下来 N 次过滤器/变更命令调用进行采样，结束后将 pstats 与内存分配排行写入数据目录
+        格式：/ban-profile [次数（默认1000）]
+        次数为 0 时立即结束当前采样并输出结果
+        """
+        if end is not None or not calls.isdigit():
+            # 若end存在或次数不是非负整数，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-profile"))
+            return
+        if int(calls) == 0:
+            result = self.profiler.finish()
+            if result is None:
+                yield event.plain_result(strings.messages["profile_not_active"])
+            else:
+                yield event.plain_result(
+                    strings.messages["profile_finished"].format(
+                        stats_path=result[0], alloc_path=result[1]
+                    )
+                )
+            return
+        if self.profiler.active:
+            yield event.plain_result(
+                strings.messages["profile_already_active"].format(
+                    remaining=self.profiler.remaining
+                )
+            )
+            return
+        self.profiler.arm(int(calls), self.data_manager.data_dir)
+        yield event.plain_result(
+            strings.messages["profile_started"].format(calls=int(calls))
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-replay")
+    async def ban_replay(
+        self, event: AstrMessageEvent, speed: str = "0", end: str | None = None
+    ):
+        """
+        将数据目录中的采集文件回放至独立的 replay 子目录，输出判定吞吐、延迟百分位与写放大
+        格式：/ban-replay [速度倍率（默认0）]
+        速度倍率为 1 时按原速回放，大于 1 时加速，为 0 时不等待
+        """
+        try:
+            replay_speed = float(speed)
+        except ValueError:
+            replay_speed = -1.0
+        if end is not None or not replay_speed >= 0:
+            # 若end存在或速度倍率不是非负数，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-replay"))
+            return
+        trace_path = self.data_manager.data_dir / "trace.msgpack"
+        if self.trace_recorder is not None:
+            # 先写入采集器中尚未落盘的记录
+            await asyncio.to_thread(self.trace_recorder.flush)
+        if not trace_path.is_file():
+            yield event.plain_result(strings.messages["replay_no_trace"])
+            return
+        yield event.plain_result(strings.messages["replay_started"])
+        replay_dir, report = await asyncio.to_thread(
+            self._replay_trace, trace_path, replay_speed
+        )
+        yield event.plain_result(
+            strings.messages["replay_done"].format(
+                replay_dir=replay_dir, report=report.format()
+            )
+        )
+
+    @filter.command("ban-help")
+    async def ban_help(self, event: AstrMessageEvent):
+        """
+        显示reneban帮助信息
+        """
+        yield event.plain_result(strings.messages["help_text"])
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban")
+    @profiled
+    async def ban_user(
+        self,
+        event: AstrMessageEvent,
+        banuser: str,
+        time: str = "0",
+        reason: str | None = None,
+        umo: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        在会话中禁用指定用户的使用权限。
+        格式：/ban <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
+        示例：/ban @张三 7d
+        注意：单次仅能禁用一个会话的一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban"))
+            return
+        if umo == None:
+            # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
+            umo = EventUtils.get_event_umo(self.context, event)
+        reason = strings.noreason_to_none(reason)
+        try:
+            ban_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                ban_uid = event_at
+            else:
+                ban_uid = banuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("ban"))
+            return
+        # 准备ban_user
+        try:
+            update_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._add_record, "ban", ban_uid, update_time, reason, umo
+            )
+        except PermanentRecordTimeError:
+            yield event.plain_result(
+                strings.messages["time_zeroset_error"].format(command="ban")
+            )
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "ban", ban_uid, umo)
+        yield event.plain_result(
+            strings.messages["banned_user"].format(
+                umo=umo,
+                user=ban_uid,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-all")
+    @profiled
+    async def ban_all(
+        self,
+        event: AstrMessageEvent,
+        banuser: str,
+        time: str = "0",
+        reason: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        在全局禁用指定用户的使用权限。
+        格式：/ban-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
+        示例：/ban-all @张三 7d
+        注意：单次仅能禁用一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-all"))
+            return
+        reason = strings.noreason_to_none(reason)
+        try:
+            ban_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                ban_uid = event_at
+            else:
+                ban_uid = banuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("ban-all"))
+            return
+        try:
+            update_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._add_record, "banall", ban_uid, update_time, reason
+            )
+        except PermanentRecordTimeError:
+            yield event.plain_result(
+                strings.messages["time_zeroset_error"].format(command="ban-all")
+            )
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "ban-all", ban_uid)
+        yield event.plain_result(
+            strings.messages["banned_user_global"].format(
+                user=ban_uid,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("pass")
+    @profiled
+    async def pass_user(
+        self,
+        event: AstrMessageEvent,
+        passuser: str,
+        time: str = "0",
+        reason: str | None = None,
+        umo: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        在会话中解限指定用户。
+        格式：/pass <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
+        示例：/pass @张三 7d
+        注意：单次仅能解限一个会话的一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("pass"))
+            return
+        if umo == None:
+            # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
+            umo = EventUtils.get_event_umo(self.context, event)
+        reason = strings.noreason_to_none(reason)
+        try:
+            pass_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                pass_uid = event_at
+            else:
+                pass_uid = passuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("pass"))
+            return
+        try:
+            update_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._add_record, "pass", pass_uid, update_time, reason, umo
+            )
+        except PermanentRecordTimeError:
+            yield event.plain_result(
+                strings.messages["time_zeroset_error"].format(command="pass")
+            )
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "pass", pass_uid, umo)
+        yield event.plain_result(
+            strings.messages["passed_user"].format(
+                umo=umo,
+                user=pass_uid,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("pass-all")
+    @profiled
+    async def pass_all(
+        self,
+        event: AstrMessageEvent,
+        passuser: str,
+        time: str = "0",
+        reason: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        在全局中解限指定用户。
+        格式：/pass-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
+        示例：/pass-all @张三 7d
+        注意：单次仅能解限一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("pass-all"))
+            return
+        reason = strings.noreason_to_none(reason)
+        try:
+            pass_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                pass_uid = event_at
+            else:
+                pass_uid = passuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("pass-all"))
+            return
+        try:
+            update_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._add_record, "passall", pass_uid, update_time, reason
+            )
+        except PermanentRecordTimeError:
+            yield event.plain_result(
+                strings.messages["time_zeroset_error"].format(command="pass-all")
+            )
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "pass-all", pass_uid)
+        yield event.plain_result(
+            strings.messages["passed_user_global"].format(
+                user=pass_uid,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("dec-pass")
+    @profiled
+    async def dec_pass(
+        self,
+        event: AstrMessageEvent,
+        passuser: str,
+        time: str = "0",
+        reason: str | None = None,
+        umo: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        删除指定用户的会话解限时间。
+        格式：/dec-pass <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除解限记录
+        示例：/dec-pass @张三 7d
+        注意：单次仅能操作一个会话的一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("dec-pass"))
+            return
+        if umo == None:
+            # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
+            umo = EventUtils.get_event_umo(self.context, event)
+        reason = strings.noreason_to_none(reason)
+        try:
+            pass_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                pass_uid = event_at
+            else:
+                pass_uid = passuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("dec-pass"))
+            return
+        try:
+            remove_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._subtract_record, "pass", pass_uid, remove_time, reason, umo
+            )
+        except RecordNotFoundError:
+            yield event.plain_result(strings.messages["dec_no_record"])
+            return
+        except PermanentRecordTimeError:
+            yield event.plain_result(strings.messages["dec_zerotime_error"])
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "dec-pass", pass_uid, umo)
+        yield event.plain_result(
+            strings.messages["dec_passed_user"].format(
+                umo=umo,
+                user=pass_uid,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("dec-pass-all")
+    @profiled
+    async def dec_pass_all(
+        self,
+        event: AstrMessageEvent,
+        passuser: str,
+        time: str = "0",
+        reason: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        删除指定用户的全局解限时间。
+        格式：/dec-pass-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除解限记录
+        示例：/dec-pass-all @张三 7d
+        注意：单次仅能操作一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("dec-pass-all"))
+            return
+        reason = strings.noreason_to_none(reason)
+        try:
+            pass_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                pass_uid = event_at
+            else:
+                pass_uid = passuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("dec-pass-all"))
+            return
+        try:
+            remove_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._subtract_record, "passall", pass_uid, remove_time, reason
+            )
+        except RecordNotFoundError:
+            yield event.plain_result(strings.messages["dec_no_record"])
+            return
+        except PermanentRecordTimeError:
+            yield event.plain_result(strings.messages["dec_zerotime_error"])
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "dec-pass-all", pass_uid)
+        yield event.plain_result(
+            strings.messages["dec_passed_user_global"].format(
+                user=pass_uid,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("dec-ban")
+    @profiled
+    async def dec_ban(
+        self,
+        event: AstrMessageEvent,
+        banuser: str,
+        time: str = "0",
+        reason: str | None = None,
+        umo: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        删除指定用户的会话封禁时间。
+        格式：/dec-ban <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除封禁记录
+        示例：/dec-ban @张三 7d
+        注意：单次仅能操作一个会话的一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("dec-ban"))
+            return
+        if umo == None:
+            # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
+            umo = EventUtils.get_event_umo(self.context, event)
+        reason = strings.noreason_to_none(reason)
+        try:
+            ban_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                ban_uid = event_at
+            else:
+                ban_uid = banuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("dec-ban"))
+            return
+        try:
+            remove_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._subtract_record, "ban", ban_uid, remove_time, reason, umo
+            )
+        except RecordNotFoundError:
+            yield event.plain_result(strings.messages["dec_no_record"])
+            return
+        except PermanentRecordTimeError:
+            yield event.plain_result(strings.messages["dec_zerotime_error"])
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "dec-ban", ban_uid, umo)
+        yield event.plain_result(
+            strings.messages["dec_banned_user"].format(
+                user=ban_uid,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+                umo=umo,
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("dec-ban-all")
+    @profiled
+    async def dec_ban_all(
+        self,
+        event: AstrMessageEvent,
+        banuser: str,
+        time: str = "0",
+        reason: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        删除指定用户的全局封禁时间。
+        格式：/dec-ban-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除封禁记录
+        示例：/dec-ban-all @张三 7d
+        注意：单次仅能操作一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("dec-ban-all"))
+            return
+        reason = strings.noreason_to_none(reason)
+        try:
+            ban_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                ban_uid = event_at
+            else:
+                ban_uid = banuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("dec-ban-all"))
+            return
+        try:
+            remove_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._subtract_record, "banall", ban_uid, remove_time, reason
+            )
+        except RecordNotFoundError:
+            yield event.plain_result(strings.messages["dec_no_record"])
+            return
+        except PermanentRecordTimeError:
+            yield event.plain_result(strings.messages["dec_zerotime_error"])
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "dec-ban-all", ban_uid)
+        yield event.plain_result(
+            strings.messages["dec_banned_user_global"].format(
+                user=ban_uid,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-umo")
+    @profiled
+    async def ban_umo(
+        self,
+        event: AstrMessageEvent,
+        umo: str,
+        time: str = "0",
+        reason: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        禁用指定UMO的使用权限。
+        格式：/ban-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
+        示例：/ban-umo napcat:GroupMessage:1145141919 7d
+        注意：单次仅能禁用一个UMO
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-umo"))
+            return
+        reason = strings.noreason_to_none(reason)
+        try:
+            update_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._add_record, "umoban", umo, update_time, reason
+            )
+        except PermanentRecordTimeError:
+            yield event.plain_result(
+                strings.messages["time_zeroset_error"].format(command="ban-umo")
+            )
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "ban-umo", None, umo)
+        yield event.plain_result(
+            strings.messages["banned_umo"].format(
+                umo=umo,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("pass-umo")
+    @profiled
+    async def pass_umo(
+        self,
+        event: AstrMessageEvent,
+        umo: str,
+        time: str = "0",
+        reason: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        解限指定UMO的使用权限。
+        格式：/pass-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
+        示例：/pass-umo napcat:GroupMessage:1145141919 7d
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("pass-umo"))
+            return
+        reason = strings.noreason_to_none(reason)
+        try:
+            update_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._add_record, "umopass", umo, update_time, reason
+            )
+        except PermanentRecordTimeError:
+            yield event.plain_result(
+                strings.messages["time_zeroset_error"].format(command="pass-umo")
+            )
+            return
+        except TimestrValueError as e:
+            yield event.plain_result(
+                strings.messages["invalid_timestr_error"].format(
+                    timestr=e.invalid_timestr
+                )
+            )
+            return
+
+        self._record_trace(event, "pass-umo", None, umo)
+        yield event.plain_result(
+            strings.messages["passed_umo"].format(
+                umo=umo,
+                time=time_utils.time_format(time),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("dec-ban-umo")
+    @profiled
+    async def dec_ban_umo(
         self,
         event: AstrMessageEvent,
-        banuser: str,
+        umo: str,
         time: str = "0",
         reason: str | None = None,
-        umo: str | None = None,
         end: str | None = None,
     ):
         """
-        在会话中禁用指定用户的使用权限。
-        格式：/ban <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
-        示例：/ban @张三 7d
-        注意：单次仅能禁用一个会话的一个用户
+        删除指定UMO的封禁时间。
+        格式：/dec-ban-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除封禁记录
+        示例：/dec-ban-umo napcat:GroupMessage:1145141919 7d
+        注意：单次仅能操作一个UMO
         """
         if end is not None:
             # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("ban"))
+            yield event.plain_result(strings.command_error("dec-ban-umo"))
             return
-        if umo == None:
-            # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
-            umo = EventUtils.get_event_umo(self.context, event)
         reason = strings.noreason_to_none(reason)
         try:
-            ban_uid: str
-            event_at: str | None = EventUtils.get_event_at(event)
-            if event_at:
-                ban_uid = event_at
-            else:
-                ban_uid = banuser
-        except AtUserCountError:
-            yield event.plain_result(strings.command_error("ban"))
+            remove_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._subtract_record, "umoban", umo, remove_time, reason
+            )
+        except RecordNotFoundError:
+            yield event.plain_result(strings.messages["dec_no_record"])
             return
-        # 准备ban_user
-        banlist: dict[str, UserDataList] = self.data_manager.get_data("ban")
-        if banlist.get(umo) is None:
-            banlist[umo] = UserDataList()
-        group_banned_list: UserDataList = banlist[umo]
-
-        try:
-            update_time: int = time_utils.timestr_to_int(time)
-            if not group_banned_list.add_time_to_data(
-                ban_uid,
-                update_time,
-                reason,
-            ):
-                new_ban_item = UserDataModel(
-                    uid=ban_uid,
-                    time=(
-                        (int(time_module.time()) + update_time)
-                        if update_time != 0
-                        else 0
-                    ),
-                    reason=reason,
-                )
-                group_banned_list.append(new_ban_item)
-            self.data_manager.write_data("ban", banlist)
         except PermanentRecordTimeError:
-            yield event.plain_result(
-                strings.messages["time_zeroset_error"].format(command="ban")
-            )
+            yield event.plain_result(strings.messages["dec_zerotime_error"])
             return
         except TimestrValueError as e:
             yield event.plain_result(
@@ -303,70 +1673,48 @@ class ReNeBan(Star):
             )
             return
 
+        self._record_trace(event, "dec-ban-umo", None, umo)
         yield event.plain_result(
-            strings.messages["banned_user"].format(
+            strings.messages["dec_banned_umo"].format(
                 umo=umo,
-                user=ban_uid,
                 time=time_utils.time_format(time),
                 reason=strings.reason_format(reason),
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("ban-all")
-    async def ban_all(
+    @filter.command("dec-pass-umo")
+    @profiled
+    async def dec_pass_umo(
         self,
         event: AstrMessageEvent,
-        banuser: str,
+        umo: str,
         time: str = "0",
         reason: str | None = None,
         end: str | None = None,
     ):
         """
-        在全局禁用指定用户的使用权限。
-        格式：/ban-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
-        示例：/ban-all @张三 7d
-        注意：单次仅能禁用一个用户
+        删除指定UMO的解限时间。
+        格式：/dec-pass-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除解限记录
+        示例：/dec-pass-umo napcat:GroupMessage:1145141919 7d
+        注意：单次仅能操作一个UMO
         """
         if end is not None:
             # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("ban-all"))
+            yield event.plain_result(strings.command_error("dec-pass-umo"))
             return
         reason = strings.noreason_to_none(reason)
         try:
-            ban_uid: str
-            event_at: str | None = EventUtils.get_event_at(event)
-            if event_at:
-                ban_uid = event_at
-            else:
-                ban_uid = banuser
-        except AtUserCountError:
-            yield event.plain_result(strings.command_error("ban-all"))
+            remove_time: int = time_utils.timestr_to_int(time)
+            await asyncio.to_thread(
+                self._subtract_record, "umopass", umo, remove_time, reason
+            )
+        except RecordNotFoundError:
+            yield event.plain_result(strings.messages["dec_no_record"])
             return
-        banall_list: UserDataList = self.data_manager.get_data("banall")
-        try:
-            update_time: int = time_utils.timestr_to_int(time)
-            if not banall_list.add_time_to_data(
-                ban_uid,
-                update_time,
-                reason,
-            ):
-                new_ban_item = UserDataModel(
-                    uid=ban_uid,
-                    time=(
-                        (int(time_module.time()) + update_time)
-                        if update_time != 0
-                        else 0
-                    ),
-                    reason=reason,
-                )
-                banall_list.append(new_ban_item)
-            self.data_manager.write_data("banall", banall_list)
         except PermanentRecordTimeError:
-            yield event.plain_result(
-                strings.messages["time_zeroset_error"].format(command="ban-all")
-            )
+            yield event.plain_result(strings.messages["dec_zerotime_error"])
             return
         except TimestrValueError as e:
             yield event.plain_result(
@@ -376,76 +1724,202 @@ class ReNeBan(Star):
             )
             return
 
+        self._record_trace(event, "dec-pass-umo", None, umo)
         yield event.plain_result(
-            strings.messages["banned_user_global"].format(
-                user=ban_uid,
+            strings.messages["dec_passed_umo"].format(
+                umo=umo,
                 time=time_utils.time_format(time),
                 reason=strings.reason_format(reason),
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("pass")
-    async def pass_user(
+    @filter.command("group-add")
+    @profiled
+    async def group_add(
         self,
         event: AstrMessageEvent,
-        passuser: str,
-        time: str = "0",
-        reason: str | None = None,
+        group: str,
         umo: str | None = None,
         end: str | None = None,
     ):
         """
-        在会话中解限指定用户。
-        格式：/pass <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
-        示例：/pass @张三 7d
-        注意：单次仅能解限一个会话的一个用户
+        将会话加入会话组（组不存在时自动创建）。
+        格式：/group-add <组名> [UMO]
+        示例：/group-add 合作群 napcat:GroupMessage:1145141919
+        注意：单次仅能操作一个会话，UMO 支持通配
         """
         if end is not None:
             # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("pass"))
+            yield event.plain_result(strings.command_error("group-add"))
+            return
+        if umo == None:
+            # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
+            umo = EventUtils.get_event_umo(self.context, event)
+        try:
+            await asyncio.to_thread(self._add_group_member, group, umo)
+        except RecordExistsError:
+            yield event.plain_result(
+                strings.messages["group_already_member"].format(group=group, umo=umo)
+            )
+            return
+
+        self._record_trace(event, "group-add", None, umo)
+        yield event.plain_result(
+            strings.messages["group_added"].format(group=group, umo=umo)
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("group-remove")
+    @profiled
+    async def group_remove(
+        self,
+        event: AstrMessageEvent,
+        group: str,
+        umo: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        将会话移出会话组（组内没有会话后，组的禁用/解限记录保留）。
+        格式：/group-remove <组名> [UMO]
+        示例：/group-remove 合作群 napcat:GroupMessage:1145141919
+        注意：单次仅能操作一个会话
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("group-remove"))
             return
         if umo == None:
             # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
             umo = EventUtils.get_event_umo(self.context, event)
+        try:
+            await asyncio.to_thread(self._remove_group_member, group, umo)
+        except RecordNotFoundError:
+            yield event.plain_result(
+                strings.messages["group_not_member"].format(group=group, umo=umo)
+            )
+            return
+
+        self._record_trace(event, "group-remove", None, umo)
+        yield event.plain_result(
+            strings.messages["group_removed"].format(group=group, umo=umo)
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("group-list")
+    async def group_list(
+        self, event: AstrMessageEvent, group: str | None = None, end: str | None = None
+    ):
+        """
+        查看所有会话组，或指定会话组的成员与禁用/解限名单。
+        格式：/group-list [组名]
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("group-list"))
+            return
+        # 只读查看：直接使用缓存对象，不触发写盘
+        if not self.data_manager.is_cache_valid():
+            self.data_manager.sync_and_clean_data(no_return=True)
+        data: dict[str, dict[str, BaseModelList]] = self.data_manager.get_clear_data(
+            ["group", "groupban", "grouppass"], no_copy=True
+        )
+        if group is None:
+            names = sorted(
+                set(data["group"]) | set(data["groupban"]) | set(data["grouppass"])
+            )
+            if not names:
+                yield event.plain_result(
+                    strings.messages["group_list"] + strings.messages["no_group"]
+                )
+                return
+            yield event.plain_result(
+                strings.messages["group_list"]
+                + "".join(
+                    strings.messages["group_list_format"].format(
+                        group=name,
+                        members=len(data["group"].get(name, ())),
+                        banned=len(data["groupban"].get(name, ())),
+                        passed=len(data["grouppass"].get(name, ())),
+                    )
+                    for name in names
+                )
+            )
+            return
+
+        def format_list(items: BaseModelList, empty_key: str) -> str:
+            str_list = [
+                strings.messages["banlist_strlist_format"].format(
+                    id=item._get_id_field_value(),
+                    time=time_utils.timelast_format(
+                        (item.time - int(time_module.time())) if item.time != 0 else 0
+                    ),
+                    reason=item.reason
+                    if item.reason
+                    else strings.messages["no_reason"],
+                )
+                for item in items
+            ]
+            return "".join(str_list) if str_list else strings.messages[empty_key]
+
+        yield event.plain_result(
+            strings.messages["group_detail"].format(
+                group=group,
+                members=format_list(
+                    data["group"].get(group, EMPTY_UMO_LIST), "no_group_member"
+                ),
+                banned=format_list(
+                    data["groupban"].get(group, EMPTY_USER_LIST), "no_group_banned_user"
+                ),
+                passed=format_list(
+                    data["grouppass"].get(group, EMPTY_USER_LIST),
+                    "no_group_passed_user",
+                ),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("ban-group")
+    @profiled
+    async def ban_group(
+        self,
+        event: AstrMessageEvent,
+        group: str,
+        banuser: str,
+        time: str = "0",
+        reason: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        在会话组的所有会话中禁用指定用户的使用权限（记录只保存一份）。
+        格式：/ban-group <组名> <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
+        示例：/ban-group 合作群 @张三 7d
+        注意：单次仅能禁用一个组的一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("ban-group"))
+            return
         reason = strings.noreason_to_none(reason)
         try:
-            pass_uid: str
+            ban_uid: str
             event_at: str | None = EventUtils.get_event_at(event)
             if event_at:
-                pass_uid = event_at
+                ban_uid = event_at
             else:
-                pass_uid = passuser
+                ban_uid = banuser
         except AtUserCountError:
-            yield event.plain_result(strings.command_error("pass"))
+            yield event.plain_result(strings.command_error("ban-group"))
             return
-        passlist: dict[str, UserDataList] = self.data_manager.get_data("pass")
-        if passlist.get(umo) is None:
-            passlist[umo] = UserDataList()
-        group_passed_list: UserDataList = passlist[umo]
-
         try:
             update_time: int = time_utils.timestr_to_int(time)
-            if not group_passed_list.add_time_to_data(
-                pass_uid,
-                update_time,
-                reason,
-            ):
-                new_pass_item = UserDataModel(
-                    uid=pass_uid,
-                    time=(
-                        (int(time_module.time()) + update_time)
-                        if update_time != 0
-                        else 0
-                    ),
-                    reason=reason,
-                )
-                group_passed_list.append(new_pass_item)
-            self.data_manager.write_data("pass", passlist)
+            await asyncio.to_thread(
+                self._add_record, "groupban", ban_uid, update_time, reason, group
+            )
         except PermanentRecordTimeError:
             yield event.plain_result(
-                strings.messages["time_zeroset_error"].format(command="pass")
+                strings.messages["time_zeroset_error"].format(command="ban-group")
             )
             return
         except TimestrValueError as e:
@@ -456,35 +1930,38 @@ class ReNeBan(Star):
             )
             return
 
+        self._record_trace(event, "ban-group", ban_uid)
         yield event.plain_result(
-            strings.messages["passed_user"].format(
-                umo=umo,
-                user=pass_uid,
+            strings.messages["banned_group_user"].format(
+                group=group,
+                user=ban_uid,
                 time=time_utils.time_format(time),
                 reason=strings.reason_format(reason),
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("pass-all")
-    async def pass_all(
+    @filter.command("pass-group")
+    @profiled
+    async def pass_group(
         self,
         event: AstrMessageEvent,
+        group: str,
         passuser: str,
         time: str = "0",
         reason: str | None = None,
         end: str | None = None,
     ):
         """
-        在全局中解限指定用户。
-        格式：/pass-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
+        在会话组的所有会话中解除指定用户的禁用（允许临时解限）。
+        格式：/pass-group <组名> <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
         时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
-        示例：/pass-all @张三 7d
-        注意：单次仅能解限一个用户
+        示例：/pass-group 合作群 @张三 1d
+        注意：单次仅能操作一个组的一个用户
         """
         if end is not None:
             # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("pass-all"))
+            yield event.plain_result(strings.command_error("pass-group"))
             return
         reason = strings.noreason_to_none(reason)
         try:
@@ -495,30 +1972,16 @@ class ReNeBan(Star):
             else:
                 pass_uid = passuser
         except AtUserCountError:
-            yield event.plain_result(strings.command_error("pass-all"))
+            yield event.plain_result(strings.command_error("pass-group"))
             return
-        passall_list: UserDataList = self.data_manager.get_data("passall")
         try:
             update_time: int = time_utils.timestr_to_int(time)
-            if not passall_list.add_time_to_data(
-                pass_uid,
-                update_time,
-                reason,
-            ):
-                new_pass_item = UserDataModel(
-                    uid=pass_uid,
-                    time=(
-                        (int(time_module.time()) + update_time)
-                        if update_time != 0
-                        else 0
-                    ),
-                    reason=reason,
-                )
-                passall_list.append(new_pass_item)
-            self.data_manager.write_data("passall", passall_list)
+            await asyncio.to_thread(
+                self._add_record, "grouppass", pass_uid, update_time, reason, group
+            )
         except PermanentRecordTimeError:
             yield event.plain_result(
-                strings.messages["time_zeroset_error"].format(command="pass-all")
+                strings.messages["time_zeroset_error"].format(command="pass-group")
             )
             return
         except TimestrValueError as e:
@@ -529,8 +1992,10 @@ class ReNeBan(Star):
             )
             return
 
+        self._record_trace(event, "pass-group", pass_uid)
         yield event.plain_result(
-            strings.messages["passed_user_global"].format(
+            strings.messages["passed_group_user"].format(
+                group=group,
                 user=pass_uid,
                 time=time_utils.time_format(time),
                 reason=strings.reason_format(reason),
@@ -538,53 +2003,47 @@ class ReNeBan(Star):
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("dec-pass")
-    async def dec_pass(
+    @filter.command("dec-ban-group")
+    @profiled
+    async def dec_ban_group(
         self,
         event: AstrMessageEvent,
-        passuser: str,
+        group: str,
+        banuser: str,
         time: str = "0",
         reason: str | None = None,
-        umo: str | None = None,
         end: str | None = None,
     ):
         """
-        删除指定用户的会话解限时间。
-        格式：/dec-pass <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除解限记录
-        示例：/dec-pass @张三 7d
-        注意：单次仅能操作一个会话的一个用户
+        删除指定用户在会话组的封禁时间。
+        格式：/dec-ban-group <组名> <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
+        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除封禁记录
+        示例：/dec-ban-group 合作群 @张三 7d
+        注意：单次仅能操作一个组的一个用户
         """
         if end is not None:
             # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("dec-pass"))
+            yield event.plain_result(strings.command_error("dec-ban-group"))
             return
-        if umo == None:
-            # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
-            umo = EventUtils.get_event_umo(self.context, event)
         reason = strings.noreason_to_none(reason)
         try:
-            pass_uid: str
+            ban_uid: str
             event_at: str | None = EventUtils.get_event_at(event)
             if event_at:
-                pass_uid = event_at
+                ban_uid = event_at
             else:
-                pass_uid = passuser
+                ban_uid = banuser
         except AtUserCountError:
-            yield event.plain_result(strings.command_error("dec-pass"))
+            yield event.plain_result(strings.command_error("dec-ban-group"))
             return
-        pass_list: dict[str, UserDataList] = self.data_manager.get_data("pass")
-        group_passed_list: UserDataList = pass_list.get(umo, UserDataList())
         try:
             remove_time: int = time_utils.timestr_to_int(time)
-            if not group_passed_list.subtract_time_from_data(
-                pass_uid,
-                remove_time,
-                reason,
-            ):
-                yield event.plain_result(strings.messages["dec_no_record"])
-                return
-            self.data_manager.write_data("pass", pass_list)
+            await asyncio.to_thread(
+                self._subtract_record, "groupban", ban_uid, remove_time, reason, group
+            )
+        except RecordNotFoundError:
+            yield event.plain_result(strings.messages["dec_no_record"])
+            return
         except PermanentRecordTimeError:
             yield event.plain_result(strings.messages["dec_zerotime_error"])
             return
@@ -596,35 +2055,38 @@ class ReNeBan(Star):
             )
             return
 
+        self._record_trace(event, "dec-ban-group", ban_uid)
         yield event.plain_result(
-            strings.messages["dec_passed_user"].format(
-                umo=umo,
-                user=pass_uid,
+            strings.messages["dec_banned_group_user"].format(
+                group=group,
+                user=ban_uid,
                 time=time_utils.time_format(time),
                 reason=strings.reason_format(reason),
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("dec-pass-all")
-    async def dec_pass_all(
+    @filter.command("dec-pass-group")
+    @profiled
+    async def dec_pass_group(
         self,
         event: AstrMessageEvent,
+        group: str,
         passuser: str,
         time: str = "0",
         reason: str | None = None,
         end: str | None = None,
     ):
         """
-        删除指定用户的全局解限时间。
-        格式：/dec-pass-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
+        删除指定用户在会话组的临时解限时间。
+        格式：/dec-pass-group <组名> <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
         时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除解限记录
-        示例：/dec-pass-all @张三 7d
-        注意：单次仅能操作一个用户
+        示例：/dec-pass-group 合作群 @张三 1d
+        注意：单次仅能操作一个组的一个用户
         """
         if end is not None:
             # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("dec-pass-all"))
+            yield event.plain_result(strings.command_error("dec-pass-group"))
             return
         reason = strings.noreason_to_none(reason)
         try:
@@ -635,19 +2097,16 @@ class ReNeBan(Star):
             else:
                 pass_uid = passuser
         except AtUserCountError:
-            yield event.plain_result(strings.command_error("dec-pass-all"))
+            yield event.plain_result(strings.command_error("dec-pass-group"))
             return
-        passall_list: UserDataList = self.data_manager.get_data("passall")
         try:
             remove_time: int = time_utils.timestr_to_int(time)
-            if not passall_list.subtract_time_from_data(
-                pass_uid,
-                remove_time,
-                reason,
-            ):
-                yield event.plain_result(strings.messages["dec_no_record"])
-                return
-            self.data_manager.write_data("passall", passall_list)
+            await asyncio.to_thread(
+                self._subtract_record, "grouppass", pass_uid, remove_time, reason, group
+            )
+        except RecordNotFoundError:
+            yield event.plain_result(strings.messages["dec_no_record"])
+            return
         except PermanentRecordTimeError:
             yield event.plain_result(strings.messages["dec_zerotime_error"])
             return
@@ -659,8 +2118,10 @@ class ReNeBan(Star):
             )
             return
 
+        self._record_trace(event, "dec-pass-group", pass_uid)
         yield event.plain_result(
-            strings.messages["dec_passed_user_global"].format(
+            strings.messages["dec_passed_group_user"].format(
+                group=group,
                 user=pass_uid,
                 time=time_utils.time_format(time),
                 reason=strings.reason_format(reason),
@@ -668,56 +2129,42 @@ class ReNeBan(Star):
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("dec-ban")
-    async def dec_ban(
+    @filter.command("ban-batch")
+    @profiled
+    async def ban_batch(
         self,
         event: AstrMessageEvent,
-        banuser: str,
+        banusers: str,
         time: str = "0",
         reason: str | None = None,
         umo: str | None = None,
         end: str | None = None,
     ):
         """
-        删除指定用户的会话封禁时间。
-        格式：/dec-ban <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除封禁记录
-        示例：/dec-ban @张三 7d
-        注意：单次仅能操作一个会话的一个用户
+        在会话中批量禁用多个用户的使用权限。
+        格式：/ban-batch <@用户...|UID,UID,...> [时间（默认无期限）] [理由（默认无理由）] [UMO]
+        示例：/ban-batch @张三 @李四 7d 刷屏 或 /ban-batch 10001,10002 1d
+        注意：所有目标在一次同步中完成，逐项返回结果
         """
-        if end is not None:
-            # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("dec-ban"))
+        parsed = self._parse_batch_args(event, banusers, [time, reason, umo, end], 3)
+        if parsed is None:
+            yield event.plain_result(strings.command_error("ban-batch"))
             return
+        targets, (time, reason, umo) = parsed
+        time = time or "0"
         if umo == None:
             # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
             umo = EventUtils.get_event_umo(self.context, event)
         reason = strings.noreason_to_none(reason)
         try:
-            ban_uid: str
-            event_at: str | None = EventUtils.get_event_at(event)
-            if event_at:
-                ban_uid = event_at
-            else:
-                ban_uid = banuser
-        except AtUserCountError:
-            yield event.plain_result(strings.command_error("dec-ban"))
-            return
-        ban_list: dict[str, UserDataList] = self.data_manager.get_data("ban")
-        group_banned_list: UserDataList = ban_list.get(umo, UserDataList())
-        try:
-            remove_time: int = time_utils.timestr_to_int(time)
-            if not group_banned_list.subtract_time_from_data(
-                ban_uid,
-                remove_time,
+            results = await asyncio.to_thread(
+                self._batch_add,
+                "ban",
+                targets,
+                time_utils.timestr_to_int(time),
                 reason,
-            ):
-                yield event.plain_result(strings.messages["dec_no_record"])
-                return
-            self.data_manager.write_data("ban", ban_list)
-        except PermanentRecordTimeError:
-            yield event.plain_result(strings.messages["dec_zerotime_error"])
-            return
+                umo,
+            )
         except TimestrValueError as e:
             yield event.plain_result(
                 strings.messages["invalid_timestr_error"].format(
@@ -726,61 +2173,52 @@ class ReNeBan(Star):
             )
             return
 
+        for target, ok in results.items():
+            if ok:
+                self._record_trace(event, "ban", target, umo)
         yield event.plain_result(
-            strings.messages["dec_banned_user"].format(
-                user=ban_uid,
-                time=time_utils.time_format(time),
-                reason=strings.reason_format(reason),
-                umo=umo,
+            self._batch_report(
+                strings.messages["batch_action_ban"], umo, time, reason, results
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("dec-ban-all")
-    async def dec_ban_all(
+    @filter.command("pass-batch")
+    @profiled
+    async def pass_batch(
         self,
         event: AstrMessageEvent,
-        banuser: str,
+        passusers: str,
         time: str = "0",
         reason: str | None = None,
+        umo: str | None = None,
         end: str | None = None,
     ):
         """
-        删除指定用户的全局封禁时间。
-        格式：/dec-ban-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除封禁记录
-        示例：/dec-ban-all @张三 7d
-        注意：单次仅能操作一个用户
+        在会话中批量解除多个用户的禁用（允许临时解限）。
+        格式：/pass-batch <@用户...|UID,UID,...> [时间（默认无期限）] [理由（默认无理由）] [UMO]
+        示例：/pass-batch 10001,10002 1d
+        注意：所有目标在一次同步中完成，逐项返回结果
         """
-        if end is not None:
-            # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("dec-ban-all"))
+        parsed = self._parse_batch_args(event, passusers, [time, reason, umo, end], 3)
+        if parsed is None:
+            yield event.plain_result(strings.command_error("pass-batch"))
             return
+        targets, (time, reason, umo) = parsed
+        time = time or "0"
+        if umo == None:
+            # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
+            umo = EventUtils.get_event_umo(self.context, event)
         reason = strings.noreason_to_none(reason)
         try:
-            ban_uid: str
-            event_at: str | None = EventUtils.get_event_at(event)
-            if event_at:
-                ban_uid = event_at
-            else:
-                ban_uid = banuser
-        except AtUserCountError:
-            yield event.plain_result(strings.command_error("dec-ban-all"))
-            return
-        banall_list: UserDataList = self.data_manager.get_data("banall")
-        try:
-            remove_time: int = time_utils.timestr_to_int(time)
-            if not banall_list.subtract_time_from_data(
-                ban_uid,
-                remove_time,
+            results = await asyncio.to_thread(
+                self._batch_add,
+                "pass",
+                targets,
+                time_utils.timestr_to_int(time),
                 reason,
-            ):
-                yield event.plain_result(strings.messages["dec_no_record"])
-                return
-            self.data_manager.write_data("banall", banall_list)
-        except PermanentRecordTimeError:
-            yield event.plain_result(strings.messages["dec_zerotime_error"])
-            return
+                umo,
+            )
         except TimestrValueError as e:
             yield event.plain_result(
                 strings.messages["invalid_timestr_error"].format(
@@ -789,60 +2227,47 @@ class ReNeBan(Star):
             )
             return
 
+        for target, ok in results.items():
+            if ok:
+                self._record_trace(event, "pass", target, umo)
         yield event.plain_result(
-            strings.messages["dec_banned_user_global"].format(
-                user=ban_uid,
-                time=time_utils.time_format(time),
-                reason=strings.reason_format(reason),
+            self._batch_report(
+                strings.messages["batch_action_pass"], umo, time, reason, results
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("ban-umo")
-    async def ban_umo(
+    @filter.command("ban-all-batch")
+    @profiled
+    async def ban_all_batch(
         self,
         event: AstrMessageEvent,
-        umo: str,
+        banusers: str,
         time: str = "0",
         reason: str | None = None,
         end: str | None = None,
     ):
         """
-        禁用指定UMO的使用权限。
-        格式：/ban-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
-        示例：/ban-umo napcat:GroupMessage:1145141919 7d
-        注意：单次仅能禁用一个UMO
+        在全局批量禁用多个用户的使用权限。
+        格式：/ban-all-batch <@用户...|UID,UID,...> [时间（默认无期限）] [理由（默认无理由）]
+        示例：/ban-all-batch @张三 @李四 0 打广告
+        注意：所有目标在一次同步中完成，逐项返回结果
         """
-        if end is not None:
-            # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("ban-umo"))
+        parsed = self._parse_batch_args(event, banusers, [time, reason, end], 2)
+        if parsed is None:
+            yield event.plain_result(strings.command_error("ban-all-batch"))
             return
+        targets, (time, reason) = parsed
+        time = time or "0"
         reason = strings.noreason_to_none(reason)
-        umoban_list: UmoDataList = self.data_manager.get_data("umoban")
         try:
-            update_time: int = time_utils.timestr_to_int(time)
-            if not umoban_list.add_time_to_data(
-                umo,
-                update_time,
+            results = await asyncio.to_thread(
+                self._batch_add,
+                "banall",
+                targets,
+                time_utils.timestr_to_int(time),
                 reason,
-            ):
-                new_ban_item = UmoDataModel(
-                    umo=umo,
-                    time=(
-                        (int(time_module.time()) + update_time)
-                        if update_time != 0
-                        else 0
-                    ),
-                    reason=reason,
-                )
-                umoban_list.append(new_ban_item)
-            self.data_manager.write_data("umoban", umoban_list)
-        except PermanentRecordTimeError:
-            yield event.plain_result(
-                strings.messages["time_zeroset_error"].format(command="ban-umo")
             )
-            return
         except TimestrValueError as e:
             yield event.plain_result(
                 strings.messages["invalid_timestr_error"].format(
@@ -851,59 +2276,51 @@ class ReNeBan(Star):
             )
             return
 
+        for target, ok in results.items():
+            if ok:
+                self._record_trace(event, "ban-all", target)
         yield event.plain_result(
-            strings.messages["banned_umo"].format(
-                umo=umo,
-                time=time_utils.time_format(time),
-                reason=strings.reason_format(reason),
+            self._batch_report(
+                strings.messages["batch_action_ban"],
+                strings.messages["batch_scope_global"],
+                time,
+                reason,
+                results,
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("pass-umo")
-    async def pass_umo(
+    @filter.command("pass-all-batch")
+    @profiled
+    async def pass_all_batch(
         self,
         event: AstrMessageEvent,
-        umo: str,
+        passusers: str,
         time: str = "0",
         reason: str | None = None,
         end: str | None = None,
     ):
         """
-        解限指定UMO的使用权限。
-        格式：/pass-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示无期限
-        示例：/pass-umo napcat:GroupMessage:1145141919 7d
+        在全局批量解除多个用户的禁用（允许临时解限）。
+        格式：/pass-all-batch <@用户...|UID,UID,...> [时间（默认无期限）] [理由（默认无理由）]
+        示例：/pass-all-batch 10001,10002 12h
+        注意：所有目标在一次同步中完成，逐项返回结果
         """
-        if end is not None:
-            # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("pass-umo"))
+        parsed = self._parse_batch_args(event, passusers, [time, reason, end], 2)
+        if parsed is None:
+            yield event.plain_result(strings.command_error("pass-all-batch"))
             return
+        targets, (time, reason) = parsed
+        time = time or "0"
         reason = strings.noreason_to_none(reason)
-        umopass_list: UmoDataList = self.data_manager.get_data("umopass")
         try:
-            update_time: int = time_utils.timestr_to_int(time)
-            if not umopass_list.add_time_to_data(
-                umo,
-                update_time,
+            results = await asyncio.to_thread(
+                self._batch_add,
+                "passall",
+                targets,
+                time_utils.timestr_to_int(time),
                 reason,
-            ):
-                new_pass_item = UmoDataModel(
-                    umo=umo,
-                    time=(
-                        (int(time_module.time()) + update_time)
-                        if update_time != 0
-                        else 0
-                    ),
-                    reason=reason,
-                )
-                umopass_list.append(new_pass_item)
-            self.data_manager.write_data("umopass", umopass_list)
-        except PermanentRecordTimeError:
-            yield event.plain_result(
-                strings.messages["time_zeroset_error"].format(command="pass-umo")
             )
-            return
         except TimestrValueError as e:
             yield event.plain_result(
                 strings.messages["invalid_timestr_error"].format(
@@ -912,50 +2329,53 @@ class ReNeBan(Star):
             )
             return
 
+        for target, ok in results.items():
+            if ok:
+                self._record_trace(event, "pass-all", target)
         yield event.plain_result(
-            strings.messages["passed_umo"].format(
-                umo=umo,
-                time=time_utils.time_format(time),
-                reason=strings.reason_format(reason),
+            self._batch_report(
+                strings.messages["batch_action_pass"],
+                strings.messages["batch_scope_global"],
+                time,
+                reason,
+                results,
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("dec-ban-umo")
-    async def dec_ban_umo(
+    @filter.command("ban-umo-batch")
+    @profiled
+    async def ban_umo_batch(
         self,
         event: AstrMessageEvent,
-        umo: str,
+        umos: str,
         time: str = "0",
         reason: str | None = None,
         end: str | None = None,
     ):
         """
-        删除指定UMO的封禁时间。
-        格式：/dec-ban-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除封禁记录
-        示例：/dec-ban-umo napcat:GroupMessage:1145141919 7d
-        注意：单次仅能操作一个UMO
+        批量禁用多个会话。
+        格式：/ban-umo-batch <UMO,UMO,...> [时间（默认无期限）] [理由（默认无理由）]
+        示例：/ban-umo-batch napcat:GroupMessage:1,napcat:GroupMessage:2 3d
+        注意：所有目标在一次同步中完成，逐项返回结果
         """
-        if end is not None:
-            # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("dec-ban-umo"))
+        parsed = self._parse_batch_args(
+            event, umos, [time, reason, end], 2, use_ats=False
+        )
+        if parsed is None:
+            yield event.plain_result(strings.command_error("ban-umo-batch"))
             return
+        targets, (time, reason) = parsed
+        time = time or "0"
         reason = strings.noreason_to_none(reason)
-        umoban_list: UmoDataList = self.data_manager.get_data("umoban")
         try:
-            remove_time: int = time_utils.timestr_to_int(time)
-            if not umoban_list.subtract_time_from_data(
-                umo,
-                remove_time,
+            results = await asyncio.to_thread(
+                self._batch_add,
+                "umoban",
+                targets,
+                time_utils.timestr_to_int(time),
                 reason,
-            ):
-                yield event.plain_result(strings.messages["dec_no_record"])
-                return
-            self.data_manager.write_data("umoban", umoban_list)
-        except PermanentRecordTimeError:
-            yield event.plain_result(strings.messages["dec_zerotime_error"])
-            return
+            )
         except TimestrValueError as e:
             yield event.plain_result(
                 strings.messages["invalid_timestr_error"].format(
@@ -964,50 +2384,53 @@ class ReNeBan(Star):
             )
             return
 
+        for target, ok in results.items():
+            if ok:
+                self._record_trace(event, "ban-umo", None, target)
         yield event.plain_result(
-            strings.messages["dec_banned_umo"].format(
-                umo=umo,
-                time=time_utils.time_format(time),
-                reason=strings.reason_format(reason),
+            self._batch_report(
+                strings.messages["batch_action_ban"],
+                strings.messages["batch_scope_umo"],
+                time,
+                reason,
+                results,
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
-    @filter.command("dec-pass-umo")
-    async def dec_pass_umo(
+    @filter.command("pass-umo-batch")
+    @profiled
+    async def pass_umo_batch(
         self,
         event: AstrMessageEvent,
-        umo: str,
+        umos: str,
         time: str = "0",
         reason: str | None = None,
         end: str | None = None,
     ):
         """
-        删除指定UMO的解限时间。
-        格式：/dec-pass-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]
-        时间格式：数字+单位（d=天，h=小时，m=分钟，s=秒），如 1d 表示1天，12h 表示12个小时，不带单位默认秒，0表示彻底删除解限记录
-        示例：/dec-pass-umo napcat:GroupMessage:1145141919 7d
-        注意：单次仅能操作一个UMO
+        批量解除多个会话的禁用（允许临时解限）。
+        格式：/pass-umo-batch <UMO,UMO,...> [时间（默认无期限）] [理由（默认无理由）]
+        示例：/pass-umo-batch napcat:GroupMessage:1,napcat:GroupMessage:2 12h
+        注意：所有目标在一次同步中完成，逐项返回结果
         """
-        if end is not None:
-            # 若end存在，说明语法错误，发送错误信息并return
-            yield event.plain_result(strings.command_error("dec-pass-umo"))
+        parsed = self._parse_batch_args(
+            event, umos, [time, reason, end], 2, use_ats=False
+        )
+        if parsed is None:
+            yield event.plain_result(strings.command_error("pass-umo-batch"))
             return
+        targets, (time, reason) = parsed
+        time = time or "0"
         reason = strings.noreason_to_none(reason)
-        umopass_list: UmoDataList = self.data_manager.get_data("umopass")
         try:
-            remove_time: int = time_utils.timestr_to_int(time)
-            if not umopass_list.subtract_time_from_data(
-                umo,
-                remove_time,
+            results = await asyncio.to_thread(
+                self._batch_add,
+                "umopass",
+                targets,
+                time_utils.timestr_to_int(time),
                 reason,
-            ):
-                yield event.plain_result(strings.messages["dec_no_record"])
-                return
-            self.data_manager.write_data("umopass", umopass_list)
-        except PermanentRecordTimeError:
-            yield event.plain_result(strings.messages["dec_zerotime_error"])
-            return
+            )
         except TimestrValueError as e:
             yield event.plain_result(
                 strings.messages["invalid_timestr_error"].format(
@@ -1016,16 +2439,129 @@ class ReNeBan(Star):
             )
             return
 
+        for target, ok in results.items():
+            if ok:
+                self._record_trace(event, "pass-umo", None, target)
         yield event.plain_result(
-            strings.messages["dec_passed_umo"].format(
+            self._batch_report(
+                strings.messages["batch_action_pass"],
+                strings.messages["batch_scope_umo"],
+                time,
+                reason,
+                results,
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("strike")
+    @profiled
+    async def strike_user(
+        self,
+        event: AstrMessageEvent,
+        strikeuser: str,
+        reason: str | None = None,
+        umo: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        记录指定用户在会话中的一次违规，并按违规阶梯禁用。
+        格式：/strike <@用户|UID（QQ号）> [理由（默认无理由）] [UMO]
+        示例：/strike @张三 刷屏
+        注意：单次仅能操作一个会话的一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("strike"))
+            return
+        if umo == None:
+            # 若umo不存在，则使用EventUtils.get_event_umo(self.context, event)（当前群）
+            umo = EventUtils.get_event_umo(self.context, event)
+        reason = strings.noreason_to_none(reason)
+        try:
+            strike_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                strike_uid = event_at
+            else:
+                strike_uid = strikeuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("strike"))
+            return
+        try:
+            count, update_time = await asyncio.to_thread(
+                self._apply_strike, umo, strike_uid, reason
+            )
+        except PermanentRecordTimeError:
+            yield event.plain_result(
+                strings.messages["time_zeroset_error"].format(command="ban")
+            )
+            return
+
+        self._record_trace(event, "strike", strike_uid, umo)
+        yield event.plain_result(
+            strings.messages["strike_user"].format(
                 umo=umo,
-                time=time_utils.time_format(time),
+                user=strike_uid,
+                count=count,
+                time=time_utils.time_format(str(update_time)),
+                reason=strings.reason_format(reason),
+            )
+        )
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("strike-all")
+    @profiled
+    async def strike_all(
+        self,
+        event: AstrMessageEvent,
+        strikeuser: str,
+        reason: str | None = None,
+        end: str | None = None,
+    ):
+        """
+        记录指定用户在全局的一次违规，并按违规阶梯全局禁用。
+        格式：/strike-all <@用户|UID（QQ号）> [理由（默认无理由）]
+        示例：/strike-all @张三 发布违规内容
+        注意：单次仅能操作一个用户
+        """
+        if end is not None:
+            # 若end存在，说明语法错误，发送错误信息并return
+            yield event.plain_result(strings.command_error("strike-all"))
+            return
+        reason = strings.noreason_to_none(reason)
+        try:
+            strike_uid: str
+            event_at: str | None = EventUtils.get_event_at(event)
+            if event_at:
+                strike_uid = event_at
+            else:
+                strike_uid = strikeuser
+        except AtUserCountError:
+            yield event.plain_result(strings.command_error("strike-all"))
+            return
+        try:
+            count, update_time = await asyncio.to_thread(
+                self._apply_strike, None, strike_uid, reason
+            )
+        except PermanentRecordTimeError:
+            yield event.plain_result(
+                strings.messages["time_zeroset_error"].format(command="ban-all")
+            )
+            return
+
+        self._record_trace(event, "strike-all", strike_uid)
+        yield event.plain_result(
+            strings.messages["strike_user_global"].format(
+                user=strike_uid,
+                count=count,
+                time=time_utils.time_format(str(update_time)),
                 reason=strings.reason_format(reason),
             )
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
     @filter.command("ban-reset")
+    @profiled
     async def ban_reset(
         self, event: AstrMessageEvent, resetuser: str, end: str | None = None
     ):
@@ -1050,23 +2586,16 @@ class ReNeBan(Star):
             yield event.plain_result(strings.command_error("ban-reset"))
             return
 
-        user_datas: dict[str, dict[str, UserDataList] | UserDataList] = (
-            self.data_manager.get_data(["ban", "pass", "banall", "passall"])
-        )
-        for umo in list(user_datas["ban"].keys()):
-            user_datas["ban"][umo].remove_by_id(reset_uid)
-        for umo in list(user_datas["pass"].keys()):
-            user_datas["pass"][umo].remove_by_id(reset_uid)
-        user_datas["banall"].remove_by_id(reset_uid)
-        user_datas["passall"].remove_by_id(reset_uid)
-        self.data_manager.write_data(list(user_datas.keys()), list(user_datas.values()))
+        await asyncio.to_thread(self._reset_uid, reset_uid)
 
+        self._record_trace(event, "ban-reset", reset_uid)
         yield event.plain_result(
             strings.messages["ban_reset_success"].format(user=reset_uid)
         )
 
     @filter.permission_type(filter.PermissionType.ADMIN)
     @filter.command("ban-reset-umo")
+    @profiled
     async def ban_reset_umo(
         self, event: AstrMessageEvent, umo: str, end: str | None = None
     ):
@@ -1081,27 +2610,92 @@ class ReNeBan(Star):
             yield event.plain_result(strings.command_error("ban-reset-umo"))
             return
 
-        umo_datas: dict[str, UmoDataList] = self.data_manager.get_data(
-            ["umoban", "umopass"]
-        )
-        umo_datas["umoban"].remove_by_id(umo)
-        umo_datas["umopass"].remove_by_id(umo)
-        self.data_manager.write_data(list(umo_datas.keys()), list(umo_datas.values()))
+        await asyncio.to_thread(self._reset_umo, umo)
 
+        self._record_trace(event, "ban-reset-umo", None, umo)
         yield event.plain_result(
             strings.messages["ban_reset_umo_success"].format(umo=umo)
         )
 
     # 设置优先级，可在其他低优先级（priority<114）的命令/监听器/钩子前过滤
     @filter.event_message_type(filter.EventMessageType.ALL, priority=114)
+    @profiled
     async def filter_banned_users(self, event: AstrMessageEvent):
         """
         全局事件过滤器：
         如果禁用功能启用且发送者被禁用，则停止事件传播，机器人不再响应该用户的消息。
         """
-        if EventUtils.is_banned(self.enable, self.data_manager, self.context, event)[0]:
+        if not MODEL_LIST_REGISTRY.running:
+            MODEL_LIST_REGISTRY.start()
+        if self.trace_recorder is not None:
+            self.trace_recorder.record(
+                EventUtils.get_event_umo(self.context, event),
+                event.get_sender_id(),
+                FILTER_COMMAND,
+            )
+        if EventUtils.is_banned(
+            self.enable,
+            self.data_manager,
+            self.context,
+            event,
+            self.verdict_cache,
+        )[0]:
+            event.stop_event()
+            return
+        if not self.enable or event.is_admin():
+            return
+        if self.flood_guard:
+            umo = EventUtils.get_event_umo(self.context, event)
+            uid = event.get_sender_id()
+            if self.flood_guard.hit(umo, uid):
+                if self.flood_ban_time is not None:
+                    await asyncio.to_thread(
+                        self._auto_ban,
+                        umo,
+                        uid,
+                        self.flood_ban_time,
+                        strings.messages["flood_ban_reason"],
+                    )
+                    self.flood_guard.reset(umo, uid)
+                event.stop_event()
+                return
+        if not self.content_filter:
+            return
+        rule = self.content_filter.match(EventUtils.get_event_plain_text(event))
+        if rule is not None:
+            await asyncio.to_thread(
+                self._auto_ban,
+                EventUtils.get_event_umo(self.context, event),
+                event.get_sender_id(),
+                self.content_ban_time,
+                strings.messages["content_ban_reason"].format(rule=rule),
+            )
             event.stop_event()
 
     async def terminate(self):
-        """可选择实现 terminate 函数，当插件被卸载/停用时会调用。"""
-        MODEL_LIST_REGISTRY.stop_event.set()
+        """
+        可选择实现 terminate 函数，当插件被卸载/停用时会调用。
+
+        停止后台任务与线程，等待进行中的写入完成，丢弃所有缓存并将缓存列表从过期清理任务中移除，
+        使插件重载后旧实例不残留线程、列表与内存。
+        """
+        # 停止过期清理任务与复制
+        await MODEL_LIST_REGISTRY.stop()
+        if self.replication_publisher is not None:
+            self.replication_publisher.stop()
+        if self.replication_follower is not None:
+            await asyncio.to_thread(self.replication_follower.stop, 5)
+        if self.trace_recorder is not None:
+            await asyncio.to_thread(self.trace_recorder.close)
+        self.profiler.finish()
+        METRICS.write_prometheus(self.data_manager.data_dir / "metrics.prom")
+        # 等待进行中的写入完成并释放数据文件管理器
+        await asyncio.to_thread(self.data_manager.close)
+        # 丢弃派生缓存
+        self.record_index.clear()
+        self.verdict_cache.clear()
+        self.banlist_renderer.clear()
+        self.flood_guard.clear()
+        UMO_RESOLVER.clear()
+        REASON_TABLE.clear()
+        logger.info(f"ReNeBan 已停止，进程资源：{measure_resources().format()}")
@@ -0,0 +1,290 @@
+"""
+Memory accounting for ReNeBan plugin
+Walks the live blacklist structures and estimates their memory footprint
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import types
+
+from .datafile_manager import DatafileManager
+from .metrics import METRICS
+from .user_manager import (
+    BaseDataModel,
+    BaseModelList,
+    MODEL_LIST_REGISTRY,
+    REASON_TABLE,
+)
+
+_THREADS = METRICS.gauge("reneban_threads", "进程中的线程数")
+_RSS_BYTES = METRICS.gauge("reneban_rss_bytes", "进程常驻内存（字节）")
+_LIVE_MANAGERS = METRICS.gauge("reneban_live_data_managers", "存活的数据文件管理器数")
+
+
+def _deep_sizeof(obj, seen: set[int]) -> int:
+    """
+    估算对象及其引用对象的内存占用（字节），seen 中的对象只计一次
+    """
+    if id(obj) in seen:
+        return 0
+    # 类型、模块、函数与锁不属于数据本身，不计入
+    if isinstance(
+        obj, (type, types.ModuleType, types.FunctionType, types.MethodType)
+    ) or isinstance(obj, type(threading.RLock())):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, BaseDataModel):
+        for slot in BaseDataModel.__slots__:
+            size += _deep_sizeof(object.__getattribute__(obj, slot), seen)
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _deep_sizeof(key, seen) + _deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += _deep_sizeof(item, seen)
+    if isinstance(obj, BaseModelList):
+        size += _deep_sizeof(vars(obj), seen)
+    return size
+
+
+class _StringStats:
+    """
+    统计同值字符串的重复情况
+    """
+
+    def __init__(self):
+        self.refs: int = 0  # 引用次数
+        self._objects: dict[str, dict[int, int]] = {}  # 值 -> {对象id: 大小}
+        self._refs: dict[str, int] = {}  # 值 -> 引用次数
+
+    def add(self, value: str | None) -> None:
+        if value is None:
+            return
+        self.refs += 1
+        self._objects.setdefault(value, {})[id(value)] = sys.getsizeof(value)
+        self._refs[value] = self._refs.get(value, 0) + 1
+
+    @property
+    def unique_values(self) -> int:
+        return len(self._objects)
+
+    @property
+    def objects(self) -> int:
+        return sum(len(objs) for objs in self._objects.values())
+
+    @property
+    def duplicated_objects(self) -> int:
+        """同值但不同对象的多余副本数"""
+        return self.objects - self.unique_values
+
+    @property
+    def duplicated_bytes(self) -> int:
+        """多余副本占用的字节数"""
+        return sum(
+            sum(objs.values()) - max(objs.values())
+            for objs in self._objects.values()
+        )
+
+    @property
+    def shared_bytes(self) -> int:
+        """因共享字符串对象（驻留）而节省的字节数（相对于每处引用各持一份副本）"""
+        return sum(
+            (self._refs[value] - len(objs)) * max(objs.values())
+            for value, objs in self._objects.items()
+        )
+
+    def top_duplicated(self, top: int) -> list[tuple[str, int]]:
+        """副本数最多的值"""
+        return sorted(
+            ((value, len(objs)) for value, objs in self._objects.items()),
+            key=lambda kv: kv[1],
+            reverse=True,
+        )[:top]
+
+
+class MemoryReport:
+    """
+    内存占用报告
+    """
+
+    def __init__(self):
+        self.scopes: dict[str, tuple[int, int]] = {}  # 数据名 -> (记录数, 字节数)
+        self.umos: dict[str, tuple[int, int]] = {}  # "数据名:UMO" -> (记录数, 字节数)
+        self.record_types: dict[str, tuple[int, int]] = {}  # 记录类型 -> (记录数, 字节数)
+        self.commits_bytes: int = 0  # 未释放的写入提交占用
+        self.total_bytes: int = 0
+        self.reasons = _StringStats()
+        self.ids = _StringStats()
+        self.reason_table_size: int = 0  # 理由驻留表中的取值数
+
+    @property
+    def total_records(self) -> int:
+        return sum(records for records, _ in self.scopes.values())
+
+    def largest_umos(self, top: int = 5) -> list[tuple[str, int, int]]:
+        """占用最大的 UMO 分片 [(数据名:UMO, 记录数, 字节数)]"""
+        return sorted(
+            ((umo, records, size) for umo, (records, size) in self.umos.items()),
+            key=lambda item: item[2],
+            reverse=True,
+        )[:top]
+
+    def format(self, top: int = 5) -> str:
+        """格式化为易读的文本"""
+        lines = [
+            f"总计 {self.total_records} 条记录，约 {self.total_bytes / 1024:.1f} KiB"
+        ]
+        lines.append("各数据：")
+        for name, (records, size) in self.scopes.items():
+            lines.append(f" - {name}：{records} 条，{size / 1024:.1f} KiB")
+        lines.append("各记录类型：")
+        for name, (records, size) in self.record_types.items():
+            lines.append(
+                f" - {name}：{records} 条，{size / 1024:.1f} KiB"
+                f"（平均 {size / records if records else 0:.0f} B/条）"
+            )
+        if self.commits_bytes:
+            lines.append(f"未释放的写入提交：{self.commits_bytes / 1024:.1f} KiB")
+        lines.append(
+            f"理由字符串：{self.reasons.refs} 处引用，{self.reasons.unique_values} 种取值，"
+            f"{self.reasons.duplicated_objects} 个重复副本（{self.reasons.duplicated_bytes / 1024:.1f} KiB），"
+            f"驻留节省 {self.reasons.shared_bytes / 1024:.1f} KiB，驻留表 {self.reason_table_size} 项"
+        )
+        lines.append(
+            f"ID 字符串：{self.ids.refs} 处引用，{self.ids.unique_values} 种取值，"
+            f"{self.ids.duplicated_objects} 个重复副本（{self.ids.duplicated_bytes / 1024:.1f} KiB），"
+            f"驻留节省 {self.ids.shared_bytes / 1024:.1f} KiB"
+        )
+        for value, copies in self.reasons.top_duplicated(top):
+            if copies > 1:
+                lines.append(f" - 理由「{value}」：{copies} 个副本")
+        largest = self.largest_umos(top)
+        if largest:
+            lines.append("占用最大的 UMO：")
+            for umo, records, size in largest:
+                lines.append(f" - {umo}：{records} 条，{size / 1024:.1f} KiB")
+        return "\n".join(lines)
+
+
+def measure_memory(data_manager: DatafileManager) -> MemoryReport:
+    """
+    遍历 DatafileManager 持有的缓存数据，估算内存占用
+
+    同一对象在整个遍历中只计一次，因此被多处共享（如驻留）的字符串不会被重复计算。
+
+    Args:
+        data_manager: 数据文件管理器
+
+    Returns:
+        内存占用报告
+    """
+    report = MemoryReport()
+    seen: set[int] = set()
+    record_types: dict[str, list[int]] = {}
+
+    def measure_list(lst: BaseModelList) -> int:
+        # 先计入记录，以便按记录类型统计
+        size = 0
+        for item in lst:
+            item_size = _deep_sizeof(item, seen)
+            stats = record_types.setdefault(type(item).__name__, [0, 0])
+            stats[0] += 1
+            stats[1] += item_size
+            size += item_size
+            report.reasons.add(item.reason)
+            report.ids.add(item._get_id_field_value())
+        return size + _deep_sizeof(lst, seen)
+
+    data = data_manager.get_clear_data(no_copy=True)
+    for name, value in data.items():
+        if isinstance(value, dict):
+            size = sys.getsizeof(value)
+            seen.add(id(value))
+            records = 0
+            for umo, lst in value.items():
+                report.ids.add(umo)
+                umo_size = _deep_sizeof(umo, seen) + measure_list(lst)
+                report.umos[f"{name}:{umo}"] = (len(lst), umo_size)
+                size += umo_size
+                records += len(lst)
+            report.scopes[name] = (records, size)
+        else:
+            report.scopes[name] = (len(value), measure_list(value))
+
+    report.record_types = {
+        name: (stats[0], stats[1]) for name, stats in record_types.items()
+    }
+    report.reason_table_size = len(REASON_TABLE)
+    report.commits_bytes = (
+        _deep_sizeof(data_manager._commits, seen) if data_manager._commits else 0
+    )
+    report.total_bytes = (
+        sum(size for _, size in report.scopes.values()) + report.commits_bytes
+    )
+    return report
+
+
+class ResourceUsage:
+    """
+    进程资源占用（用于发现插件重载后未释放的线程、列表与内存）
+    """
+
+    def __init__(self):
+        self.threads: int = 0  # 线程数
+        self.tasks: int | None = None  # 当前事件循环中的任务数（不在事件循环中时为 None）
+        self.registered_lists: int = 0  # 过期清理任务追踪的列表数
+        self.live_managers: int = 0  # 存活的 DatafileManager 实例数
+        self.reason_table_size: int = 0  # 理由驻留表中的取值数
+        self.rss_bytes: int | None = None  # 常驻内存（平台不支持时为 None）
+
+    def format(self) -> str:
+        """格式化为易读的文本"""
+        rss = (
+            f"{self.rss_bytes / 1024 / 1024:.1f} MiB"
+            if self.rss_bytes is not None
+            else "未知"
+        )
+        tasks = f"，事件循环任务 {self.tasks} 个" if self.tasks is not None else ""
+        return (
+            f"线程 {self.threads} 个{tasks}，追踪列表 {self.registered_lists} 个，"
+            f"数据管理器 {self.live_managers} 个，理由驻留表 {self.reason_table_size} 项，"
+            f"常驻内存 {rss}"
+        )
+
+
+def _rss_bytes() -> int | None:
+    """读取当前进程的常驻内存（仅支持提供 /proc 的平台）"""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def measure_resources() -> ResourceUsage:
+    """
+    统计进程资源占用，并更新相应的运行时指标
+
+    Returns:
+        资源占用
+    """
+    usage = ResourceUsage()
+    usage.threads = threading.active_count()
+    try:
+        usage.tasks = len(asyncio.all_tasks())
+    except RuntimeError:
+        usage.tasks = None
+    usage.registered_lists = len(MODEL_LIST_REGISTRY)
+    usage.live_managers = DatafileManager.live_instances()
+    usage.reason_table_size = len(REASON_TABLE)
+    usage.rss_bytes = _rss_bytes()
+    _THREADS.set(usage.threads)
+    _LIVE_MANAGERS.set(usage.live_managers)
+    if usage.rss_bytes is not None:
+        _RSS_BYTES.set(usage.rss_bytes)
+    return usage
@@ -0,0 +1,203 @@
+"""
+Blacklist merge for ReNeBan plugin
+Deterministic last-writer-wins merge of a peer's export by a sorted-key join
+"""
+
+import time as time_module
+from pathlib import Path
+
+from .bulk_io import SCOPES, detect_format, is_truthy, _iter_raw, _parse_record
+from .datafile_manager import DatafileManager
+from .user_manager import (
+    CLOCK,
+    BaseDataModel,
+    BaseModelList,
+    UmoDataModel,
+    UserDataModel,
+)
+
+from astrbot.api import logger
+
+# 合并条目：(数据名, 键, ID) , (ts, origin), 到期时间戳, 理由, 是否为墓碑
+_Key = tuple[str, str, str]
+_Version = tuple[int, str]
+_Entry = tuple[_Key, _Version, int, str | None, bool]
+
+
+class MergeReport:
+    """
+    合并报告
+    """
+
+    def __init__(self):
+        self.read: int = 0  # 读取的行数
+        self.added: int = 0  # 新增的记录数
+        self.updated: int = 0  # 被对方较新版本覆盖的记录数
+        self.deleted: int = 0  # 因对方较新的墓碑而删除的记录数
+        self.kept: int = 0  # 本地版本较新或相同而保留的记录数
+        self.invalid: int = 0  # 格式无效而跳过的记录数
+        self.elapsed: float = 0.0  # 耗时（秒）
+
+    def format(self) -> str:
+        """格式化为易读的文本"""
+        return (
+            f"读取 {self.read} 行，新增 {self.added} 条，覆盖 {self.updated} 条，"
+            f"删除 {self.deleted} 条，保留本地 {self.kept} 条，无效 {self.invalid} 条，"
+            f"耗时 {self.elapsed:.2f}s"
+        )
+
+
+def _parse_entry(raw: dict) -> _Entry | str:
+    """
+    校验一条对方记录（已过期的记录同样参与合并，以其版本覆盖本地较旧的记录）
+    """
+    parsed = _parse_record({**raw, "deleted": None}, 0)
+    if isinstance(parsed, str):
+        return parsed
+    scope, key, id_value, expire_time, reason = parsed
+    ts = raw.get("ts") or 0
+    if isinstance(ts, str):
+        try:
+            ts = int(ts)
+        except ValueError:
+            return f"版本时间戳 {ts!r} 不是整数"
+    if not isinstance(ts, int) or ts < 0:
+        return f"版本时间戳 {ts!r} 不合法"
+    origin = raw.get("origin") or ""
+    if not isinstance(origin, str):
+        return "版本节点标识不是字符串"
+    return (
+        (scope, key, id_value),
+        (ts, origin),
+        expire_time,
+        reason,
+        is_truthy(raw.get("deleted")),
+    )
+
+
+def _local_entries(
+    data: dict[str, dict[str, BaseModelList] | BaseModelList],
+    data_manager: DatafileManager,
+) -> list[tuple[_Key, _Version, BaseDataModel | None]]:
+    """
+    获取本地记录与墓碑（按键排序；同一键同时存在记录与墓碑时取版本较新者）
+    """
+    entries: dict[_Key, tuple[_Version, BaseDataModel | None]] = {}
+    for scope, value in data.items():
+        groups = value.items() if isinstance(value, dict) else (("", value),)
+        for key, lst in groups:
+            for item in lst:
+                entries[(scope, key, item._get_id_field_value())] = (
+                    item.version(),
+                    item,
+                )
+    for tomb_key, version in data_manager.tombstones.items():
+        if tomb_key[0] in data:
+            current = entries.get(tomb_key)
+            if current is None or current[0] < version:
+                entries[tomb_key] = (version, None)
+    return sorted(
+        ((key, version, item) for key, (version, item) in entries.items()),
+        key=lambda entry: entry[0],
+    )
+
+
+def merge_records(
+    data_manager: DatafileManager, path: Path, fmt: str | None = None
+) -> MergeReport:
+    """
+    以后写者胜（LWW）规则合并对方节点导出的 JSONL/CSV 文件（含墓碑）
+
+    对方记录与本地记录/墓碑各自按 (数据名, 键, ID) 排序后归并连接，同一键取版本 (ts, origin) 较大者，
+    总复杂度 O(n log n)；相同输入无论合并顺序如何都收敛到相同结果。所有修改在一次事务中完成。
+
+    Args:
+        data_manager: 数据文件管理器
+        path: 文件路径
+        fmt: 文件格式（jsonl 或 csv），为 None 时根据扩展名判断
+
+    Returns:
+        合并报告
+    """
+    fmt = fmt or detect_format(path)
+    report = MergeReport()
+    start = time_module.perf_counter()
+
+    remote: dict[_Key, _Entry] = {}
+    for raw in _iter_raw(path, fmt):
+        report.read += 1
+        parsed = _parse_entry(raw) if raw is not None else "无法解析"
+        if isinstance(parsed, str):
+            report.invalid += 1
+            if report.invalid <= 10:
+                logger.warning(f"合并 {path.name} 第 {report.read} 条记录无效：{parsed}")
+            continue
+        # 对方文件中同一键出现多次时取版本较新者
+        current = remote.get(parsed[0])
+        if current is None or current[1] < parsed[1]:
+            remote[parsed[0]] = parsed
+        CLOCK.observe(parsed[1][0])
+    remote_entries = sorted(remote.values(), key=lambda entry: entry[0])
+    scopes = sorted({entry[0][0] for entry in remote_entries})
+    if not scopes:
+        report.elapsed = time_module.perf_counter() - start
+        return report
+
+    with data_manager.transaction(scopes, from_cache=True) as data:
+        data_manager.tombstones.load()
+        local_entries = _local_entries(data, data_manager)
+        i = 0
+        for key, version, expire_time, reason, deleted in remote_entries:
+            # 归并：跳过本地较小的键
+            while i < len(local_entries) and local_entries[i][0] < key:
+                i += 1
+            local = (
+                local_entries[i]
+                if i < len(local_entries) and local_entries[i][0] == key
+                else None
+            )
+            if local is not None and local[1] >= version:
+                report.kept += 1
+                continue
+            local_item = local[2] if local is not None else None
+            scope, group_key, id_value = key
+            is_dict, list_type, model_type = SCOPES[scope]
+            if deleted:
+                data_manager.tombstones.put(key, *version)
+                if local_item is not None:
+                    target_list = data[scope][group_key] if is_dict else data[scope]
+                    target_list.remove_by_id(id_value)
+                    report.deleted += 1
+                continue
+            if local_item is not None:
+                local_item.assign_version(expire_time, reason, *version)
+                report.updated += 1
+                continue
+            if is_dict:
+                if data[scope].get(group_key) is None:
+                    data[scope][group_key] = list_type()
+                target_list = data[scope][group_key]
+            else:
+                target_list = data[scope]
+            if model_type is UmoDataModel:
+                item = UmoDataModel(
+                    umo=id_value,
+                    time=expire_time,
+                    reason=reason,
+                    ts=version[0],
+                    origin=version[1],
+                )
+            else:
+                item = UserDataModel(
+                    uid=id_value,
+                    time=expire_time,
+                    reason=reason,
+                    ts=version[0],
+                    origin=version[1],
+                )
+            target_list.append(item)
+            report.added += 1
+        data_manager.tombstones.save()
+
+    report.elapsed = time_module.perf_counter() - start
+    return report
@@ -0,0 +1,234 @@
+"""
+Metrics for ReNeBan plugin
+Lightweight counters, gauges and latency histograms with Prometheus text export
+"""
+
+import bisect
+import threading
+import time as time_module
+from contextlib import contextmanager
+from pathlib import Path
+
+# 默认的延迟直方图分桶（秒）
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+# 默认的字节数直方图分桶
+DEFAULT_BYTES_BUCKETS: tuple[float, ...] = (
+    1024,
+    4096,
+    16384,
+    65536,
+    262144,
+    1048576,
+    4194304,
+    16777216,
+)
+
+
+class Counter:
+    """单调递增计数器"""
+
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """可增可减的瞬时值"""
+
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value: float = 0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class Histogram:
+    """固定分桶直方图"""
+
+    __slots__ = ("name", "help", "buckets", "bucket_counts", "count", "sum")
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # 最后一个桶为 +Inf
+        self.bucket_counts: list[int] = [0] * (len(self.buckets) + 1)
+        self.count: int = 0
+        self.sum: float = 0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self):
+        """计时上下文管理器，将代码块耗时（秒）记入直方图"""
+        start = time_module.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time_module.perf_counter() - start)
+
+    def quantile(self, q: float) -> float:
+        """
+        根据分桶估算分位数（返回所在桶的上界，落在 +Inf 桶时返回最大有限上界）
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bound
+        return self.buckets[-1] if self.buckets else 0.0
+
+
+class MetricsRegistry:
+    """
+    指标注册器
+
+    同名指标只会创建一次，重复获取返回同一对象。
+    指标的增减不加锁，在多线程下为近似值，这对运行时观测已经足够。
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+        self.start_time: float = time_module.time()
+
+    def _get_or_create(self, cls, name: str, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise TypeError(
+                    f"metric {name!r} is already registered as {type(metric).__name__}"
+                )
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        """获取（或创建）计数器"""
+        return self._get_or_create(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        """获取（或创建）瞬时值"""
+        return self._get_or_create(Gauge, name, help)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        """获取（或创建）直方图"""
+        return self._get_or_create(Histogram, name, help, buckets)
+
+    def get(self, name: str) -> Counter | Gauge | Histogram | None:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """将所有指标归零（保留指标对象本身，已持有的引用仍然有效）"""
+        with self._lock:
+            for metric in self._metrics.values():
+                if isinstance(metric, Histogram):
+                    metric.bucket_counts = [0] * len(metric.bucket_counts)
+                    metric.count = 0
+                    metric.sum = 0
+                else:
+                    metric.value = 0
+            self.start_time = time_module.time()
+
+    def summary(self) -> str:
+        """
+        生成易读的指标摘要
+        """
+        uptime = max(time_module.time() - self.start_time, 1e-9)
+        lines = [f"统计时长：{uptime:.0f}s"]
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            if isinstance(metric, Counter):
+                lines.append(
+                    f"{metric.help}：{metric.value:g}（{metric.value / uptime:.2f}/s）"
+                )
+            elif isinstance(metric, Gauge):
+                lines.append(f"{metric.help}：{metric.value:g}")
+            elif metric.count:
+                lines.append(
+                    f"{metric.help}：{metric.count} 次，平均 {metric.sum / metric.count:.6g}，"
+                    f"p50≤{metric.quantile(0.5):g}，p99≤{metric.quantile(0.99):g}"
+                )
+            else:
+                lines.append(f"{metric.help}：0 次")
+        return "\n".join(lines)
+
+    def render_prometheus(self) -> str:
+        """
+        生成 Prometheus 文本格式
+        """
+        lines: list[str] = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            if isinstance(metric, Counter):
+                lines.append(f"# TYPE {metric.name} counter")
+                lines.append(f"{metric.name} {metric.value:g}")
+            elif isinstance(metric, Gauge):
+                lines.append(f"# TYPE {metric.name} gauge")
+                lines.append(f"{metric.name} {metric.value:g}")
+            else:
+                lines.append(f"# TYPE {metric.name} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(metric.buckets, metric.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric.name}_bucket{{le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric.name}_bucket{{le="+Inf"}} {metric.count}')
+                lines.append(f"{metric.name}_sum {metric.sum:g}")
+                lines.append(f"{metric.name}_count {metric.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        """
+        将指标以 Prometheus 文本格式写入文件（先写临时文件再替换，避免采集到半个文件）
+        """
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(self.render_prometheus(), encoding="utf-8")
+        tmp_path.replace(path)
+
+
+METRICS = MetricsRegistry()
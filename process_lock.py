@@ -0,0 +1,111 @@
+"""
+Cross-process coordination for ReNeBan plugin
+Advisory file lock and on-disk generation counter shared by processes using one data directory
+"""
+
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows 等平台不支持 fcntl，退化为仅进程内同步
+    fcntl = None
+
+
+class InterProcessLock:
+    """
+    可重入的跨进程咨询锁
+
+    基于 fcntl.flock 对数据目录中的锁文件加排他锁，同一进程内可重入（按深度计数），
+    须在进程内锁的保护下使用；平台不支持 fcntl 时退化为空操作。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd: int | None = None
+        self._depth = 0
+
+    @property
+    def supported(self) -> bool:
+        """当前平台是否支持跨进程锁"""
+        return fcntl is not None
+
+    def acquire(self) -> None:
+        """获取锁（阻塞直至其他进程释放）"""
+        if self._depth == 0 and fcntl is not None:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        self._depth += 1
+
+    def release(self) -> None:
+        """释放锁（最外层释放时才真正解锁）"""
+        if self._depth == 0:
+            raise RuntimeError("release unlocked lock")
+        self._depth -= 1
+        if self._depth == 0 and fcntl is not None and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """关闭锁文件（持有锁时会一并释放）"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._depth = 0
+
+    def __enter__(self) -> "InterProcessLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+class DiskGeneration:
+    """
+    磁盘上的数据代数
+
+    每次有进程提交了变更后递增（写入临时文件后 rename 替换），
+    其他进程以一次 stat 比较 (inode, mtime, size) 即可判断是否有新的提交，无需读取数据文件。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.value: int = 0
+        self._stamp: tuple[int, int, int] | None = None
+        self.refresh()
+
+    def _stat_stamp(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def changed(self) -> bool:
+        """自上次 refresh()/bump() 以来是否有其他进程提交了变更"""
+        return self._stat_stamp() != self._stamp
+
+    def refresh(self) -> int:
+        """读取磁盘上的代数并记录其状态"""
+        self._stamp = self._stat_stamp()
+        try:
+            self.value = int(self.path.read_text(encoding="utf-8").strip() or 0)
+        except (FileNotFoundError, ValueError):
+            self.value = 0
+        return self.value
+
+    def bump(self) -> int:
+        """
+        递增磁盘上的代数（调用时须持有跨进程锁）
+
+        Returns:
+            递增后的代数
+        """
+        self.refresh()
+        self.value += 1
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(str(self.value), encoding="utf-8")
+        tmp_path.replace(self.path)
+        self._stamp = self._stat_stamp()
+        return self.value
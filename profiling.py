@@ -0,0 +1,361 @@
+"""
+Profiling for ReNeBan plugin
+Phase-level timing spans, slow-operation logging and pluggable span hooks
+"""
+
+import cProfile
+import functools
+import inspect
+import threading
+import time as time_module
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from .metrics import METRICS
+
+from astrbot.api import logger
+
+
+class Span:
+    """
+    一段计时区间
+    """
+
+    __slots__ = ("name", "start", "duration", "attrs", "parent")
+
+    def __init__(self, name: str, attrs: dict, parent: "Span | None" = None):
+        self.name = name
+        self.start: float = time_module.time()
+        self.duration: float = 0.0  # 耗时（秒）
+        self.attrs = attrs
+        self.parent = parent
+
+
+class SpanHook:
+    """
+    计时区间钩子基类，继承并重写相应方法后通过 Tracer.add_hook() 注册，
+    即可将区间转发至自己的追踪系统
+    """
+
+    def on_span(self, span: Span) -> None:
+        """每个区间结束时调用（包括顶层操作）"""
+        pass
+
+    def on_slow_operation(self, root: Span, spans: list[Span]) -> None:
+        """顶层操作耗时超过阈值时调用，spans 为其下所有已结束的子区间"""
+        pass
+
+
+class Tracer:
+    """
+    计时器
+
+    operation() 开启一个顶层操作，其内的 span() 作为阶段计入该操作；
+    顶层操作结束时若耗时超过 slow_threshold_ms，则输出一条含阶段耗时明细的日志。
+    所有区间的耗时同时记入 reneban_phase_<name>_seconds 直方图。
+    """
+
+    def __init__(self, slow_threshold_ms: float = 500):
+        """
+        初始化计时器
+
+        Args:
+            slow_threshold_ms: 慢操作阈值（毫秒），小于等于 0 时不输出慢操作日志
+        """
+        self.slow_threshold_ms = slow_threshold_ms
+        self._hooks: list[SpanHook] = []
+        self._local = threading.local()
+
+    def add_hook(self, hook: SpanHook) -> None:
+        """注册钩子"""
+        if hook not in self._hooks:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook: SpanHook) -> None:
+        """移除钩子"""
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def _finish(self, span: Span, start: float) -> None:
+        span.duration = time_module.perf_counter() - start
+        METRICS.histogram(
+            f"reneban_phase_{span.name}_seconds", f"{span.name} 阶段耗时（秒）"
+        ).observe(span.duration)
+        for hook in self._hooks:
+            try:
+                hook.on_span(span)
+            except Exception as e:
+                logger.error(f"计时钩子 {hook!r} 执行失败：{e}")
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        计时一个阶段，可在代码块内向 span.attrs 写入记录数等信息
+        """
+        parent: Span | None = getattr(self._local, "current", None)
+        span = Span(name, attrs, parent)
+        self._local.current = span
+        start = time_module.perf_counter()
+        try:
+            yield span
+        finally:
+            self._local.current = parent
+            self._finish(span, start)
+            collected: list[Span] | None = getattr(self._local, "collected", None)
+            if collected is not None:
+                collected.append(span)
+
+    @contextmanager
+    def operation(self, name: str, **attrs):
+        """
+        计时一个顶层操作（可嵌套，嵌套时按普通阶段处理）
+        """
+        if getattr(self._local, "collected", None) is not None:
+            with self.span(name, **attrs) as span:
+                yield span
+            return
+
+        self._local.collected = []
+        root = Span(name, attrs)
+        self._local.current = root
+        start = time_module.perf_counter()
+        try:
+            yield root
+        finally:
+            spans: list[Span] = self._local.collected
+            self._local.collected = None
+            self._local.current = None
+            self._finish(root, start)
+            if (
+                self.slow_threshold_ms > 0
+                and root.duration * 1000 >= self.slow_threshold_ms
+            ):
+                self._report_slow(root, spans)
+
+    def _report_slow(self, root: Span, spans: list[Span]) -> None:
+        """输出慢操作日志并通知钩子"""
+        # 同名阶段合并计时
+        phases: dict[str, list[float]] = {}
+        for span in spans:
+            if span.parent is root:
+                phase = phases.setdefault(span.name, [0.0, 0])
+                phase[0] += span.duration
+                phase[1] += 1
+        breakdown = "，".join(
+            f"{name}={total * 1000:.1f}ms" + (f"×{count}" if count > 1 else "")
+            for name, (total, count) in sorted(
+                phases.items(), key=lambda kv: kv[1][0], reverse=True
+            )
+        )
+        attrs = "，".join(f"{k}={v}" for k, v in root.attrs.items())
+        logger.warning(
+            f"慢操作 {root.name} 耗时 {root.duration * 1000:.1f}ms（{breakdown}）"
+            + (f"，{attrs}" if attrs else "")
+        )
+        for hook in self._hooks:
+            try:
+                hook.on_slow_operation(root, spans)
+            except Exception as e:
+                logger.error(f"计时钩子 {hook!r} 执行失败：{e}")
+
+
+class SamplingProfiler:
+    """
+    按需采样器
+
+    arm() 后对接下来的 N 次调用开启 cProfile 采样并跟踪内存分配，
+    满 N 次后将 pstats 文件与内存分配排行写入输出目录并自动关闭。
+    内存分配排行为采样期间净增长最多的代码行（与开始采样时的快照比较），并附带采样期间的内存峰值。
+    异步调用只在两次挂起之间的同步片段开启 cProfile（见 run()），挂起期间事件循环上的其他调用
+    不会被计入，并发的调用也不会重复开启同一个 cProfile。
+    """
+
+    def __init__(self):
+        self._profile: cProfile.Profile | None = None
+        self._remaining: int = 0
+        self._output_dir: Path | None = None
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._started_tracemalloc: bool = False
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self._profile is not None
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    def arm(self, calls: int, output_dir: Path) -> None:
+        """
+        开始采样
+
+        Args:
+            calls: 采样的调用次数
+            output_dir: 结果输出目录
+        """
+        with self._lock:
+            if self._profile is not None:
+                raise RuntimeError("profiler is already active")
+            self._profile = cProfile.Profile()
+            self._remaining = calls
+            self._output_dir = output_dir
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.take_snapshot()
+
+    @contextmanager
+    def running(self, enabled: bool = True):
+        """
+        在代码块内开启 cProfile（不计入调用次数）
+        """
+        profile = self._profile if enabled else None
+        if profile is None:
+            yield
+            return
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    def run(self, awaitable, enabled: bool = True) -> "_SyncSections":
+        """
+        包装一个 awaitable，只在其同步执行片段内开启 cProfile（不计入调用次数）
+        """
+        return _SyncSections(self, awaitable, enabled)
+
+    def count_call(self) -> tuple[Path, Path] | None:
+        """
+        计入一次调用，达到次数时输出结果并关闭
+
+        Returns:
+            本次调用结束采样时返回 (pstats 文件路径, 内存分配排行文件路径)，否则返回 None
+        """
+        with self._lock:
+            if self._profile is None:
+                return None
+            self._remaining -= 1
+            if self._remaining > 0:
+                return None
+            return self._finish_locked()
+
+    def finish(self) -> tuple[Path, Path] | None:
+        """
+        立即结束采样并输出已采集的结果（未在采样时返回 None）
+        """
+        with self._lock:
+            if self._profile is None:
+                return None
+            return self._finish_locked()
+
+    def _finish_locked(self) -> tuple[Path, Path]:
+        profile = self._profile
+        self._profile = None
+        self._remaining = 0
+        timestamp = int(time_module.time())
+        stats_path = self._output_dir / f"profile_{timestamp}.pstats"
+        alloc_path = self._output_dir / f"profile_{timestamp}_alloc.txt"
+
+        # 先取内存快照，避免输出 pstats 时的分配混入排行
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+            )
+        )
+        _, peak = tracemalloc.get_traced_memory()
+        profile.dump_stats(stats_path)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        top_stats = snapshot.compare_to(
+            self._baseline.filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),)
+            ),
+            "lineno",
+        )[:30]
+        self._baseline = None
+        alloc_path.write_text(
+            f"采样期间内存峰值：{peak / 1024:.1f} KiB\n"
+            + "\n".join(str(stat) for stat in top_stats)
+            + "\n",
+            encoding="utf-8",
+        )
+        logger.info(f"采样结束，已输出 {stats_path} 与 {alloc_path}")
+        return stats_path, alloc_path
+
+
+class _SyncSections:
+    """
+    逐步驱动被包装的 awaitable，每一步（两次挂起之间的同步片段）前后开启/关闭 cProfile，
+    挂起时将其等待的对象原样交给事件循环
+    """
+
+    __slots__ = ("_profiler", "_awaitable", "_enabled")
+
+    def __init__(self, profiler: SamplingProfiler, awaitable, enabled: bool):
+        self._profiler = profiler
+        self._awaitable = awaitable
+        self._enabled = enabled
+
+    def __await__(self):
+        iterator = self._awaitable.__await__()
+        value, error = None, None
+        while True:
+            with self._profiler.running(self._enabled):
+                try:
+                    if error is None:
+                        yielded = iterator.send(value)
+                    else:
+                        yielded = iterator.throw(error)
+                except StopIteration as e:
+                    return e.value
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+
+
+def profiled(func):
+    """
+    为命令处理函数（异步生成器）或事件处理函数（协程）接入按需采样（采样器由实例的 profiler 属性提供）
+
+    仅在处理函数自身的同步片段内开启 cProfile，等待 I/O、线程与向框架 yield 结果期间暂停，
+    每次调用结束时计入一次采样次数。
+    """
+    if not inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def call(self, *args, **kwargs):
+            profiler: SamplingProfiler = self.profiler
+            armed = profiler.active
+            try:
+                return await profiler.run(func(self, *args, **kwargs), armed)
+            finally:
+                if armed:
+                    profiler.count_call()
+
+        return call
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        profiler: SamplingProfiler = self.profiler
+        armed = profiler.active
+        agen = func(self, *args, **kwargs)
+        try:
+            while True:
+                try:
+                    result = await profiler.run(agen.__anext__(), armed)
+                except StopAsyncIteration:
+                    break
+                yield result
+        finally:
+            await agen.aclose()
+            if armed:
+                profiler.count_call()
+
+    return wrapper
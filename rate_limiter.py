@@ -0,0 +1,95 @@
+"""
+Rate limiter for ReNeBan plugin
+Per-(umo, uid) sliding-window flood guard in a bounded LRU table
+"""
+
+import threading
+import time as time_module
+from collections import OrderedDict
+
+
+class _WindowCounter:
+    """
+    滑动窗口计数器（以前一窗口计数按时间比例加权近似滑动窗口，O(1) 时间与空间）
+    """
+
+    __slots__ = ("start", "current", "previous")
+
+    def __init__(self, start: float):
+        self.start = start  # 当前窗口起始时间
+        self.current = 0  # 当前窗口计数
+        self.previous = 0  # 前一窗口计数
+
+
+class FloodGuard:
+    """
+    刷屏防护
+
+    为每个 (UMO, UID) 维护一个滑动窗口计数器，估算最近 window 秒内的消息数，
+    超过 limit 即判定为刷屏。计数器保存在容量为 max_entries 的 LRU 表中，
+    超出容量时淘汰最久未活动的发送者，因此内存占用与发送者总数无关。
+    """
+
+    def __init__(self, limit: int, window: float = 10, max_entries: int = 100000):
+        """
+        初始化刷屏防护
+
+        Args:
+            limit: 窗口内允许的最大消息数，小于等于 0 时关闭
+            window: 窗口长度（秒）
+            max_entries: 计数器表的最大容量
+        """
+        self.limit = limit
+        self.window = window
+        self.max_entries = max_entries
+        self._counters: OrderedDict[tuple[str, str], _WindowCounter] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return self.limit > 0 and self.window > 0
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def hit(self, umo: str, uid: str, now: float | None = None) -> bool:
+        """
+        记录一条消息
+
+        Returns:
+            计入本条消息后是否超过限制
+        """
+        if now is None:
+            now = time_module.monotonic()
+        key = (umo, uid)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = _WindowCounter(now)
+                self._counters[key] = counter
+                if len(self._counters) > self.max_entries:
+                    self._counters.popitem(last=False)
+            else:
+                self._counters.move_to_end(key)
+
+            elapsed = now - counter.start
+            if elapsed >= self.window:
+                # 跨过一个窗口时前移；跨过两个及以上窗口时前一窗口计数清零
+                counter.previous = counter.current if elapsed < 2 * self.window else 0
+                counter.current = 0
+                counter.start = now - (elapsed % self.window)
+                elapsed = now - counter.start
+            counter.current += 1
+            estimate = (
+                counter.previous * (1 - elapsed / self.window) + counter.current
+            )
+            return estimate > self.limit
+
+    def reset(self, umo: str, uid: str) -> None:
+        """清除指定发送者的计数"""
+        with self._lock:
+            self._counters.pop((umo, uid), None)
+
+    def clear(self) -> None:
+        """清除所有计数"""
+        with self._lock:
+            self._counters.clear()
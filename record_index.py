@@ -0,0 +1,164 @@
+"""
+Record index for ReNeBan plugin
+Secondary indexes over all scopes ordered by expiry time, by reason and by id
+"""
+
+import threading
+import time as time_module
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+from .datafile_manager import DatafileManager
+from .user_manager import BaseModelList
+
+# 参与索引的数据名（会话组成员不属于禁用/解禁记录，不参与索引）
+INDEXED_SCOPES = (
+    "ban",
+    "pass",
+    "banall",
+    "passall",
+    "umoban",
+    "umopass",
+    "groupban",
+    "grouppass",
+)
+
+# 搜索类命令单次显示的最大记录数
+SEARCH_RESULT_LIMIT = 100
+
+
+class IndexedRecord(NamedTuple):
+    """
+    索引中的一条记录（key 为 ban/pass 的 UMO 或会话组数据的组名，列表结构为空字符串）
+    """
+
+    scope: str
+    key: str
+    id: str
+    time: int
+    reason: str | None
+
+
+class RecordIndex:
+    """
+    记录二级索引
+
+    由某一代缓存数据构建：
+    - 到期索引：按到期时间排序的非永久记录，区间查询 O(log n + k)
+    - 理由索引：理由 -> 记录列表，O(1 + k)
+    - ID 索引：按 ID 排序，前缀查询 O(log n + k)
+    索引只反映构建时的数据，查询时会过滤掉已过期的记录。
+    """
+
+    __slots__ = (
+        "generation",
+        "_expiry_times",
+        "_expiry_records",
+        "_ids",
+        "_id_records",
+        "_reasons",
+        "size",
+    )
+
+    def __init__(
+        self, data: dict[str, dict[str, BaseModelList] | BaseModelList], generation: int
+    ):
+        self.generation = generation
+        records: list[IndexedRecord] = []
+        for scope in INDEXED_SCOPES:
+            value = data.get(scope)
+            if value is None:
+                continue
+            groups = value.items() if isinstance(value, dict) else (("", value),)
+            for key, lst in groups:
+                for item in list(lst):
+                    records.append(
+                        IndexedRecord(
+                            scope,
+                            key,
+                            item._get_id_field_value(),
+                            item.time,
+                            item.reason,
+                        )
+                    )
+        self.size = len(records)
+
+        expiring = sorted(
+            (record for record in records if record.time != 0),
+            key=lambda record: record.time,
+        )
+        self._expiry_times: list[int] = [record.time for record in expiring]
+        self._expiry_records: list[IndexedRecord] = expiring
+
+        by_id = sorted(records, key=lambda record: record.id)
+        self._ids: list[str] = [record.id for record in by_id]
+        self._id_records: list[IndexedRecord] = by_id
+
+        self._reasons: dict[str, list[IndexedRecord]] = {}
+        for record in records:
+            if record.reason:
+                self._reasons.setdefault(record.reason, []).append(record)
+
+    @staticmethod
+    def _alive(record: IndexedRecord, now: int) -> bool:
+        return record.time == 0 or record.time > now
+
+    def expiring_within(
+        self, duration: int, now: int | None = None
+    ) -> list[IndexedRecord]:
+        """获取在 duration 秒内到期的记录（按到期时间升序）"""
+        now = int(time_module.time()) if now is None else now
+        lo = bisect_right(self._expiry_times, now)
+        hi = bisect_right(self._expiry_times, now + duration)
+        return self._expiry_records[lo:hi]
+
+    def by_reason(self, reason: str, now: int | None = None) -> list[IndexedRecord]:
+        """获取理由完全一致的记录"""
+        now = int(time_module.time()) if now is None else now
+        return [
+            record
+            for record in self._reasons.get(reason, ())
+            if self._alive(record, now)
+        ]
+
+    def by_id_prefix(self, prefix: str, now: int | None = None) -> list[IndexedRecord]:
+        """获取 ID 以 prefix 开头的记录（按 ID 升序）"""
+        now = int(time_module.time()) if now is None else now
+        lo = bisect_left(self._ids, prefix)
+        result: list[IndexedRecord] = []
+        for idx in range(lo, len(self._ids)):
+            if not self._ids[idx].startswith(prefix):
+                break
+            record = self._id_records[idx]
+            if self._alive(record, now):
+                result.append(record)
+        return result
+
+
+class RecordIndexCache:
+    """
+    按数据代数惰性重建的记录索引（数据未变更时直接复用）
+    """
+
+    def __init__(self, data_manager: DatafileManager):
+        self.data_manager = data_manager
+        self._index: RecordIndex | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> RecordIndex:
+        """获取与当前缓存数据一致的索引"""
+        with self._lock:
+            generation = self.data_manager.generation
+            if self._index is None or self._index.generation != generation:
+                self._index = RecordIndex(
+                    self.data_manager.get_clear_data(
+                        list(INDEXED_SCOPES), no_copy=True
+                    ),
+                    generation,
+                )
+            return self._index
+
+    def clear(self) -> None:
+        """丢弃索引"""
+        with self._lock:
+            self._index = None
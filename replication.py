@@ -0,0 +1,381 @@
+"""
+Replication for ReNeBan plugin
+Log-shipping of record changes between nodes through sequenced segment files in a shared directory
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import msgpack
+
+from .bulk_io import SCOPES
+from .datafile_manager import DatafileManager, DataChangeEvent
+from .metrics import METRICS
+from .user_manager import BaseModelList, UmoDataModel, UserDataModel
+
+from astrbot.api import logger
+
+_SEGMENTS_PUBLISHED = METRICS.counter(
+    "reneban_replication_segments_published_total", "已发布的复制段数"
+)
+_SEGMENTS_APPLIED = METRICS.counter(
+    "reneban_replication_segments_applied_total", "已应用的复制段数"
+)
+_REPLICATION_SEQ = METRICS.gauge("reneban_replication_seq", "最近发布/应用的复制段序号")
+
+# 段文件名格式（序号补零，按文件名排序即按序号排序）
+_SEGMENT_PREFIX = "seg_"
+_SEGMENT_SUFFIX = ".msgpack"
+# 每发布多少个增量段写入一次全量快照段
+SNAPSHOT_EVERY = 1000
+# 追随者单次应用的最大段数（在一次事务中应用）
+MAX_SEGMENTS_PER_POLL = 100
+
+# 记录状态：键 -> ID -> (到期时间戳, 理由)；列表结构的键为空字符串
+_State = dict[str, dict[str, tuple[int, str | None]]]
+
+
+def segment_name(seq: int) -> str:
+    """获取序号对应的段文件名"""
+    return f"{_SEGMENT_PREFIX}{seq:012d}{_SEGMENT_SUFFIX}"
+
+
+def list_segments(directory: Path) -> list[int]:
+    """列出目录中的所有段序号（升序）"""
+    seqs: list[int] = []
+    for name in os.listdir(directory):
+        if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+            try:
+                seqs.append(int(name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)]))
+            except ValueError:
+                continue
+    seqs.sort()
+    return seqs
+
+
+def _list_state(lst: BaseModelList) -> dict[str, tuple[int, str | None]]:
+    return {item._get_id_field_value(): (item.time, item.reason) for item in list(lst)}
+
+
+def _snapshot_state(data: dict[str, BaseModelList] | BaseModelList) -> _State:
+    groups = data.items() if isinstance(data, dict) else (("", data),)
+    return {key: _list_state(lst) for key, lst in groups}
+
+
+def _diff_list(
+    scope: str,
+    key: str,
+    old: dict[str, tuple[int, str | None]],
+    new: dict[str, tuple[int, str | None]],
+) -> list[list]:
+    ops: list[list] = [
+        ["put", scope, key, id_value, *value]
+        for id_value, value in new.items()
+        if old.get(id_value) != value
+    ]
+    ops.extend(["del", scope, key, id_value] for id_value in old.keys() - new.keys())
+    return ops
+
+
+class ReplicationPublisher:
+    """
+    复制发布者
+
+    订阅 DatafileManager 的数据变更，将变更数据与上次发布状态的差异编码为
+    put/del 操作，按递增序号写入共享目录中的段文件（先写临时文件再 rename）。
+    变更通知带有变更键时只比较这些键下的列表，否则比较整份数据。
+    启动时与每 SNAPSHOT_EVERY 段写入一次全量快照段，并删除上上个快照之前的段，
+    使长时间离线的追随者也能从快照追赶。
+    """
+
+    def __init__(
+        self,
+        data_manager: DatafileManager,
+        directory: Path,
+        scopes: list[str] | None = None,
+        origin: str | None = None,
+    ):
+        """
+        初始化复制发布者
+
+        Args:
+            data_manager: 数据文件管理器
+            directory: 共享目录
+            scopes: 参与复制的数据名，为 None 时复制全部
+            origin: 节点标识，为 None 时使用数据文件管理器的节点标识
+        """
+        self.data_manager = data_manager
+        self.directory = directory
+        self.scopes: list[str] = list(SCOPES) if scopes is None else scopes
+        self.origin = origin or data_manager.node_id
+        self.directory.mkdir(parents=True, exist_ok=True)
+        existing = list_segments(directory)
+        self.seq: int = existing[-1] if existing else 0
+        self._snapshots: list[int] = []
+        self._state: dict[str, _State] = {}
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+
+    def start(self) -> None:
+        """写入初始快照并开始订阅数据变更"""
+        if not self.data_manager.is_cache_valid():
+            self.data_manager.sync_and_clean_data(no_return=True)
+        with self._lock:
+            self._write_snapshot()
+        self._unsubscribe = self.data_manager.subscribe(self._on_change)
+
+    def stop(self) -> None:
+        """停止订阅"""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def _write_segment(self, body: dict) -> None:
+        self.seq += 1
+        body["seq"] = self.seq
+        body["origin"] = self.origin
+        path = self.directory / segment_name(self.seq)
+        tmp_path = path.with_name("." + path.name + ".tmp")
+        tmp_path.write_bytes(msgpack.packb(body, use_bin_type=True))
+        tmp_path.replace(path)
+        _SEGMENTS_PUBLISHED.inc()
+        _REPLICATION_SEQ.set(self.seq)
+
+    def _write_snapshot(self) -> None:
+        ops: list[list] = []
+        for scope in self.scopes:
+            state = _snapshot_state(
+                self.data_manager.get_clear_data(scope, no_copy=True)
+            )
+            self._state[scope] = state
+            ops.extend(
+                ["put", scope, key, id_value, time, reason]
+                for key, records in state.items()
+                for id_value, (time, reason) in records.items()
+            )
+        self._write_segment({"snapshot": True, "scopes": self.scopes, "ops": ops})
+        self._snapshots.append(self.seq)
+        if len(self._snapshots) > 2:
+            # 保留最近两个快照之间及之后的段
+            keep_from = self._snapshots[-2]
+            self._snapshots = self._snapshots[-2:]
+            for seq in list_segments(self.directory):
+                if seq >= keep_from:
+                    break
+                (self.directory / segment_name(seq)).unlink(missing_ok=True)
+
+    def _on_change(self, change: DataChangeEvent) -> None:
+        scopes = [name for name in change.data_names if name in self.scopes]
+        if not scopes:
+            return
+        with self._lock:
+            ops: list[list] = []
+            for scope in scopes:
+                state = self._state.setdefault(scope, {})
+                data = self.data_manager.get_clear_data(scope, no_copy=True)
+                keys = (change.keys or {}).get(scope)
+                if keys is None:
+                    new = _snapshot_state(data)
+                    for key in state.keys() | new.keys():
+                        ops.extend(
+                            _diff_list(scope, key, state.get(key, {}), new.get(key, {}))
+                        )
+                    self._state[scope] = new
+                    continue
+                for key in keys:
+                    lst = data.get(key)
+                    new_records = {} if lst is None else _list_state(lst)
+                    ops.extend(_diff_list(scope, key, state.get(key, {}), new_records))
+                    if new_records:
+                        state[key] = new_records
+                    else:
+                        state.pop(key, None)
+            if not ops:
+                return
+            try:
+                self._write_segment({"snapshot": False, "ops": ops})
+                if self.seq - self._snapshots[-1] >= SNAPSHOT_EVERY:
+                    self._write_snapshot()
+            except OSError as e:
+                logger.error(f"写入复制段失败：{e}")
+
+
+class ReplicationFollower:
+    """
+    复制追随者
+
+    后台线程定期扫描共享目录，按序号将新段在一次事务中应用到本地数据，
+    并在应用后原子更新检查点；重启后从检查点继续追赶。
+    检查点之后的段不连续（已被发布者清理）时，从最新的快照段重新开始。
+    注意：快照会整体替换本地参与复制的数据。
+    """
+
+    def __init__(
+        self,
+        data_manager: DatafileManager,
+        directory: Path,
+        checkpoint_path: Path,
+        interval: float = 2.0,
+    ):
+        """
+        初始化复制追随者
+
+        Args:
+            data_manager: 数据文件管理器
+            directory: 共享目录
+            checkpoint_path: 检查点文件路径
+            interval: 扫描间隔（秒）
+        """
+        self.data_manager = data_manager
+        self.directory = directory
+        self.checkpoint_path = checkpoint_path
+        self.interval = interval
+        self.checkpoint: int = self._load_checkpoint()
+        self.stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _load_checkpoint(self) -> int:
+        try:
+            return int(self.checkpoint_path.read_text(encoding="utf-8").strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _save_checkpoint(self) -> None:
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp_path.write_text(str(self.checkpoint), encoding="utf-8")
+        tmp_path.replace(self.checkpoint_path)
+
+    def start(self) -> None:
+        """启动后台扫描线程"""
+        self.stop_event.clear()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._poll_loop, daemon=True, name="ReplicationFollower"
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        停止后台扫描线程
+
+        Args:
+            timeout: 等待线程退出的最长时间（秒），为 None 时不等待
+        """
+        self.stop_event.set()
+        thread = self._thread
+        if (
+            timeout is not None
+            and thread is not None
+            and thread is not threading.current_thread()
+        ):
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"复制追随者线程未在 {timeout}s 内退出")
+            else:
+                self._thread = None
+
+    def _poll_loop(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"应用复制段失败：{e}")
+            self.stop_event.wait(self.interval)
+
+    def _pending(self) -> list[int]:
+        """获取待应用的段序号"""
+        if not self.directory.exists():
+            return []
+        pending = [seq for seq in list_segments(self.directory) if seq > self.checkpoint]
+        if not pending or pending[0] == self.checkpoint + 1:
+            return pending
+        # 不连续：从最新的快照段开始
+        for idx in range(len(pending) - 1, -1, -1):
+            body = self._read_segment(pending[idx])
+            if body is not None and body.get("snapshot"):
+                logger.warning(
+                    f"复制段 {self.checkpoint + 1} 至 {pending[idx] - 1} 已不存在，从快照段 {pending[idx]} 开始追赶"
+                )
+                return pending[idx:]
+        logger.warning(f"复制段 {self.checkpoint + 1} 已不存在，等待下一个快照段")
+        return []
+
+    def _read_segment(self, seq: int) -> dict | None:
+        try:
+            body = msgpack.unpackb(
+                (self.directory / segment_name(seq)).read_bytes(), raw=False
+            )
+        except FileNotFoundError:
+            return None
+        if not isinstance(body, dict) or not isinstance(body.get("ops"), list):
+            raise ValueError(f"复制段 {seq} 格式不合法")
+        return body
+
+    def poll(self) -> int:
+        """
+        应用所有待应用的段
+
+        Returns:
+            应用的段数
+        """
+        applied = 0
+        while True:
+            pending = self._pending()[:MAX_SEGMENTS_PER_POLL]
+            if not pending:
+                return applied
+            bodies = [self._read_segment(seq) for seq in pending]
+            if any(body is None for body in bodies):
+                # 段在读取期间被清理，下次重新计算
+                return applied
+            names = {op[1] for body in bodies for op in body["ops"]} | {
+                scope for body in bodies for scope in body.get("scopes", ())
+            }
+            with self.data_manager.transaction(
+                sorted(names & SCOPES.keys()), from_cache=True
+            ) as data:
+                for body in bodies:
+                    self._apply(data, body)
+            self.checkpoint = pending[-1]
+            self._save_checkpoint()
+            applied += len(pending)
+            _SEGMENTS_APPLIED.inc(len(pending))
+            _REPLICATION_SEQ.set(self.checkpoint)
+
+    @staticmethod
+    def _apply(data: dict, body: dict) -> None:
+        """将一个段应用到事务数据上"""
+        if body.get("snapshot"):
+            for scope in body.get("scopes", ()):
+                if scope not in SCOPES:
+                    continue
+                is_dict, list_type, _ = SCOPES[scope]
+                data[scope] = {} if is_dict else list_type()
+        for op in body["ops"]:
+            kind, scope, key, id_value = op[:4]
+            if scope not in SCOPES:
+                continue
+            is_dict, list_type, model_type = SCOPES[scope]
+            if is_dict:
+                target_list: BaseModelList | None = data[scope].get(key)
+                if target_list is None:
+                    if kind == "del":
+                        continue
+                    target_list = data[scope][key] = list_type()
+            else:
+                target_list = data[scope]
+            if kind == "del":
+                target_list.remove_by_id(id_value)
+                continue
+            expire_time, reason = op[4], op[5]
+            item = target_list.find_by_id(id_value, no_copy=True)
+            if item is not None:
+                item.update_data(time=expire_time, reason=reason)
+            elif model_type is UmoDataModel:
+                target_list.append(
+                    UmoDataModel(umo=id_value, time=expire_time, reason=reason)
+                )
+            else:
+                target_list.append(
+                    UserDataModel(uid=id_value, time=expire_time, reason=reason)
+                )
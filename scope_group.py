@@ -0,0 +1,46 @@
+"""
+Scope groups for ReNeBan plugin
+Reverse index from UMOs to the named scope groups they belong to
+"""
+
+from .user_manager import UmoDataList
+from .umo_pattern import UmoPatternTrie, is_umo_pattern
+
+
+class ScopeGroupIndex:
+    """
+    会话组反向索引
+
+    由 {组名: 成员 UMO 列表} 构建 UMO -> 所属组名 的映射，精确 UMO 以字典 O(1) 查找，
+    通配成员（如 aiocqhttp:*）编入前缀树，随缓存重建。
+    """
+
+    __slots__ = ("_exact", "_patterns", "_pattern_groups")
+
+    def __init__(self, group_data: dict[str, UmoDataList] | None = None):
+        exact: dict[str, list[str]] = {}
+        pattern_groups: dict[str, list[str]] = {}
+        for name, members in (group_data or {}).items():
+            for item in members:
+                target = pattern_groups if is_umo_pattern(item.umo) else exact
+                target.setdefault(item.umo, []).append(name)
+        self._exact: dict[str, tuple[str, ...]] = {
+            umo: tuple(names) for umo, names in exact.items()
+        }
+        self._pattern_groups: dict[str, tuple[str, ...]] = {
+            umo: tuple(names) for umo, names in pattern_groups.items()
+        }
+        self._patterns = UmoPatternTrie(pattern_groups)
+
+    def __bool__(self) -> bool:
+        return bool(self._exact) or bool(self._patterns)
+
+    def groups_of(self, umo: str) -> tuple[str, ...]:
+        """
+        获取 UMO 所属的所有组（精确成员在前，通配成员按具体程度在后）
+        """
+        groups = self._exact.get(umo, ())
+        if self._patterns:
+            for pattern in self._patterns.match(umo):
+                groups += self._pattern_groups[pattern]
+        return groups
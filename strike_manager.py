@@ -0,0 +1,147 @@
+"""
+Strike manager for ReNeBan plugin
+Decaying per-(umo, uid) offence counters used to escalate ban durations
+"""
+
+import threading
+import time as time_module
+from pathlib import Path
+
+import msgpack
+
+from astrbot.api import logger
+
+# 全局范围的 UMO 占位
+GLOBAL_SCOPE = ""
+
+
+class StrikeTable:
+    """
+    违规计数表
+
+    每个 (UMO, UID) 保存 [计数, 最近一次违规时间]，计数每经过 decay 秒自动减一（读取时惰性计算），
+    减至 0 的条目在保存与加载时被清除，因此无需后台任务即可自行过期。
+    全局范围使用 GLOBAL_SCOPE 作为 UMO。
+    数据以 msgpack 紧凑格式保存为 [[UMO, UID, 计数, 时间], ...]。
+    """
+
+    def __init__(self, path: Path, decay: int):
+        """
+        初始化违规计数表
+
+        Args:
+            path: 持久化文件路径
+            decay: 每减少一次计数所需的秒数，小于等于 0 时计数不衰减
+        """
+        self.path = path
+        self.decay = decay
+        self._entries: dict[tuple[str, str], list[int]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _effective(self, entry: list[int], now: int) -> int:
+        count, last = entry
+        if self.decay <= 0:
+            return count
+        return max(0, count - (now - last) // self.decay)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            rows = msgpack.unpackb(self.path.read_bytes(), raw=False)
+            if not isinstance(rows, list):
+                raise ValueError("违规计数文件的根对象应为列表")
+        except Exception as e:
+            backup_filename = f"{self.path.stem}_{int(time_module.time())}.bak"
+            self.path.rename(self.path.parent / backup_filename)
+            logger.error(
+                f"违规计数文件 {self.path} 解析失败：{e}\n已将其重命名为 {backup_filename}"
+            )
+            return
+        now = int(time_module.time())
+        for row in rows:
+            if (
+                isinstance(row, list)
+                and len(row) == 4
+                and isinstance(row[0], str)
+                and isinstance(row[1], str)
+                and isinstance(row[2], int)
+                and isinstance(row[3], int)
+            ):
+                entry = [row[2], row[3]]
+                if self._effective(entry, now) > 0:
+                    self._entries[(row[0], row[1])] = entry
+
+    def _save_locked(self, now: int) -> None:
+        # 保存时顺便清除已衰减至 0 的条目
+        for key in [
+            key
+            for key, entry in self._entries.items()
+            if self._effective(entry, now) == 0
+        ]:
+            del self._entries[key]
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        rows = [
+            [umo, uid, entry[0], entry[1]]
+            for (umo, uid), entry in self._entries.items()
+        ]
+        tmp_path.write_bytes(msgpack.packb(rows, use_bin_type=True))
+        tmp_path.replace(self.path)
+
+    def get(self, umo: str, uid: str) -> int:
+        """获取当前（已衰减的）违规计数"""
+        entry = self._entries.get((umo, uid))
+        if entry is None:
+            return 0
+        return self._effective(entry, int(time_module.time()))
+
+    def add(self, umo: str, uid: str) -> int:
+        """
+        记录一次违规并保存
+
+        Returns:
+            记录后的违规计数
+        """
+        now = int(time_module.time())
+        with self._lock:
+            entry = self._entries.get((umo, uid))
+            count = (self._effective(entry, now) if entry else 0) + 1
+            self._entries[(umo, uid)] = [count, now]
+            self._save_locked(now)
+            return count
+
+    def undo(self, umo: str, uid: str) -> None:
+        """撤销最近一次违规记录（用于禁用未能生效时）"""
+        now = int(time_module.time())
+        with self._lock:
+            entry = self._entries.get((umo, uid))
+            if entry is None:
+                return
+            entry[0] -= 1
+            self._save_locked(now)
+
+    def reset(self, umo: str, uid: str) -> None:
+        """清除违规计数"""
+        with self._lock:
+            if self._entries.pop((umo, uid), None) is not None:
+                self._save_locked(int(time_module.time()))
+
+    def reset_uid(self, uid: str) -> None:
+        """清除指定用户在所有范围内的违规计数"""
+        with self._lock:
+            keys = [key for key in self._entries if key[1] == uid]
+            for key in keys:
+                del self._entries[key]
+            if keys:
+                self._save_locked(int(time_module.time()))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def ladder_time(ladder: list[int], count: int) -> int:
+    """
+    按违规计数从阶梯中取禁用时长（第 n 次违规取第 n 级，超出阶梯时取最后一级）
+    """
+    return ladder[min(count, len(ladder)) - 1]
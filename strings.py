@@ -29,18 +29,42 @@ commands = {
     "pass-all": "/pass-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]",
     "ban-enable": "/ban-enable",
     "ban-disable": "/ban-disable",
-    "banlist": "/banlist",
+    "banlist": "/banlist [数据名（ban/banall/pass/passall/umoban/umopass）] [页码（默认1）]",
     "ban-help": "/ban-help",
+    "ban-stats": "/ban-stats",
+    "ban-profile": "/ban-profile [次数（默认1000）]",
+    "ban-mem": "/ban-mem [显示数量（默认5）]",
+    "ban-replay": "/ban-replay [速度倍率（默认0）]",
+    "ban-import": "/ban-import <文件名> [每块记录数（默认5000）]",
+    "ban-export": "/ban-export <文件名> [数据名,...（默认全部）]",
+    "ban-merge": "/ban-merge <文件名>",
     "dec-ban": "/dec-ban <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]",
     "dec-pass": "/dec-pass <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）] [UMO]",
     "dec-ban-all": "/dec-ban-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]",
     "dec-pass-all": "/dec-pass-all <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]",
     "ban-reset": "/ban-reset <@用户|UID（QQ号）>",
+    "strike": "/strike <@用户|UID（QQ号）> [理由（默认无理由）] [UMO]",
+    "strike-all": "/strike-all <@用户|UID（QQ号）> [理由（默认无理由）]",
     "ban-umo": "/ban-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]",
     "pass-umo": "/pass-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]",
     "dec-ban-umo": "/dec-ban-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]",
     "dec-pass-umo": "/dec-pass-umo <UMO> [时间（默认无期限）] [理由（默认无理由）]",
     "ban-reset-umo": "/ban-reset-umo <UMO>",
+    "ban-search": "/ban-search <id|reason> <ID前缀|理由>",
+    "dec-by": "/dec-by <id|reason|expiring> <ID前缀|理由|时长> [数据名,...（默认全部）]",
+    "ban-batch": "/ban-batch <@用户...|UID,UID,...> [时间（默认无期限）] [理由（默认无理由）] [UMO]",
+    "pass-batch": "/pass-batch <@用户...|UID,UID,...> [时间（默认无期限）] [理由（默认无理由）] [UMO]",
+    "ban-all-batch": "/ban-all-batch <@用户...|UID,UID,...> [时间（默认无期限）] [理由（默认无理由）]",
+    "pass-all-batch": "/pass-all-batch <@用户...|UID,UID,...> [时间（默认无期限）] [理由（默认无理由）]",
+    "ban-umo-batch": "/ban-umo-batch <UMO,UMO,...> [时间（默认无期限）] [理由（默认无理由）]",
+    "pass-umo-batch": "/pass-umo-batch <UMO,UMO,...> [时间（默认无期限）] [理由（默认无理由）]",
+    "group-add": "/group-add <组名> [UMO]",
+    "group-remove": "/group-remove <组名> [UMO]",
+    "group-list": "/group-list [组名]",
+    "ban-group": "/ban-group <组名> <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]",
+    "pass-group": "/pass-group <组名> <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]",
+    "dec-ban-group": "/dec-ban-group <组名> <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]",
+    "dec-pass-group": "/dec-pass-group <组名> <@用户|UID（QQ号）> [时间（默认无期限）] [理由（默认无理由）]",
 }
 # 默认输出文案
 messages = {
@@ -57,10 +81,35 @@ messages = {
     "dec_passed_user_global": "已删除全局对 {user} 的临时解限（{time}），理由：{reason}",
     "dec_no_record": "未找到记录，可能是因为该用户的记录已过期，无需删除",
     "dec_zerotime_error": "无法删除，因为该用户的记录时限被设为永久，请设置删除时间为0以强制删除！",
+    "strike_user": "已记录 {user} 在 {umo} 的第 {count} 次违规，禁用时限：{time}，理由：{reason}",
+    "strike_user_global": "已记录 {user} 的第 {count} 次全局违规，禁用时限：{time}，理由：{reason}",
     "banned_umo": "已禁用会话 {umo}，时限：{time}，理由：{reason}",
     "passed_umo": "已临时解限会话 {umo}，时限：{time}，理由：{reason}",
     "dec_banned_umo": "已删除对会话 {umo} 的禁用（{time}），理由：{reason}",
     "dec_passed_umo": "已删除对会话 {umo} 的临时解限（{time}），理由：{reason}",
+    "banned_group_user": "已在组 {group} 禁用以下用户 {user}，时限：{time}，理由：{reason}",
+    "passed_group_user": "已在组 {group} 临时解限 {user}，时限：{time}，理由：{reason}",
+    "dec_banned_group_user": "已删除在组 {group} 对 {user} 的禁用（{time}），理由：{reason}",
+    "dec_passed_group_user": "已删除在组 {group} 对 {user} 的临时解限（{time}），理由：{reason}",
+    "group_added": "已将会话 {umo} 加入组 {group}",
+    "group_already_member": "会话 {umo} 已在组 {group} 中",
+    "group_removed": "已将会话 {umo} 移出组 {group}",
+    "group_not_member": "会话 {umo} 不在组 {group} 中",
+    "group_list": "会话组：",
+    "no_group": "\n没有会话组呢！",
+    "group_list_format": "\n - {group} - {members} 个会话 - {banned} 名禁用用户 - {passed} 名临时解限用户",
+    "group_detail": "会话组 {group} 的会话：{members}\n\n禁用的用户：{banned}\n\n临时解限用户：{passed}",
+    "no_group_member": "\n组内没有会话呢！",
+    "no_group_banned_user": "\n组内没有禁用用户呢！",
+    "no_group_passed_user": "\n组内没有临时解限用户呢！",
+    "batch_done": "已批量{action}（{scope}），时限：{time}，理由：{reason}，成功 {success} 项，失败 {failed} 项：{details}",
+    "batch_result_format": "\n - {target} - {result}",
+    "batch_success": "成功",
+    "batch_permanent": "已有永久记录，不支持叠加",
+    "batch_action_ban": "禁用",
+    "batch_action_pass": "临时解限",
+    "batch_scope_global": "全局",
+    "batch_scope_umo": "会话列表",
     "group_banned_list": "本群禁用的用户:",
     "no_group_banned": "\n本群没有禁用用户呢！",
     "group_passed_list": "本群临时解限用户：",
@@ -75,10 +124,35 @@ messages = {
     "no_umo_passed": "\n没有临时解限会话呢！",
     "no_reason": "无理由",
     "banlist_strlist_format": "\n - {id} - {time} - {reason}",
+    "banlist_page_info": "（第 {page}/{pages} 页，共 {total} 条，使用 /banlist {scope} <页码> 翻页）",
+    "banlist_page_out_of_range": "页码超出范围，共 {pages} 页",
+    "expiring_list": "将在 {time} 内到期的记录：",
+    "search_result": "{field} 匹配 {value} 的记录：",
+    "record_strlist_format": "\n - {id}（{scope}）- {time} - {reason}",
+    "record_list_truncated": "\n……仅显示前 {limit} 条，共 {total} 条",
+    "no_record_found": "\n没有符合条件的记录呢！",
+    "dec_by_done": "已删除 {field} 匹配 {value} 的 {count} 条记录",
     "ban_reset_success": "已清除用户 {user} 的所有记录。",
     "ban_reset_umo_success": "已清除会话 {umo} 的所有记录。",
     "ban_enabled": "已临时启用禁用功能～重启后失效",
     "ban_disabled": "已临时禁用禁用功能～重启后失效",
+    "ban_stats": "运行时指标：\n{summary}\n\n已导出 Prometheus 指标至 {path}",
+    "content_ban_reason": "触发内容过滤规则：{rule}",
+    "flood_ban_reason": "刷屏",
+    "bulk_file_not_found": "数据目录中不存在文件 {filename}，或文件名不合法",
+    "bulk_error": "处理文件 {filename} 失败：{error}",
+    "bulk_import_started": "开始从 {filename} 导入，完成后将发送结果",
+    "bulk_import_done": "已从 {filename} 导入：{report}",
+    "bulk_merge_done": "已合并 {filename}：{report}",
+    "bulk_export_done": "已导出 {count} 条记录至 {filename}",
+    "ban_mem": "黑名单内存占用（估算）：\n{report}\n\n进程资源：{resources}",
+    "profile_started": "已开始采样接下来的 {calls} 次调用，结束后结果将写入数据目录",
+    "profile_already_active": "已有采样正在进行（剩余 {remaining} 次），可使用 /ban-profile 0 立即结束",
+    "profile_not_active": "当前没有正在进行的采样",
+    "profile_finished": "采样已结束，结果已写入 {stats_path} 与 {alloc_path}",
+    "replay_no_trace": "数据目录中没有采集文件 trace.msgpack，请先开启 trace_capture",
+    "replay_started": "开始回放采集文件，完成后将发送结果",
+    "replay_done": "回放完成（回放数据目录：{replay_dir}）：\n{report}",
     "help_text": f"""黑名单插件使用指南：
 
 🌸 基础命令：
@@ -91,6 +165,13 @@ messages = {
 {commands["dec-ban"]} - 删除在会话对用户禁用的时限
 {commands["dec-ban-all"]} - 删除全局对用户禁用的时限
 {commands["dec-ban-umo"]} - 删除对指定会话的禁用的时限
+{commands["ban-group"]} - 在会话组的所有会话中限制用户
+{commands["ban-batch"]} - 在会话批量限制多个用户（@多人或以逗号分隔的UID）
+{commands["ban-all-batch"]} - 全局批量限制多个用户
+{commands["ban-umo-batch"]} - 批量限制多个会话（以逗号分隔的UMO）
+{commands["dec-ban-group"]} - 删除在会话组对用户禁用的时限
+{commands["strike"]} - 记录一次会话内违规，按违规阶梯禁用（违规次数越多时限越长）
+{commands["strike-all"]} - 记录一次全局违规，按违规阶梯全局禁用
 
 🎀 解限命令：
 {commands["pass"]} - 解除当前会话限制（允许临时解限，若已有解除时限，则叠加）
@@ -99,11 +180,33 @@ messages = {
 {commands["dec-pass"]} - 删除在会话对用户临时解限的时限
 {commands["dec-pass-all"]} - 删除全局对用户临时解限的时限
 {commands["dec-pass-umo"]} - 删除对指定会话的临时解限的时限
+{commands["pass-batch"]} - 在会话批量解除多个用户的限制
+{commands["pass-all-batch"]} - 全局批量解除多个用户的限制
+{commands["pass-umo-batch"]} - 批量解除多个会话的限制
+{commands["pass-group"]} - 在会话组的所有会话中解除用户限制（允许临时解限，若已有解除时限，则叠加）
+{commands["dec-pass-group"]} - 删除在会话组对用户临时解限的时限
 {commands["ban-reset"]} - 删除一名指定用户的所有记录
 {commands["ban-reset-umo"]} - 删除指定会话的所有记录
+{commands["dec-by"]} - 删除所有符合过滤条件（ID前缀/理由/即将到期）的记录
 
 📒 查询命令：
-{commands["banlist"]} - 查看当前限制名单
+{commands["banlist"]} - 查看当前限制名单（可指定数据名分页查看）
+{commands["group-list"]} - 查看会话组及其名单
+/banlist --expiring [时长（默认1d）] - 查看即将在指定时长内到期的记录
+{commands["ban-search"]} - 按ID前缀或理由搜索所有记录
+
+🗂️ 会话组命令：
+{commands["group-add"]} - 将会话加入会话组（默认当前会话）
+{commands["group-remove"]} - 将会话移出会话组（默认当前会话）
+{commands["ban-stats"]} - 查看运行时指标
+{commands["ban-profile"]} - 采样接下来 N 次调用的性能与内存分配
+{commands["ban-mem"]} - 查看黑名单数据的内存占用
+{commands["ban-replay"]} - 回放采集的流量并输出压测报告
+
+📦 导入导出：
+{commands["ban-import"]} - 从数据目录中的 JSONL/CSV 文件导入记录
+{commands["ban-export"]} - 将记录导出至数据目录中的 JSONL/CSV 文件
+{commands["ban-merge"]} - 以后写者胜规则合并其他节点导出的文件
 
 ⚙️ 功能控制：
 {commands["ban-enable"]} - 启用限制功能
@@ -116,6 +219,7 @@ messages = {
 💡 注意事项：
 - 只有管理员可以操作
 - 永久限制/永久解除限制不支持叠加
-- 群内设置优先于全局设置
+- 群内设置优先于会话组设置，会话组设置优先于全局设置
+- UMO 支持通配（如 aiocqhttp:* 或 *:FriendMessage:*），精确 UMO 的设置优先于通配规则
 - 过期限制会自动清理""",
 }
@@ -0,0 +1,207 @@
+"""
+测试环境
+
+以最小的桩模块替代 AstrBot（astrbot.api 及其子模块），并将插件目录作为 reneban 包导入，
+使插件可以在没有 AstrBot 的环境中构造与调用。
+"""
+
+import asyncio
+import enum
+import logging
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+
+
+def _install_astrbot_stub() -> None:
+    """注册 astrbot.api 桩模块"""
+    if "astrbot.api" in sys.modules:
+        return
+
+    astrbot = types.ModuleType("astrbot")
+    api = types.ModuleType("astrbot.api")
+    api.logger = logging.getLogger("astrbot")
+    api.AstrBotConfig = dict
+
+    # astrbot.api.event
+    event_module = types.ModuleType("astrbot.api.event")
+
+    class _Filter:
+        class PermissionType(enum.Enum):
+            ADMIN = "admin"
+
+        class EventMessageType(enum.Enum):
+            ALL = "all"
+
+        @staticmethod
+        def _passthrough(*args, **kwargs):
+            return lambda func: func
+
+        permission_type = command = event_message_type = _passthrough
+
+    class MessageType(enum.Enum):
+        GROUP_MESSAGE = "GroupMessage"
+        FRIEND_MESSAGE = "FriendMessage"
+
+    class MessageSession:
+        def __init__(self, platform_id: str, message_type: MessageType):
+            self.platform_id = platform_id
+            self.message_type = message_type
+
+    class AstrMessageEvent:
+        def __init__(
+            self,
+            sender_id: str = "10001",
+            group_id: str | None = "20001",
+            messages: list | None = None,
+            platform_id: str = "aiocqhttp",
+            admin: bool = False,
+        ):
+            self._sender_id = sender_id
+            self._group_id = group_id
+            self._messages = messages or []
+            self._admin = admin
+            message_type = (
+                MessageType.GROUP_MESSAGE if group_id else MessageType.FRIEND_MESSAGE
+            )
+            self.session = MessageSession(platform_id, message_type)
+            self.unified_msg_origin = (
+                f"{platform_id}:{message_type.value}:{group_id or sender_id}"
+            )
+            self.stopped = False
+
+        def get_sender_id(self) -> str:
+            return self._sender_id
+
+        def get_sender_name(self) -> str:
+            return self._sender_id
+
+        def get_group_id(self) -> str | None:
+            return self._group_id
+
+        def get_self_id(self) -> str:
+            return "99999"
+
+        def get_messages(self) -> list:
+            return self._messages
+
+        def is_admin(self) -> bool:
+            return self._admin
+
+        def stop_event(self) -> None:
+            self.stopped = True
+
+        def plain_result(self, text: str) -> str:
+            return text
+
+    event_module.filter = _Filter()
+    event_module.AstrMessageEvent = AstrMessageEvent
+    event_module.MessageType = MessageType
+
+    # astrbot.api.star
+    star_module = types.ModuleType("astrbot.api.star")
+
+    class Context:
+        def __init__(self, unique_session: bool = False):
+            self.config = {"platform_settings": {"unique_session": unique_session}}
+
+        def get_config(self) -> dict:
+            return self.config
+
+    class Star:
+        def __init__(self, context: Context):
+            self.context = context
+
+    class StarTools:
+        data_dir: Path | None = None
+
+        @classmethod
+        def get_data_dir(cls) -> Path:
+            return cls.data_dir
+
+    star_module.Context = Context
+    star_module.Star = Star
+    star_module.StarTools = StarTools
+
+    # astrbot.api.message_components
+    components = types.ModuleType("astrbot.api.message_components")
+
+    class At:
+        def __init__(self, qq: str):
+            self.qq = qq
+
+    class Plain:
+        def __init__(self, text: str):
+            self.text = text
+
+    components.At = At
+    components.Plain = Plain
+
+    astrbot.api = api
+    api.event = event_module
+    api.star = star_module
+    api.message_components = components
+    sys.modules.update(
+        {
+            "astrbot": astrbot,
+            "astrbot.api": api,
+            "astrbot.api.event": event_module,
+            "astrbot.api.star": star_module,
+            "astrbot.api.message_components": components,
+        }
+    )
+
+
+def _install_plugin_package() -> None:
+    """将插件目录注册为 reneban 包（插件模块使用相对导入）"""
+    if "reneban" in sys.modules:
+        return
+    package = types.ModuleType("reneban")
+    package.__path__ = [str(PLUGIN_DIR)]
+    sys.modules["reneban"] = package
+
+
+_install_astrbot_stub()
+_install_plugin_package()
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path) -> Path:
+    """插件数据目录"""
+    path = tmp_path / "data"
+    path.mkdir()
+    from astrbot.api.star import StarTools
+
+    StarTools.data_dir = path
+    return path
+
+
+@pytest.fixture
+def make_plugin(data_dir: Path):
+    """构造插件实例（测试结束时调用 terminate）"""
+    from astrbot.api.star import Context
+    from reneban.main import ReNeBan
+
+    plugins: list[ReNeBan] = []
+
+    def make(config: dict | None = None, context: Context | None = None) -> ReNeBan:
+        plugin = ReNeBan(context or Context(), dict(config or {}))
+        plugins.append(plugin)
+        return plugin
+
+    yield make
+    for plugin in plugins:
+        asyncio.run(plugin.terminate())
+
+
+def collect(agen) -> list:
+    """运行命令处理器（异步生成器），返回其产生的所有结果"""
+
+    async def _collect():
+        return [item async for item in agen]
+
+    return asyncio.run(_collect())
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+from astrbot.api.event import AstrMessageEvent
+from conftest import collect
+
+from reneban import strings, time_utils
+from reneban.banlist_view import BanlistRenderer, PageOutOfRangeError
+
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def test_expired_records_do_not_count_towards_pages(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    for uid, timestr in (
+        ("10001", "1h"),
+        ("10002", "1h"),
+        ("10003", "30"),
+        ("10004", "30"),
+    ):
+        collect(plugin.ban_all(event, uid, timestr))
+    renderer = BanlistRenderer(plugin.data_manager, page_size=2)
+
+    # 尚未被清理的过期记录不计入总数、页数与页头
+    later = int(time.time()) + 60
+    text = renderer._render_section("banall", UMO, 1, later)
+    assert "10001" in text and "10002" in text and "10003" not in text
+    assert "页" not in text
+    with pytest.raises(PageOutOfRangeError) as e:
+        renderer._render_section("banall", UMO, 2, later)
+    assert e.value.pages == 1
+
+    now = int(time.time())
+    assert strings.messages["banlist_page_info"].format(
+        page=1, pages=2, total=4, scope="banall"
+    ) in renderer._render_section("banall", UMO, 1, now)
+
+
+def test_banlist_expiring_respects_disable(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.ban_user(event, "10001", "1h"))
+    collect(plugin.ban_disable(event))
+
+    assert collect(plugin.banlist(event, "--expiring")) == [
+        strings.messages["expiring_list"].format(time=time_utils.time_format("1d"))
+        + strings.messages["no_record_found"]
+    ]
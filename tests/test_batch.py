@@ -0,0 +1,26 @@
+from astrbot.api.event import AstrMessageEvent
+from conftest import collect
+
+from reneban import strings
+
+
+def test_batch_reports_permanent_records_as_failed(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.ban_all(event, "10002", "0", "ad"))
+
+    (result,) = collect(plugin.ban_all_batch(event, "10001,10002,10003", "1h"))
+    assert "成功 2 项，失败 1 项" in result
+    assert (
+        strings.messages["batch_result_format"].format(
+            target="10002", result=strings.messages["batch_permanent"]
+        )
+        in result
+    )
+
+    banall = plugin.data_manager.get_data("banall")
+    assert banall.find_by_id("10001").time > 0
+    assert banall.find_by_id("10003").time > 0
+    # 永久记录保持不变
+    record = banall.find_by_id("10002")
+    assert record.time == 0 and record.reason == "ad"
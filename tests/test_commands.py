@@ -0,0 +1,56 @@
+import asyncio
+
+from astrbot.api.event import AstrMessageEvent
+from conftest import collect
+
+from reneban import strings
+
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def test_ban_and_dec_ban(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+
+    collect(plugin.ban_user(event, "10002", "1h", "spam"))
+    record = plugin.data_manager.get_data("ban")[UMO].find_by_id("10002")
+    assert record is not None and record.reason == "spam"
+
+    collect(plugin.dec_ban(event, "10002"))
+    # 列表清空后其会话键随之清理
+    assert not plugin.data_manager.get_data("ban").get(UMO)
+    assert collect(plugin.dec_ban(event, "10002")) == [
+        strings.messages["dec_no_record"]
+    ]
+
+
+def test_ban_umo_and_dec_ban_umo(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+
+    collect(plugin.ban_umo(event, "aiocqhttp:GroupMessage:1"))
+    assert plugin.data_manager.get_data("umoban").find_by_id(
+        "aiocqhttp:GroupMessage:1"
+    )
+    collect(plugin.dec_ban_umo(event, "aiocqhttp:GroupMessage:1"))
+    assert not plugin.data_manager.get_data("umoban").find_by_id(
+        "aiocqhttp:GroupMessage:1"
+    )
+
+
+def test_flood_auto_ban(make_plugin):
+    plugin = make_plugin(
+        {"flood_limit": 2, "flood_window": 60, "flood_ban_time": "10m"}
+    )
+
+    async def send(count: int) -> list[AstrMessageEvent]:
+        events = [AstrMessageEvent(sender_id="10003") for _ in range(count)]
+        for event in events:
+            await plugin.filter_banned_users(event)
+        return events
+
+    events = asyncio.run(send(4))
+    assert [event.stopped for event in events] == [False, False, True, True]
+    record = plugin.data_manager.get_data("ban")[UMO].find_by_id("10003")
+    assert record is not None
+    assert record.reason == strings.messages["flood_ban_reason"]
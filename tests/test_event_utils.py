@@ -0,0 +1,46 @@
+from astrbot.api.event import AstrMessageEvent
+from astrbot.api.star import Context
+
+from reneban import event_utils
+from reneban.event_utils import EventUtils, UmoResolver
+
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def test_umo_resolver_interns_and_evicts():
+    resolver = UmoResolver(max_entries=2)
+    first = resolver.group_umo("aiocqhttp", "GroupMessage", "1")
+    assert first == "aiocqhttp:GroupMessage:1"
+    assert resolver.group_umo("aiocqhttp", "GroupMessage", "1") is first
+    resolver.group_umo("aiocqhttp", "GroupMessage", "2")
+    resolver.group_umo("aiocqhttp", "GroupMessage", "3")
+    assert len(resolver) == 2
+
+
+def test_umo_resolver_refreshes_config(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(event_utils.time_module, "monotonic", lambda: now)
+    resolver = UmoResolver(refresh_interval=5.0)
+    context = Context(unique_session=False)
+    assert resolver.unique_session(context) is False
+
+    # 同一配置对象在刷新间隔内使用缓存值
+    context.config["platform_settings"]["unique_session"] = True
+    assert resolver.unique_session(context) is False
+    now += 5.0
+    assert resolver.unique_session(context) is True
+    # 更换配置对象时立即重新读取
+    context.config = {"platform_settings": {"unique_session": False}}
+    assert resolver.unique_session(context) is False
+
+
+def test_get_event_umo_under_unique_session():
+    event_utils.UMO_RESOLVER.clear()
+    context = Context(unique_session=True)
+    event = AstrMessageEvent(sender_id="10001", group_id="20001")
+    # 隔离会话下事件的 UMO 含发送者，判定时仍按群聊 UMO 处理
+    event.unified_msg_origin = "aiocqhttp:GroupMessage:10001_20001"
+    umo = EventUtils.get_event_umo(context, event)
+    assert umo == UMO
+    assert EventUtils.get_event_umo(context, event) is umo
+    event_utils.UMO_RESOLVER.clear()
@@ -0,0 +1,101 @@
+import sys
+import threading
+
+from astrbot.api.event import AstrMessageEvent
+from conftest import collect
+
+from reneban import strings
+from reneban.datafile_manager import DatafileManager
+from reneban.memory_utils import measure_memory, measure_resources
+from reneban.user_manager import (
+    MODEL_LIST_REGISTRY,
+    REASON_TABLE,
+    UmoDataModel,
+    UserDataList,
+    UserDataModel,
+)
+
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def _measure(path, reasons: list[str]):
+    """以给定理由构造 banall 记录并测量（其余数据固定）"""
+    path.mkdir()
+    data_manager = DatafileManager(path)
+    try:
+        with data_manager.transaction(["ban", "banall", "umoban"]) as data:
+            data["ban"][UMO] = UserDataList(
+                [
+                    UserDataModel(uid="10001", time=0, reason="spam"),
+                    UserDataModel(uid="10002", time=0, reason="spam"),
+                ]
+            )
+            for index, reason in enumerate(reasons):
+                data["banall"].append(
+                    UserDataModel(uid=f"2000{index}", time=0, reason=reason)
+                )
+            data["umoban"].append(UmoDataModel(umo=UMO, time=0))
+        return measure_memory(data_manager)
+    finally:
+        data_manager.close()
+
+
+def test_measure_memory_per_list(tmp_path):
+    short = _measure(tmp_path / "short", ["a" * 10])
+    long = _measure(tmp_path / "long", ["b" * 1010])
+
+    assert short.scopes["banall"][0] == 1
+    assert short.scopes["ban"][0] == 2
+    assert short.scopes["umoban"][0] == 1
+    assert short.scopes["pass"][0] == 0
+    assert short.total_records == 4
+    assert short.record_types["UserDataModel"][0] == 3
+    assert short.record_types["UmoDataModel"][0] == 1
+    assert list(short.umos) == [f"ban:{UMO}"]
+    assert short.umos[f"ban:{UMO}"][0] == 2
+    assert short.total_bytes == sum(size for _, size in short.scopes.values())
+
+    # 只有 banall 中理由字符串的长度不同，其余列表大小相同
+    assert long.scopes["banall"][1] - short.scopes["banall"][1] == 1000
+    for name, (_, size) in short.scopes.items():
+        if name != "banall":
+            assert long.scopes[name][1] == size
+
+
+def test_shared_reasons_are_counted_once(tmp_path):
+    shared = _measure(tmp_path / "shared", ["c" * 1000, "c" * 1000])
+    distinct = _measure(tmp_path / "distinct", ["c" * 1000, "d" * 1000])
+
+    # 相同理由驻留为同一对象，只计一次
+    assert distinct.scopes["banall"][1] - shared.scopes["banall"][1] == sys.getsizeof(
+        "d" * 1000
+    )
+    assert shared.reasons.duplicated_objects == 0
+    assert shared.reasons.shared_bytes >= sys.getsizeof("c" * 1000)
+    assert shared.ids.duplicated_objects == 0
+
+
+def test_measure_resources(data_dir):
+    data_manager = DatafileManager(data_dir)
+    try:
+        usage = measure_resources()
+        assert usage.threads == threading.active_count()
+        assert usage.registered_lists == len(MODEL_LIST_REGISTRY)
+        assert usage.live_managers >= 1
+        assert usage.reason_table_size == len(REASON_TABLE)
+        assert usage.tasks is None
+    finally:
+        data_manager.close()
+
+
+def test_ban_mem_command(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.ban_all(event, "10002", "1h", "spam"))
+    collect(plugin.ban_all(event, "10003", "1h", "spam"))
+
+    (result,) = collect(plugin.ban_mem(event, "3"))
+    assert result.startswith("黑名单内存占用（估算）：\n总计 2 条记录")
+    assert " - banall：2 条" in result
+    assert "理由字符串：2 处引用，1 种取值，0 个重复副本" in result
+    assert collect(plugin.ban_mem(event, "x")) == [strings.command_error("ban-mem")]
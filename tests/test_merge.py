@@ -0,0 +1,94 @@
+import json
+
+from astrbot.api.event import AstrMessageEvent
+from conftest import collect
+
+from reneban.bulk_io import export_records
+from reneban.datafile_manager import DatafileManager
+from reneban.merge import merge_records
+from reneban.user_manager import UserDataModel
+
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def test_dec_cancel_and_reset_leave_tombstones(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.ban_user(event, "10002", "1h"))
+    collect(plugin.ban_all(event, "10003"))
+
+    collect(plugin.dec_ban(event, "10002"))
+    collect(plugin.ban_reset(event, "10003"))
+    tombstones = plugin.data_manager.tombstones
+    assert tombstones.get(("ban", UMO, "10002")) is not None
+    assert tombstones.get(("banall", "", "10003")) is not None
+
+
+def test_housekeeping_leaves_no_tombstones(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.ban_user(event, "10002", "1h"))
+    # 永久 pass 使同一会话的 ban 记录因冗余被清理
+    collect(plugin.pass_user(event, "10002"))
+
+    assert not plugin.data_manager.get_data("ban").get(UMO)
+    assert len(plugin.data_manager.tombstones) == 0
+
+
+def test_merge_does_not_resurrect_deleted_records(tmp_path, make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.ban_user(event, "10002", "1h", "spam"))
+
+    # 删除前的导出文件相当于对方节点持有的旧副本
+    peer_dir = tmp_path / "peer"
+    peer_dir.mkdir()
+    export_path = tmp_path / "export.jsonl"
+    export_records(plugin.data_manager, export_path)
+    collect(plugin.dec_ban(event, "10002"))
+
+    report = merge_records(plugin.data_manager, export_path)
+    assert report.added == 0
+    assert not plugin.data_manager.get_data("ban").get(UMO)
+
+    # 墓碑随导出传播，对方合并后同样删除该记录
+    peer = DatafileManager(peer_dir)
+    try:
+        merge_records(peer, export_path)
+        assert peer.get_data("ban")[UMO].find_by_id("10002") is not None
+        export_records(plugin.data_manager, export_path)
+        merge_records(peer, export_path)
+        assert not peer.get_data("ban").get(UMO)
+    finally:
+        peer.close()
+
+
+def test_legacy_records_stay_unversioned(data_dir, tmp_path):
+    legacy = [{"uid": "10001", "time": 0, "reason": "spam"}]
+    (data_dir / "banall_list.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    data_manager = DatafileManager(data_dir)
+    try:
+        record = data_manager.get_data("banall").find_by_id("10001")
+        assert record.ts is None and record.version() == (0, "")
+        # 其他数据的修改会重写文件，但不会为旧记录生成新版本
+        with data_manager.transaction(["banall", "passall"]) as data:
+            data["passall"].append(UserDataModel(uid="10002", time=0))
+        data_manager.close()
+        saved = json.loads((data_dir / "banall_list.json").read_text(encoding="utf-8"))
+        assert saved == legacy
+        assert data_manager.get_data("banall").find_by_id("10001").ts is None
+
+        # 对方节点的任意版本都比旧记录新
+        peer_path = tmp_path / "peer.jsonl"
+        peer_path.write_text(
+            json.dumps(
+                {"scope": "banall", "id": "10001", "time": 0, "reason": "ad", "ts": 1}
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        merge_records(data_manager, peer_path)
+        assert data_manager.get_data("banall").find_by_id("10001").reason == "ad"
+    finally:
+        data_manager.close()
@@ -0,0 +1,58 @@
+import asyncio
+import pstats
+
+from reneban.profiling import SamplingProfiler, profiled
+
+
+def _handler_work() -> int:
+    return sum(range(1000))
+
+
+def _other_work() -> int:
+    return sum(range(1000))
+
+
+class _Plugin:
+    def __init__(self):
+        self.profiler = SamplingProfiler()
+
+    @profiled
+    async def command(self, value: int):
+        _handler_work()
+        await asyncio.sleep(0.01)
+        yield value
+
+    @profiled
+    async def listener(self) -> int:
+        await asyncio.sleep(0)
+        return _handler_work()
+
+
+def test_profiles_only_sync_sections_of_concurrent_calls(tmp_path):
+    plugin = _Plugin()
+    plugin.profiler.arm(3, tmp_path)
+
+    async def collect(value: int) -> list[int]:
+        return [result async for result in plugin.command(value)]
+
+    async def unrelated() -> None:
+        await asyncio.sleep(0.005)
+        _other_work()
+
+    async def run() -> None:
+        # 两个调用的挂起期间相互重叠，且有未采样的任务在此期间运行
+        assert await asyncio.gather(collect(1), collect(2), unrelated()) == [
+            [1],
+            [2],
+            None,
+        ]
+        assert plugin.profiler.remaining == 1
+        assert await plugin.listener() == sum(range(1000))
+
+    asyncio.run(run())
+    assert not plugin.profiler.active
+
+    (stats_path,) = tmp_path.glob("profile_*.pstats")
+    functions = {name for _, _, name in pstats.Stats(str(stats_path)).stats}
+    assert "_handler_work" in functions
+    assert "_other_work" not in functions
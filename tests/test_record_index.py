@@ -0,0 +1,78 @@
+from astrbot.api.event import AstrMessageEvent
+from conftest import collect
+
+from reneban import strings, time_utils
+from reneban.record_index import RecordIndex
+from reneban.user_manager import UmoDataList, UmoDataModel, UserDataList, UserDataModel
+
+NOW = 1_700_000_000
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def _index() -> RecordIndex:
+    return RecordIndex(
+        {
+            "ban": {
+                UMO: UserDataList(
+                    [
+                        UserDataModel(uid="10001", time=NOW + 60, reason="spam"),
+                        UserDataModel(uid="10002", time=NOW + 7200, reason="spam"),
+                        UserDataModel(uid="20001", time=0, reason="ad"),
+                    ]
+                )
+            },
+            "banall": UserDataList(
+                [UserDataModel(uid="10003", time=NOW - 1, reason="spam")]
+            ),
+            "umoban": UmoDataList([UmoDataModel(umo=UMO, time=NOW + 30)]),
+        },
+        generation=1,
+    )
+
+
+def test_expiring_within_is_sorted_and_bounded():
+    records = _index().expiring_within(3600, now=NOW)
+    assert [record.id for record in records] == [UMO, "10001"]
+    assert records[1].scope == "ban" and records[1].key == UMO
+
+
+def test_by_reason_and_id_prefix_skip_expired():
+    index = _index()
+    assert sorted(record.id for record in index.by_reason("spam", now=NOW)) == [
+        "10001",
+        "10002",
+    ]
+    assert [record.id for record in index.by_id_prefix("100", now=NOW)] == [
+        "10001",
+        "10002",
+    ]
+    assert [record.id for record in index.by_id_prefix("2", now=NOW)] == ["20001"]
+
+
+def test_banlist_expiring_defaults_to_one_day(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.ban_user(event, "10001", "1h"))
+    collect(plugin.ban_user(event, "10002", "2d"))
+
+    (result,) = collect(plugin.banlist(event, "--expiring"))
+    assert result.startswith(
+        strings.messages["expiring_list"].format(time=time_utils.time_format("1d"))
+    )
+    assert "10001" in result and "10002" not in result
+
+
+def test_dec_by_removes_matching_records(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.ban_user(event, "10001", "1h", "spam"))
+    collect(plugin.ban_all(event, "10002", "1h", "spam"))
+    collect(plugin.ban_user(event, "10003", "1h", "ad"))
+
+    assert collect(plugin.dec_by(event, "reason", "spam")) == [
+        strings.messages["dec_by_done"].format(field="reason", value="spam", count=2)
+    ]
+    assert len(plugin.data_manager.get_data("banall")) == 0
+    assert [item.uid for item in plugin.data_manager.get_data("ban")[UMO]] == [
+        "10003"
+    ]
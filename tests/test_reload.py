@@ -0,0 +1,45 @@
+import asyncio
+import gc
+import threading
+
+from astrbot.api.event import AstrMessageEvent
+from astrbot.api.star import Context
+
+from reneban.datafile_manager import DatafileManager
+from reneban.main import ReNeBan
+from reneban.memory_utils import measure_memory
+from reneban.user_manager import MODEL_LIST_REGISTRY, UserDataModel
+
+
+def test_reads_after_close_reload_from_disk(data_dir):
+    data_manager = DatafileManager(data_dir)
+    with data_manager.transaction("banall") as banall:
+        banall.append(UserDataModel(uid="10001", time=0))
+    data_manager.close()
+
+    assert not data_manager.is_cache_valid()
+    assert data_manager.get_clear_data("banall", no_copy=True).find_by_id("10001")
+    data_manager.close()
+    assert measure_memory(data_manager).scopes["banall"][0] == 1
+    data_manager.close()
+
+
+def test_repeated_reload_does_not_leak(data_dir, tmp_path):
+    config = {
+        "replication_mode": "follow",
+        "replication_dir": str(tmp_path / "shared"),
+    }
+
+    async def cycle() -> None:
+        plugin = ReNeBan(Context(), dict(config))
+        await plugin.filter_banned_users(AstrMessageEvent())
+        await plugin.terminate()
+
+    def reload_once() -> tuple[int, int]:
+        asyncio.run(cycle())
+        gc.collect()
+        return threading.active_count(), len(MODEL_LIST_REGISTRY)
+
+    baseline = reload_once()
+    for _ in range(5):
+        assert reload_once() == baseline
@@ -0,0 +1,67 @@
+import msgpack
+
+from reneban.datafile_manager import DatafileManager
+from reneban.replication import (
+    ReplicationFollower,
+    ReplicationPublisher,
+    list_segments,
+    segment_name,
+)
+from reneban.user_manager import UserDataList, UserDataModel
+
+UMO_1 = "aiocqhttp:GroupMessage:1"
+UMO_2 = "aiocqhttp:GroupMessage:2"
+
+
+def _last_segment(directory) -> dict:
+    seq = list_segments(directory)[-1]
+    return msgpack.unpackb((directory / segment_name(seq)).read_bytes(), raw=False)
+
+
+def _ban(data_manager: DatafileManager, umo: str, uid: str, keys=None) -> None:
+    with data_manager.transaction("ban", keys=keys) as data:
+        data.setdefault(umo, UserDataList()).append(
+            UserDataModel(uid=uid, time=0, reason="spam")
+        )
+
+
+def test_publisher_origin_defaults_to_node_id(tmp_path):
+    (tmp_path / "data").mkdir()
+    data_manager = DatafileManager(tmp_path / "data")
+    try:
+        publisher = ReplicationPublisher(data_manager, tmp_path / "shared")
+        assert publisher.origin == data_manager.node_id
+    finally:
+        data_manager.close()
+
+
+def test_replication_with_and_without_change_keys(tmp_path):
+    for name in ("publisher", "follower"):
+        (tmp_path / name).mkdir()
+    shared = tmp_path / "shared"
+    source = DatafileManager(tmp_path / "publisher")
+    replica = DatafileManager(tmp_path / "follower")
+    publisher = ReplicationPublisher(source, shared, scopes=["ban"])
+    follower = ReplicationFollower(replica, shared, tmp_path / "checkpoint")
+    try:
+        publisher.start()
+        _ban(source, UMO_1, "10001", keys=[UMO_1])
+        _ban(source, UMO_2, "10002", keys=[UMO_2])
+        # 带变更键的通知只产生该键下的操作
+        assert _last_segment(shared)["ops"] == [
+            ["put", "ban", UMO_2, "10002", 0, "spam"]
+        ]
+
+        # 不带变更键时比较整份数据，删除同样会被发布
+        with source.transaction("ban") as data:
+            data[UMO_1].remove_by_id("10001")
+        assert _last_segment(shared)["ops"] == [["del", "ban", UMO_1, "10001"]]
+
+        follower.poll()
+        ban = replica.get_data("ban")
+        assert not ban.get(UMO_1)
+        assert ban[UMO_2].find_by_id("10002").reason == "spam"
+    finally:
+        publisher.stop()
+        source.close()
+        replica.close()
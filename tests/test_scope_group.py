@@ -0,0 +1,45 @@
+from astrbot.api.event import AstrMessageEvent
+from conftest import collect
+
+from reneban import strings
+from reneban.event_utils import EventUtils
+
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def _check(plugin, uid: str) -> bool:
+    return EventUtils.check_banned(True, plugin.data_manager, UMO, uid)[0]
+
+
+def test_group_ban_applies_to_members(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.group_add(event, "partners"))
+    collect(plugin.ban_group(event, "partners", "10002", "1h", "spam"))
+    assert _check(plugin, "10002")
+
+    collect(plugin.group_remove(event, "partners"))
+    assert not _check(plugin, "10002")
+
+
+def test_dec_group_commands(make_plugin):
+    plugin = make_plugin()
+    event = AstrMessageEvent(admin=True)
+    collect(plugin.group_add(event, "partners"))
+    collect(plugin.ban_group(event, "partners", "10002", "1h"))
+    # 没有对应禁用的解限记录会被当作冗余清理
+    collect(plugin.ban_all(event, "10003", "1d"))
+    collect(plugin.pass_group(event, "partners", "10003", "1h"))
+
+    for handler, uid in (
+        (plugin.dec_ban_group, "10002"),
+        (plugin.dec_pass_group, "10003"),
+    ):
+        assert collect(handler(event, "partners", uid)) != [
+            strings.messages["dec_no_record"]
+        ]
+        assert collect(handler(event, "partners", uid)) == [
+            strings.messages["dec_no_record"]
+        ]
+    assert not plugin.data_manager.get_data("groupban").get("partners")
+    assert not plugin.data_manager.get_data("grouppass").get("partners")
@@ -0,0 +1,64 @@
+import time
+
+from astrbot.api.event import AstrMessageEvent
+from conftest import collect
+
+from reneban import strike_manager
+from reneban.strike_manager import GLOBAL_SCOPE, StrikeTable, ladder_time
+
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def test_ladder_time_clamps_to_last_step():
+    ladder = [600, 3600, 86400]
+    assert [ladder_time(ladder, count) for count in (1, 2, 3, 4, 10)] == [
+        600,
+        3600,
+        86400,
+        86400,
+        86400,
+    ]
+
+
+def test_strikes_persist_and_decay(tmp_path, monkeypatch):
+    now = 1_700_000_000
+    monkeypatch.setattr(strike_manager.time_module, "time", lambda: now)
+    path = tmp_path / "strike_list.msgpack"
+    table = StrikeTable(path, decay=3600)
+    assert table.add(UMO, "10001") == 1
+    assert table.add(UMO, "10001") == 2
+    assert table.add(GLOBAL_SCOPE, "10001") == 1
+    table.undo(GLOBAL_SCOPE, "10001")
+    assert table.get(GLOBAL_SCOPE, "10001") == 0
+
+    # 重新加载后计数保留，每经过 decay 秒减一
+    reloaded = StrikeTable(path, decay=3600)
+    assert reloaded.get(UMO, "10001") == 2
+    now += 3600
+    assert reloaded.get(UMO, "10001") == 1
+    now += 3600
+    assert StrikeTable(path, decay=3600).get(UMO, "10001") == 0
+    assert len(StrikeTable(path, decay=3600)) == 0
+
+
+def test_reset_uid_clears_all_scopes(tmp_path):
+    table = StrikeTable(tmp_path / "strike_list.msgpack", decay=0)
+    table.add(UMO, "10001")
+    table.add(GLOBAL_SCOPE, "10001")
+    table.add(UMO, "10002")
+    table.reset_uid("10001")
+    assert table.get(UMO, "10001") == table.get(GLOBAL_SCOPE, "10001") == 0
+    assert table.get(UMO, "10002") == 1
+
+
+def test_strike_command_follows_ladder(make_plugin):
+    plugin = make_plugin({"strike_ladder": ["10m", "1h"]})
+    event = AstrMessageEvent(admin=True)
+
+    start = int(time.time())
+    for _ in range(3):
+        collect(plugin.strike_user(event, "10002", "spam"))
+    record = plugin.data_manager.get_data("ban")[UMO].find_by_id("10002")
+    # 第一次 10m，第二次叠加 1h，第三次起按最后一级叠加 1h
+    assert start + 600 + 7200 <= record.time <= int(time.time()) + 600 + 7200
+    assert plugin.strikes.get(UMO, "10002") == 3
@@ -0,0 +1,61 @@
+import asyncio
+
+from astrbot.api.event import AstrMessageEvent
+from conftest import collect
+
+from reneban import strings
+from reneban.datafile_manager import DatafileManager
+from reneban.trace_utils import FILTER_COMMAND, TraceRecorder, TraceReplayer
+
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def test_recorder_round_trip(tmp_path):
+    trace_path = tmp_path / "trace.msgpack"
+    recorder = TraceRecorder(trace_path, flush_size=2)
+    recorder.record(UMO, "10002", "ban-all")
+    recorder.record(UMO, "10002", FILTER_COMMAND)
+    recorder.record(UMO, "10003", FILTER_COMMAND)
+    recorder.flush()
+    recorder.record(UMO, None, "unknown")
+    recorder.close()
+
+    replay_dir = tmp_path / "replay"
+    replay_dir.mkdir()
+    data_manager = DatafileManager(replay_dir)
+    try:
+        replayer = TraceReplayer(data_manager, trace_path)
+        records = list(replayer.iter_records())
+        assert [record[3] for record in records] == ["ban-all", "", "", "unknown"]
+        # UID 以加盐摘要匿名化，同一 UID 的摘要一致
+        assert records[0][2] == records[1][2] == recorder.uid_hash("10002").hex()
+        assert records[2][2] != records[1][2]
+
+        report = replayer.replay()
+        assert (report.commands, report.verdicts, report.banned, report.skipped) == (
+            1,
+            2,
+            1,
+            1,
+        )
+        assert report.bytes_written > 0 and report.logical_bytes > 0
+    finally:
+        data_manager.close()
+
+
+def test_ban_replay_command(make_plugin):
+    plugin = make_plugin({"trace_capture": True})
+    event = AstrMessageEvent(admin=True)
+    assert collect(plugin.ban_replay(event)) == [strings.messages["replay_no_trace"]]
+
+    collect(plugin.ban_user(event, "10002", "1h"))
+    asyncio.run(plugin.filter_banned_users(AstrMessageEvent(sender_id="10002")))
+    started, done = collect(plugin.ban_replay(event))
+    assert started == strings.messages["replay_started"]
+    assert "判定 1 次（禁用 1 次），命令 1 条" in done
+    # 回放不影响线上数据
+    assert plugin.data_manager.get_data("ban")[UMO].find_by_id("10002") is not None
+    assert (plugin.data_manager.data_dir / "replay").is_dir()
+    assert collect(plugin.ban_replay(event, "fast")) == [
+        strings.command_error("ban-replay")
+    ]
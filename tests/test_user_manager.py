@@ -0,0 +1,202 @@
+import asyncio
+import json
+import gc
+import threading
+
+import pytest
+
+from reneban.datafile_manager import DatafileManager
+from reneban.event_utils import EventUtils
+from reneban.user_manager import (
+    EMPTY_UMO_LIST,
+    EMPTY_USER_LIST,
+    MODEL_LIST_REGISTRY,
+    REASON_TABLE,
+    ModelListRegistry,
+    UserDataList,
+    UserDataModel,
+)
+
+
+def test_registry_size_constant_across_checks(data_dir):
+    data_manager = DatafileManager(data_dir, cache_ttl=0)
+    try:
+        with data_manager.transaction(["ban", "banall"]) as data:
+            data["ban"]["aiocqhttp:GroupMessage:1"] = UserDataList(
+                [UserDataModel(uid="10001", time=0, reason="spam")]
+            )
+            data["banall"].append(UserDataModel(uid="10002", time=0))
+
+        # cache_ttl 为 0 时每次判定都会重建缓存，旧缓存的列表应随之不再被追踪
+        EventUtils.check_banned(True, data_manager, "aiocqhttp:GroupMessage:1", "1")
+        gc.collect()
+        baseline = len(MODEL_LIST_REGISTRY)
+        for i in range(200):
+            EventUtils.check_banned(
+                True, data_manager, f"aiocqhttp:GroupMessage:{i % 7}", str(i)
+            )
+        gc.collect()
+        assert len(MODEL_LIST_REGISTRY) == baseline
+    finally:
+        data_manager.close()
+
+
+def test_copies_are_not_registered(data_dir):
+    data_manager = DatafileManager(data_dir)
+    try:
+        gc.collect()
+        baseline = len(MODEL_LIST_REGISTRY)
+        copies = [data_manager.get_clear_data() for _ in range(10)]
+        assert len(MODEL_LIST_REGISTRY) == baseline
+        del copies
+    finally:
+        data_manager.close()
+
+
+@pytest.mark.parametrize("empty", [EMPTY_USER_LIST, EMPTY_UMO_LIST])
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda lst: lst.append(UserDataModel(uid="1", time=0)),
+        lambda lst: lst.extend([UserDataModel(uid="1", time=0)]),
+        lambda lst: lst.insert(0, UserDataModel(uid="1", time=0)),
+        lambda lst: lst.__iadd__([UserDataModel(uid="1", time=0)]),
+        lambda lst: lst.__setitem__(slice(0, 0), [UserDataModel(uid="1", time=0)]),
+        lambda lst: lst.__imul__(2),
+    ],
+)
+def test_empty_lists_are_read_only(empty, mutate):
+    with pytest.raises(TypeError):
+        mutate(empty)
+    assert len(empty) == 0
+    assert empty.find_by_id("1") is None
+
+
+def test_empty_list_iadd_statement():
+    lst = EMPTY_USER_LIST
+    with pytest.raises(TypeError):
+        lst += [UserDataModel(uid="1", time=0)]
+    assert len(EMPTY_USER_LIST) == 0
+
+
+def test_registry_clears_off_loop_and_throttles_wakeups():
+    registry = ModelListRegistry(max_interval=60, min_interval=0.2)
+    expired = UserDataList([UserDataModel(uid="1", time=1)])
+    permanent = UserDataList([UserDataModel(uid="2", time=0)])
+    sweeps: list[threading.Thread] = []
+    clear_task = registry._clear_task
+
+    def record_sweep() -> float:
+        sweeps.append(threading.current_thread())
+        return clear_task()
+
+    registry._clear_task = record_sweep
+
+    async def run() -> None:
+        registry.register_all([expired, permanent])
+        assert registry.start()
+        # 频繁注册（缓存重建）不会导致连续清理
+        for _ in range(50):
+            registry.register(permanent)
+            await asyncio.sleep(0.005)
+        await registry.stop()
+
+    asyncio.run(run())
+    assert len(expired) == 0 and len(permanent) == 1
+    assert threading.main_thread() not in sweeps
+    assert 1 <= len(sweeps) <= 3
+
+
+def test_registry_survives_failed_sweep(caplog):
+    registry = ModelListRegistry(max_interval=0.05, min_interval=0.01)
+    expired = UserDataList([UserDataModel(uid="1", time=1)])
+    calls = 0
+    clear_task = registry._clear_task
+
+    def flaky_sweep() -> float:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise OSError("disk unavailable")
+        return clear_task()
+
+    registry._clear_task = flaky_sweep
+
+    async def run() -> None:
+        registry.register(expired)
+        assert registry.start()
+        while calls < 2:
+            await asyncio.sleep(0.01)
+        task = registry._task
+        assert not task.done()
+        await registry.stop()
+        assert task.cancelled()
+
+    asyncio.run(run())
+    assert len(expired) == 0
+    assert "disk unavailable" in caplog.text
+
+
+def test_loaded_ids_and_reasons_are_shared(data_dir):
+    umo = "aiocqhttp:GroupMessage:1"
+    reason = "".join(["打", "广告"])
+    (data_dir / "ban_list.json").write_text(
+        json.dumps({umo: [{"uid": "10001", "time": 0, "reason": reason}]}),
+        encoding="utf-8",
+    )
+    (data_dir / "banall_list.json").write_text(
+        json.dumps([{"uid": "10001", "time": 0, "reason": reason}]), encoding="utf-8"
+    )
+    (data_dir / "umo_ban_list.json").write_text(
+        json.dumps([{"umo": umo, "time": 0, "reason": reason}]), encoding="utf-8"
+    )
+
+    data_manager = DatafileManager(data_dir)
+    try:
+        data = data_manager.get_clear_data(["ban", "banall", "umoban"], no_copy=True)
+        ban = data["ban"][umo].find_by_id("10001", no_copy=True)
+        banall = data["banall"].find_by_id("10001", no_copy=True)
+        umoban = data["umoban"].find_by_id(umo, no_copy=True)
+        # 不同文件中的同值 ID 与理由在加载后为同一对象
+        assert ban.uid is banall.uid
+        assert next(iter(data["ban"])) is umoban.umo
+        assert ban.reason is banall.reason is umoban.reason
+
+        # 重新加载后仍与已持有的对象共享
+        data_manager.close()
+        reloaded = data_manager.get_clear_data("banall", no_copy=True)
+        again = reloaded.find_by_id("10001", no_copy=True)
+        assert again is not banall
+        assert again.uid is banall.uid and again.reason is banall.reason
+    finally:
+        data_manager.close()
+
+
+def test_reason_table_releases_unreferenced_reasons():
+    REASON_TABLE.clear()
+    # 运行时拼接的字符串不会被代码对象的常量引用
+    kept_reason = "-".join(["kept", "1"])
+    dropped_reason = "-".join(["dropped", "1"])
+    kept = UserDataModel(uid="1", time=0, reason=kept_reason)
+    dropped = UserDataModel(uid="2", time=0, reason=dropped_reason)
+    assert len(REASON_TABLE) == 2
+
+    del dropped, dropped_reason
+    assert REASON_TABLE.prune() == 1
+    assert len(REASON_TABLE) == 1
+    assert REASON_TABLE.intern("-".join(["kept", "1"])) is kept.reason
+
+
+def test_sweep_prunes_reasons_of_expired_records():
+    REASON_TABLE.clear()
+    registry = ModelListRegistry()
+    lst = UserDataList(
+        [
+            UserDataModel(uid="1", time=1, reason="-".join(["expired", "1"])),
+            UserDataModel(uid="2", time=0, reason="-".join(["live", "1"])),
+        ]
+    )
+    registry.register(lst)
+    registry._clear_task()
+    assert [item.uid for item in lst] == ["2"]
+    assert len(REASON_TABLE) == 1
@@ -0,0 +1,57 @@
+from reneban.datafile_manager import DatafileManager
+from reneban.event_utils import EventUtils
+from reneban.user_manager import UserDataList, UserDataModel
+from reneban.verdict_cache import VerdictCache
+
+UMO = "aiocqhttp:GroupMessage:20001"
+
+
+def test_verdict_cache_hits_and_invalidates(data_dir):
+    data_manager = DatafileManager(data_dir)
+    cache = VerdictCache(data_manager, max_entries=2)
+    try:
+        with data_manager.transaction("ban") as ban:
+            ban[UMO] = UserDataList(
+                [UserDataModel(uid="10001", time=0, reason="spam")]
+            )
+
+        assert EventUtils.check_banned(True, data_manager, UMO, "10001", cache) == (
+            True,
+            "spam",
+        )
+        assert len(cache) == 1
+        now = 1e12
+        assert cache.get(UMO, "10001", now) == (True, "spam")
+
+        # 数据变更（代数递增）后整表失效
+        with data_manager.transaction("ban") as ban:
+            ban[UMO].remove_by_id("10001")
+        assert cache.get(UMO, "10001", now) is None
+        assert EventUtils.check_banned(True, data_manager, UMO, "10001", cache) == (
+            False,
+            None,
+        )
+    finally:
+        data_manager.close()
+
+
+def test_verdict_cache_deadline_and_capacity(data_dir):
+    data_manager = DatafileManager(data_dir)
+    cache = VerdictCache(data_manager, max_entries=2)
+    try:
+        generation = data_manager.generation
+        assert cache.get(UMO, "0", 0) is None  # 同步代数
+        cache.put(UMO, "10001", generation, (True, "spam"), deadline=100)
+        assert cache.get(UMO, "10001", 100) == (True, "spam")
+        # 超过决定判定结果的记录的到期时间后失效
+        assert cache.get(UMO, "10001", 101) is None
+
+        cache.put(UMO, "10002", generation, (False, None), deadline=1e18)
+        cache.put(UMO, "10003", generation, (False, None), deadline=1e18)
+        assert len(cache) == 2
+        assert cache.get(UMO, "10001", 0) is None
+        # 代数已过期的结果不写入
+        cache.put(UMO, "10004", generation - 1, (True, None), deadline=1e18)
+        assert cache.get(UMO, "10004", 0) is None
+    finally:
+        data_manager.close()
@@ -0,0 +1,123 @@
+"""
+Tombstones for ReNeBan plugin
+Versioned deletion markers so that merges with other nodes do not resurrect deleted records
+"""
+
+import threading
+import time as time_module
+from pathlib import Path
+
+import msgpack
+
+from astrbot.api import logger
+
+# 墓碑键：(数据名, 键, ID)；键为 ban/pass 的 UMO 或会话组数据的组名，列表结构为空字符串
+TombstoneKey = tuple[str, str, str]
+
+
+class TombstoneTable:
+    """
+    墓碑表
+
+    记录被删除（/dec-* 取消、/ban-reset、/dec-by 等）的记录的删除版本 (ts, origin)，
+    合并其他节点的数据时，版本早于墓碑的记录不会被恢复。
+    墓碑保留 retention 秒后在保存时清除。
+    数据以 msgpack 紧凑格式保存为 [[数据名, 键, ID, ts, origin], ...]。
+    """
+
+    def __init__(self, path: Path, retention: int):
+        """
+        初始化墓碑表
+
+        Args:
+            path: 持久化文件路径
+            retention: 墓碑保留时间（秒），小于等于 0 时永久保留
+        """
+        self.path = path
+        self.retention = retention
+        self._entries: dict[TombstoneKey, tuple[int, str]] = {}
+        self._stamp: tuple[int, int] | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _stat_stamp(self) -> tuple[int, int] | None:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def load(self) -> None:
+        """从文件加载墓碑（文件自上次加载/保存后未变化时跳过）"""
+        with self._lock:
+            stamp = self._stat_stamp()
+            if stamp is None or stamp == self._stamp:
+                return
+            try:
+                rows = msgpack.unpackb(self.path.read_bytes(), raw=False)
+                if not isinstance(rows, list):
+                    raise ValueError("墓碑文件的根对象应为列表")
+            except Exception as e:
+                backup_filename = f"{self.path.stem}_{int(time_module.time())}.bak"
+                self.path.rename(self.path.parent / backup_filename)
+                logger.error(
+                    f"墓碑文件 {self.path} 解析失败：{e}\n已将其重命名为 {backup_filename}"
+                )
+                return
+            self._entries = {
+                (row[0], row[1], row[2]): (row[3], row[4])
+                for row in rows
+                if isinstance(row, list) and len(row) == 5
+            }
+            self._stamp = stamp
+
+    def save(self) -> None:
+        """清除过期墓碑并保存至文件（无变更时跳过）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            if self.retention > 0:
+                deadline = (int(time_module.time()) - self.retention) * 1000
+                self._entries = {
+                    key: value
+                    for key, value in self._entries.items()
+                    if value[0] >= deadline
+                }
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            tmp_path.write_bytes(
+                msgpack.packb(
+                    [[*key, *value] for key, value in self._entries.items()],
+                    use_bin_type=True,
+                )
+            )
+            tmp_path.replace(self.path)
+            self._stamp = self._stat_stamp()
+            self._dirty = False
+
+    def get(self, key: TombstoneKey) -> tuple[int, str] | None:
+        """获取墓碑版本"""
+        return self._entries.get(key)
+
+    def put(self, key: TombstoneKey, ts: int, origin: str) -> bool:
+        """
+        写入墓碑（已有版本更新的墓碑时忽略）
+
+        Returns:
+            是否写入
+        """
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current >= (ts, origin):
+                return False
+            self._entries[key] = (ts, origin)
+            self._dirty = True
+            return True
+
+    def items(self) -> list[tuple[TombstoneKey, tuple[int, str]]]:
+        """获取所有墓碑（按键排序）"""
+        with self._lock:
+            return sorted(self._entries.items())
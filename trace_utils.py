@@ -0,0 +1,338 @@
+"""
+Trace utils for ReNeBan plugin
+Captures anonymised filter/command traffic and replays it for load testing
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import json
+import secrets
+import threading
+import time as time_module
+from pathlib import Path
+
+import msgpack
+
+from .datafile_manager import DatafileManager
+from .event_utils import EventUtils
+from .exceptions import PermanentRecordTimeError
+from .user_manager import UserDataList, UserDataModel, UmoDataModel
+
+from astrbot.api import logger
+
+# 过滤器记录使用的命令名（即普通消息经过 filter_banned_users）
+FILTER_COMMAND = ""
+
+# 回放时命令到数据名与操作的映射
+_REPLAY_COMMANDS: dict[str, tuple[str, str]] = {
+    "ban": ("ban", "add"),
+    "pass": ("pass", "add"),
+    "ban-all": ("banall", "add"),
+    "pass-all": ("passall", "add"),
+    "ban-umo": ("umoban", "add"),
+    "pass-umo": ("umopass", "add"),
+    "dec-ban": ("ban", "subtract"),
+    "dec-pass": ("pass", "subtract"),
+    "dec-ban-all": ("banall", "subtract"),
+    "dec-pass-all": ("passall", "subtract"),
+    "dec-ban-umo": ("umoban", "subtract"),
+    "dec-pass-umo": ("umopass", "subtract"),
+    "ban-reset": ("", "reset"),
+    "ban-reset-umo": ("", "reset-umo"),
+}
+
+
+class TraceRecorder:
+    """
+    流量采集器
+
+    以 msgpack 流的形式将 (时间戳, UMO, UID 哈希, 命令) 追加写入本地文件，
+    UID 使用加盐的 blake2b 摘要匿名化，盐值保存在数据目录中以便多次采集间保持一致。
+    record() 只在内存中缓冲，写文件由单个后台线程按提交顺序完成，不阻塞事件循环。
+    """
+
+    def __init__(self, trace_path: Path, flush_size: int = 256):
+        """
+        初始化流量采集器
+
+        Args:
+            trace_path: 采集文件路径
+            flush_size: 缓冲的记录条数，达到后写入文件
+        """
+        self.trace_path = trace_path
+        self._flush_size = flush_size
+        self._salt = self._load_salt(trace_path.parent / ".trace_salt")
+        self._packer = msgpack.Packer(use_bin_type=True)
+        self._buffer: list[bytes] = []
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="TraceRecorder"
+        )
+        self._last_write: Future | None = None
+
+    @staticmethod
+    def _load_salt(salt_path: Path) -> bytes:
+        """读取（或生成）匿名化所用的盐值"""
+        if salt_path.exists():
+            salt = salt_path.read_bytes()
+            if salt:
+                return salt
+        salt = secrets.token_bytes(16)
+        salt_path.write_bytes(salt)
+        return salt
+
+    def uid_hash(self, uid: str | None) -> bytes:
+        """
+        将 UID 匿名化为 8 字节摘要（UID 为空时返回空字节串）
+        """
+        if not uid:
+            return b""
+        return hashlib.blake2b(
+            uid.encode("utf-8"), digest_size=8, key=self._salt
+        ).digest()
+
+    def record(self, umo: str, uid: str | None, command: str = FILTER_COMMAND):
+        """
+        记录一次过滤/命令调用
+
+        Args:
+            umo: 消息来源或命令目标的 UMO
+            uid: 发送者或命令目标的 UID（UMO 命令为 None）
+            command: 命令名，普通消息（过滤器）为空字符串
+        """
+        packed = self._packer.pack(
+            [time_module.time(), umo, self.uid_hash(uid), command]
+        )
+        with self._lock:
+            self._buffer.append(packed)
+            if len(self._buffer) >= self._flush_size:
+                self._submit_locked()
+
+    def _submit_locked(self):
+        """将缓冲交给写入线程"""
+        if not self._buffer:
+            return
+        chunk, self._buffer = b"".join(self._buffer), []
+        self._last_write = self._writer.submit(self._write, chunk)
+
+    def _write(self, chunk: bytes):
+        with self.trace_path.open("ab") as f:
+            f.write(chunk)
+
+    def flush(self):
+        """将缓冲中的记录写入文件并等待写入完成（会阻塞，异步处理器中应经 asyncio.to_thread 调用）"""
+        with self._lock:
+            self._submit_locked()
+            future = self._last_write
+        if future is not None:
+            # 写入线程按提交顺序执行，最后一次提交完成即全部完成
+            future.result()
+
+    def close(self):
+        """关闭采集器（写入剩余缓冲并等待写入线程退出）"""
+        with self._lock:
+            self._submit_locked()
+        self._writer.shutdown(wait=True)
+
+
+class ReplayReport:
+    """
+    回放报告
+    """
+
+    def __init__(self):
+        self.verdicts: int = 0  # 判定次数
+        self.banned: int = 0  # 判定为禁用的次数
+        self.commands: int = 0  # 回放的命令数
+        self.skipped: int = 0  # 无法回放的记录数
+        self.latencies_ns: list[int] = []  # 每次判定的耗时（纳秒）
+        self.verdict_time_ns: int = 0  # 判定总耗时（纳秒）
+        self.wall_time: float = 0.0  # 回放总耗时（秒）
+        self.bytes_written: int = 0  # 回放期间写入磁盘的字节数
+        self.logical_bytes: int = 0  # 命令实际变更的记录大小（字节）
+
+    def percentile(self, p: float) -> float:
+        """
+        判定耗时的百分位数（微秒）
+        """
+        if not self.latencies_ns:
+            return 0.0
+        ordered = sorted(self.latencies_ns)
+        idx = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[idx] / 1000
+
+    @property
+    def throughput(self) -> float:
+        """判定吞吐（次/秒，仅计判定本身的耗时）"""
+        if not self.verdict_time_ns:
+            return 0.0
+        return self.verdicts / (self.verdict_time_ns / 1e9)
+
+    @property
+    def write_amplification(self) -> float:
+        """写放大（写入磁盘字节数 / 命令变更的记录字节数）"""
+        if not self.logical_bytes:
+            return 0.0
+        return self.bytes_written / self.logical_bytes
+
+    def format(self) -> str:
+        """格式化为易读的文本"""
+        return (
+            f"判定 {self.verdicts} 次（禁用 {self.banned} 次），命令 {self.commands} 条，跳过 {self.skipped} 条\n"
+            f"回放耗时 {self.wall_time:.3f}s，判定吞吐 {self.throughput:.0f} 次/秒\n"
+            f"判定延迟 p50={self.percentile(50):.1f}us p90={self.percentile(90):.1f}us "
+            f"p99={self.percentile(99):.1f}us max={self.percentile(100):.1f}us\n"
+            f"写入 {self.bytes_written} 字节，变更 {self.logical_bytes} 字节，写放大 {self.write_amplification:.1f}x"
+        )
+
+
+class TraceReplayer:
+    """
+    流量回放器
+
+    将 TraceRecorder 采集的文件回放至给定的 DatafileManager：
+    普通消息走 EventUtils.check_banned 判定路径，命令按其类型修改相应数据。
+    请使用独立的数据目录进行回放，以免污染线上数据。
+    """
+
+    def __init__(
+        self,
+        data_manager: DatafileManager,
+        trace_path: Path,
+        replay_time: int = 3600,
+    ):
+        """
+        初始化流量回放器
+
+        Args:
+            data_manager: 回放所使用的数据文件管理器
+            trace_path: 采集文件路径
+            replay_time: 回放 ban/pass 类命令时使用的时长（秒），采集文件不记录原始时长
+        """
+        self.data_manager = data_manager
+        self.trace_path = trace_path
+        self.replay_time = replay_time
+
+    def iter_records(self):
+        """逐条读取采集文件，不一次性载入整个文件"""
+        with self.trace_path.open("rb") as f:
+            unpacker = msgpack.Unpacker(f, raw=False)
+            for item in unpacker:
+                if (
+                    isinstance(item, list)
+                    and len(item) == 4
+                    and isinstance(item[0], (int, float))
+                    and isinstance(item[1], str)
+                    and isinstance(item[2], bytes)
+                    and isinstance(item[3], str)
+                ):
+                    yield item[0], item[1], item[2].hex(), item[3]
+
+    def replay(self, speed: float = 0.0, enable: bool = True) -> ReplayReport:
+        """
+        回放采集文件
+
+        Args:
+            speed: 回放速度倍率，1 为原速，大于 1 为加速，0 为不等待（尽可能快）
+            enable: 回放时禁用功能是否启用
+
+        Returns:
+            回放报告
+        """
+        report = ReplayReport()
+        bytes_before = self.data_manager.bytes_written
+        start = time_module.perf_counter()
+        first_ts: float | None = None
+
+        for ts, umo, uid, command in self.iter_records():
+            if speed > 0:
+                if first_ts is None:
+                    first_ts = ts
+                delay = (ts - first_ts) / speed - (time_module.perf_counter() - start)
+                if delay > 0:
+                    time_module.sleep(delay)
+
+            if command == FILTER_COMMAND:
+                t0 = time_module.perf_counter_ns()
+                banned, _ = EventUtils.check_banned(
+                    enable, self.data_manager, umo, uid
+                )
+                elapsed = time_module.perf_counter_ns() - t0
+                report.latencies_ns.append(elapsed)
+                report.verdict_time_ns += elapsed
+                report.verdicts += 1
+                report.banned += banned
+            elif command in _REPLAY_COMMANDS:
+                try:
+                    report.logical_bytes += self._replay_command(command, umo, uid)
+                except PermanentRecordTimeError:
+                    # 与命令处理一致：已有永久记录时增减时长不生效
+                    report.skipped += 1
+                    continue
+                report.commands += 1
+            else:
+                report.skipped += 1
+
+        report.wall_time = time_module.perf_counter() - start
+        report.bytes_written = self.data_manager.bytes_written - bytes_before
+        logger.info(f"流量回放完成：\n{report.format()}")
+        return report
+
+    def _replay_command(self, command: str, umo: str, uid: str) -> int:
+        """
+        回放一条命令
+
+        Returns:
+            该命令变更的记录序列化后的大小（字节）
+        """
+        data_name, op = _REPLAY_COMMANDS[command]
+        if op == "reset":
+            user_datas = self.data_manager.get_data(["ban", "pass", "banall", "passall"])
+            for umo_key in list(user_datas["ban"].keys()):
+                user_datas["ban"][umo_key].remove_by_id(uid)
+            for umo_key in list(user_datas["pass"].keys()):
+                user_datas["pass"][umo_key].remove_by_id(uid)
+            user_datas["banall"].remove_by_id(uid)
+            user_datas["passall"].remove_by_id(uid)
+            self.data_manager.write_data(
+                list(user_datas.keys()), list(user_datas.values())
+            )
+            return len(json.dumps({"uid": uid}))
+        if op == "reset-umo":
+            umo_datas = self.data_manager.get_data(["umoban", "umopass"])
+            umo_datas["umoban"].remove_by_id(umo)
+            umo_datas["umopass"].remove_by_id(umo)
+            self.data_manager.write_data(
+                list(umo_datas.keys()), list(umo_datas.values())
+            )
+            return len(json.dumps({"umo": umo}))
+
+        data = self.data_manager.get_data(data_name)
+        if isinstance(data, dict):
+            if data.get(umo) is None:
+                data[umo] = UserDataList()
+            target_list = data[umo]
+            id_value = uid
+            new_item = UserDataModel(
+                uid=uid, time=int(time_module.time()) + self.replay_time
+            )
+        else:
+            target_list = data
+            id_value = umo if data_name in ("umoban", "umopass") else uid
+            if data_name in ("umoban", "umopass"):
+                new_item = UmoDataModel(
+                    umo=umo, time=int(time_module.time()) + self.replay_time
+                )
+            else:
+                new_item = UserDataModel(
+                    uid=uid, time=int(time_module.time()) + self.replay_time
+                )
+
+        if op == "add":
+            if not target_list.add_time_to_data(id_value, self.replay_time):
+                target_list.append(new_item)
+        elif not target_list.subtract_time_from_data(id_value, self.replay_time):
+            return 0
+        self.data_manager.write_data(data_name, data)
+        changed = target_list.find_by_id(id_value, no_copy=True) or new_item
+        return len(json.dumps(changed.to_dict(), ensure_ascii=False).encode("utf-8"))
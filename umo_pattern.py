@@ -0,0 +1,130 @@
+"""
+UMO pattern matching for ReNeBan plugin
+Segment trie over platform:type:id UMOs with `*` wildcard segments
+"""
+
+from collections.abc import Iterable
+
+# 通配段
+WILDCARD = "*"
+# UMO 最多分为 platform_id、message_type、session_id 三段（session_id 中可能含有冒号）
+UMO_SEGMENTS = 3
+
+
+def split_umo(umo: str) -> list[str]:
+    """
+    将 UMO 按 platform_id:message_type:session_id 拆分为段
+    """
+    return umo.split(":", UMO_SEGMENTS - 1)
+
+
+def is_umo_pattern(umo: str) -> bool:
+    """
+    判断 UMO 是否为通配规则（任意一段为 *）
+    """
+    return WILDCARD in split_umo(umo)
+
+
+class _TrieNode:
+    __slots__ = ("children", "wildcard", "tail", "pattern")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}  # 字面段 -> 子节点
+        self.wildcard: _TrieNode | None = None  # 中间的 * 段（匹配恰好一段）
+        self.tail: str | None = None  # 以 * 结尾的规则（匹配其余所有段）
+        self.pattern: str | None = None  # 在此结束的规则
+
+
+class UmoPatternTrie:
+    """
+    UMO 通配规则前缀树
+
+    规则按段插入：字面段精确匹配，中间的 * 匹配恰好一段，末尾的 * 匹配其余所有段
+    （如 aiocqhttp:* 匹配该平台下所有会话，*:FriendMessage:* 匹配所有平台的私聊）。
+    由于 UMO 至多三段，每层至多走字面与通配两个分支，单次匹配耗时与规则数量无关。
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._root = _TrieNode()
+        self._size = 0
+        for pattern in patterns:
+            self.insert(pattern)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def insert(self, pattern: str) -> None:
+        """插入一条规则（非通配的 UMO 也可插入，按精确匹配处理）"""
+        segments = split_umo(pattern)
+        node = self._root
+        for idx, segment in enumerate(segments):
+            if segment == WILDCARD:
+                if idx == len(segments) - 1:
+                    if node.tail is None:
+                        node.tail = pattern
+                        self._size += 1
+                    return
+                if node.wildcard is None:
+                    node.wildcard = _TrieNode()
+                node = node.wildcard
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _TrieNode()
+                node = child
+        if node.pattern is None:
+            node.pattern = pattern
+            self._size += 1
+
+    def match(self, umo: str) -> list[str]:
+        """
+        返回与 UMO 匹配的所有规则，按具体程度排序（越靠前的段为字面值越优先）
+        """
+        if not self._size:
+            return []
+        segments = split_umo(umo)
+        result: list[str] = []
+
+        def walk(node: _TrieNode, idx: int) -> None:
+            if idx == len(segments):
+                if node.pattern is not None:
+                    result.append(node.pattern)
+                return
+            child = node.children.get(segments[idx])
+            if child is not None:
+                walk(child, idx + 1)
+            if node.wildcard is not None:
+                walk(node.wildcard, idx + 1)
+            if node.tail is not None:
+                result.append(node.tail)
+
+        walk(self._root, 0)
+        return result
+
+
+class UmoPatternIndex:
+    """
+    各数据中通配 UMO 规则的索引（ban/pass 的字典键与 umoban/umopass 的 UMO），
+    随缓存重建，供判定时在精确匹配未命中后查找
+    """
+
+    __slots__ = ("ban", "pass_", "umoban", "umopass")
+
+    def __init__(
+        self,
+        ban_keys: Iterable[str] = (),
+        pass_keys: Iterable[str] = (),
+        umoban_umos: Iterable[str] = (),
+        umopass_umos: Iterable[str] = (),
+    ):
+        self.ban = UmoPatternTrie(key for key in ban_keys if is_umo_pattern(key))
+        self.pass_ = UmoPatternTrie(key for key in pass_keys if is_umo_pattern(key))
+        self.umoban = UmoPatternTrie(
+            umo for umo in umoban_umos if is_umo_pattern(umo)
+        )
+        self.umopass = UmoPatternTrie(
+            umo for umo in umopass_umos if is_umo_pattern(umo)
+        )
@@ -1,10 +1,17 @@
-from collections.abc import MutableMapping
+from collections.abc import Iterable, MutableMapping
+import asyncio
+import contextlib
 import copy
+import math
+import sys
 import time as time_module
 from .strings import noreason_to_none
+from .metrics import METRICS
 import threading
 import weakref
 
+from astrbot.api import logger
+
 from .exceptions import (
     PermanentRecordTimeSubtractionError,
     TimeNegativeError,
@@ -12,80 +19,310 @@ from .exceptions import (
 )
 
 
+_EXPIRED_RECORDS = METRICS.counter("reneban_expired_records_total", "过期清理记录数")
+_REGISTERED_LISTS = METRICS.gauge("reneban_registered_lists", "已注册的列表数")
+_CLEAR_TASK_SECONDS = METRICS.histogram(
+    "reneban_clear_task_seconds", "过期清理耗时（秒）"
+)
+
+
 class ModelListRegistry:
     """全局 BaseModelList 过期清理注册器
 
-    维护所有活跃 BaseModelList 的弱引用，由一个后台线程定期清理过期记录。
-    当 BaseModelList 实例被 GC 回收时，弱引用自动移除，无需显式反注册。
+    维护权威（缓存中的）BaseModelList 的弱引用，由事件循环上的一个 asyncio 任务调度过期记录清理，
+    清理本身（遍历所有列表）经 asyncio.to_thread 在线程中执行，不阻塞事件循环。
+    任务在 start() 时才创建（导入模块不会产生任何线程或任务），每次清理后休眠至剩余记录中最早的到期时间，
+    注册新列表（缓存重建）时被唤醒重新计算；没有临时记录时最多休眠 max_interval 秒。
+    两次清理至少间隔 min_interval 秒，缓存频繁重建时不会连续清理。
+    列表不会在构造时自动注册，临时副本、快照与空默认值均不受追踪，
+    由 DatafileManager 在缓存重建时显式注册；旧缓存被 GC 回收时弱引用自动移除，无需显式反注册。
     """
 
-    def __init__(self):
+    def __init__(self, max_interval: float = 60, min_interval: float = 1):
+        self.max_interval = max_interval
+        self.min_interval = min_interval
         self._lists: weakref.WeakValueDictionary[int, "BaseModelList"] = (
             weakref.WeakValueDictionary()
         )
         self._lock = threading.Lock()
-        self.stop_event = threading.Event()
-        self._thread = threading.Thread(
-            target=self._clear_loop, daemon=True, name="ModelListClearer"
-        )
-        self.start()
-
-    def start(self) -> None:
-        if self.stop_event.is_set():
-            self.stop_event.clear()
-        if not self._thread.is_alive():
-            # 线程已死，需要新建 Thread 对象
-            self._thread = threading.Thread(
-                target=self._clear_loop, daemon=True, name="ModelListClearer"
-            )
-            self._thread.start()
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+
+    @property
+    def running(self) -> bool:
+        """清理任务是否在运行"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """
+        在当前运行的事件循环上启动清理任务（已在运行时忽略）
+
+        Returns:
+            清理任务是否在运行（没有运行中的事件循环时返回 False，可稍后再次调用）
+        """
+        if self.running:
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._clear_loop(), name="ModelListClearer")
+        return True
+
+    async def stop(self) -> None:
+        """取消清理任务并等待其退出"""
+        task, self._task = self._task, None
+        self._loop = None
+        self._wakeup = None
+        if task is None or task.done():
+            return
+        task.cancel()
+        if task.get_loop() is asyncio.get_running_loop():
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def _wake(self) -> None:
+        """唤醒清理任务重新计算下次清理时间（可在任意线程调用）"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            if loop is _running_loop():
+                wakeup.set()
+            else:
+                loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
 
     def register(self, lst: "BaseModelList") -> None:
         """注册一个 BaseModelList 到清理任务"""
         with self._lock:
             self._lists[id(lst)] = lst
+        self._wake()
 
-    def _clear_loop(self) -> None:
-        """后台任务循环，每秒执行一次清理任务"""
-        while not self.stop_event.is_set():
-            self._clear_task()
-            self.stop_event.wait(1)
+    def register_all(self, lists: "Iterable[BaseModelList]") -> None:
+        """批量注册 BaseModelList 到清理任务"""
+        with self._lock:
+            for lst in lists:
+                self._lists[id(lst)] = lst
+        self._wake()
 
-    def _clear_task(self) -> None:
-        """清理任务，扫描所有注册的列表"""
+    def unregister_all(self, lists: "Iterable[BaseModelList]") -> None:
+        """批量从清理任务中移除 BaseModelList"""
+        with self._lock:
+            for lst in lists:
+                self._lists.pop(id(lst), None)
+
+    def __len__(self) -> int:
+        return len(self._lists)
+
+    async def _clear_loop(self) -> None:
+        """后台任务循环，在线程中清理后休眠至下一个到期时间或被唤醒"""
+        while True:
+            self._wakeup.clear()
+            try:
+                next_deadline = await asyncio.to_thread(self._clear_task)
+            except Exception as e:
+                # 单次清理失败不应终止任务，下次按 max_interval 重试；取消（CancelledError）照常退出
+                logger.error(f"过期记录清理失败：{e}")
+                next_deadline = math.inf
+            await asyncio.sleep(self.min_interval)
+            timeout = min(next_deadline - time_module.time(), self.max_interval)
+            if timeout > 0:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+
+    def _clear_task(self) -> float:
+        """清理任务，扫描所有注册的列表，返回剩余记录中最早的到期时间"""
         # 在锁外获取快照，避免持有锁时遍历耗时
         with self._lock:
             snapshots = list(self._lists.values())
-        for lst in snapshots:
+        _REGISTERED_LISTS.set(len(snapshots))
+        with _CLEAR_TASK_SECONDS.time():
+            next_deadline = self.clear_lists(snapshots)
+        del snapshots
+        # 过期记录释放后，不再被任何记录引用的理由随之移出驻留表
+        REASON_TABLE.prune()
+        return next_deadline
+
+    @staticmethod
+    def clear_lists(lists: "Iterable[BaseModelList]") -> float:
+        """
+        清理指定列表中的过期记录（不要求列表已注册）
+
+        Returns:
+            剩余记录中最早的到期时间戳（没有临时记录时为无穷大）
+        """
+        now = time_module.time()
+        next_deadline = math.inf
+        for lst in lists:
             with lst._lock:
-                rm_lst = [
-                    item
-                    for item in lst
-                    if item.time != 0 and item.time < time_module.time()
-                ]
+                rm_lst = []
+                for item in lst:
+                    if item.time == 0:
+                        continue
+                    if item.time < now:
+                        rm_lst.append(item)
+                    elif item.time < next_deadline:
+                        next_deadline = item.time
                 for item in rm_lst:
                     lst.remove(item)
+                _EXPIRED_RECORDS.inc(len(rm_lst))
+        return next_deadline
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    """获取当前线程中运行的事件循环（没有时返回 None）"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
 
 
 MODEL_LIST_REGISTRY = ModelListRegistry()
 
 
+class ReasonTable:
+    """全局理由字符串驻留表
+
+    同值的理由只保留一个字符串对象，记录构造与加载时经由此表取得共享对象，
+    使成千上万条相同理由（如“打广告”）的记录只占用一份内存。
+    过期清理后调用 prune() 释放只被表本身引用的理由，使表的大小随存活记录的理由种类变化。
+    """
+
+    def __init__(self):
+        self._table: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, reason: str | None) -> str | None:
+        """取得与 reason 同值的共享字符串"""
+        if reason is None:
+            return None
+        shared = self._table.get(reason)
+        if shared is None:
+            with self._lock:
+                shared = self._table.setdefault(reason, reason)
+        return shared
+
+    def prune(self) -> int:
+        """
+        释放只被驻留表引用的理由（依据 CPython 引用计数；不提供 sys.getrefcount 的实现上不做淘汰）
+        与并发的 intern() 竞争时至多使之后的同值理由不再共享旧对象，不影响正确性
+
+        Returns:
+            释放的理由数
+        """
+        getrefcount = getattr(sys, "getrefcount", None)
+        if getrefcount is None:
+            return 0
+        with self._lock:
+            # 以一个只被表引用的探针字符串校准基准引用数，不依赖解释器版本的计数细节
+            probe = f"\0probe{id(self)}"
+            self._table[probe] = probe
+            probe_id = id(probe)
+            del probe
+            counts = {id(reason): getrefcount(reason) for reason in self._table}
+            unused = [
+                reason
+                for reason in self._table
+                if counts[id(reason)] <= counts[probe_id]
+            ]
+            for reason in unused:
+                del self._table[reason]
+        # 不计探针
+        return len(unused) - 1
+
+    def clear(self) -> None:
+        """清空驻留表（已持有的字符串不受影响）"""
+        with self._lock:
+            self._table.clear()
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+REASON_TABLE = ReasonTable()
+
+
+def intern_id(id_value: str) -> str:
+    """驻留 ID（UID/UMO）字符串"""
+    return sys.intern(id_value) if type(id_value) is str else id_value
+
+
+class LogicalClock:
+    """混合逻辑时钟
+
+    为记录的每次修改生成单调递增的时间戳（毫秒，不小于物理时间），并携带本节点标识 origin，
+    合并其他节点的数据时以 (ts, origin) 比较新旧（后写者胜）；观察到更大的时间戳时时钟随之前移，
+    使之后的本地修改总是晚于已合并的修改。
+    """
+
+    def __init__(self, origin: str = ""):
+        self.origin = origin
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def stamp(self) -> int:
+        """生成新的时间戳"""
+        with self._lock:
+            self._last = max(int(time_module.time() * 1000), self._last + 1)
+            return self._last
+
+    def observe(self, ts: int) -> None:
+        """观察到其他节点的时间戳"""
+        with self._lock:
+            if ts > self._last:
+                self._last = ts
+
+
+CLOCK = LogicalClock()
+
+
+# 各主键字段对应的允许键集合，由所有同类记录共享
+_ALLOWED_KEYS: dict[str, frozenset[str]] = {}
+
+
 class BaseDataModel(MutableMapping):
     """基础数据模型，提供通用的数据管理功能"""
 
     __slots__ = ("_data", "_allowed_keys", "_id_field")
 
     def __init__(
-        self, id_field: str, id_value: str, time: int, reason: str | None = None
+        self,
+        id_field: str,
+        id_value: str,
+        time: int,
+        reason: str | None = None,
+        ts: int | None = None,
+        origin: str | None = None,
     ):
+        if ts is None:
+            # 新建的记录以当前逻辑时间为版本
+            ts, origin = CLOCK.stamp(), CLOCK.origin
+        elif ts == 0:
+            # 旧版数据中不带版本的记录保持无版本（合并时视为最旧），不写入文件，直到下次修改
+            ts, origin = None, None
         object.__setattr__(
             self,
             "_data",
-            {id_field: id_value, "time": time, "reason": noreason_to_none(reason)},
-        )
-        object.__setattr__(
-            self, "_allowed_keys", frozenset((id_field, "time", "reason"))
+            {
+                id_field: intern_id(id_value),
+                "time": time,
+                "reason": REASON_TABLE.intern(noreason_to_none(reason)),
+                "ts": ts,
+                "origin": intern_id(origin) if origin else None,
+            },
         )
+        allowed_keys = _ALLOWED_KEYS.get(id_field)
+        if allowed_keys is None:
+            allowed_keys = _ALLOWED_KEYS.setdefault(
+                id_field, frozenset((id_field, "time", "reason", "ts", "origin"))
+            )
+        object.__setattr__(self, "_allowed_keys", allowed_keys)
         object.__setattr__(self, "_id_field", id_field)
         # object.__setattr__(self, "_lock", threading.RLock())
 
@@ -101,6 +338,10 @@ class BaseDataModel(MutableMapping):
             raise TypeError(f"time must be int, got {type(value).__name__}")
         if key == "reason" and value is not None and not isinstance(value, str):
             value = noreason_to_none(str(value))
+        if key == "reason":
+            value = REASON_TABLE.intern(value)
+        if key == "ts" and not isinstance(value, int):
+            raise TypeError(f"ts must be int, got {type(value).__name__}")
         object.__getattribute__(self, "_data")[key] = value
 
     def __delitem__(self, key):
@@ -139,6 +380,8 @@ class BaseDataModel(MutableMapping):
             id_value=self._get_id_field_value(),
             time=self.time,
             reason=self.reason,
+            ts=self.ts or 0,
+            origin=self.origin,
         )
 
     def __deepcopy__(self, memo):
@@ -161,6 +404,24 @@ class BaseDataModel(MutableMapping):
                 raise TimeNegativeError("Time must be non-negative")
             self.time = time
         self.reason = noreason_to_none(reason)
+        self.ts, self.origin = CLOCK.stamp(), CLOCK.origin
+
+    def assign_version(
+        self, time: int, reason: str | None, ts: int, origin: str | None
+    ) -> None:
+        """
+        以指定版本覆盖数据（用于合并其他节点的记录，不生成新的时间戳）
+        """
+        if time < 0:
+            raise TimeNegativeError("Time must be non-negative")
+        self.time = time
+        self.reason = noreason_to_none(reason)
+        self.ts = ts
+        self.origin = origin
+
+    def version(self) -> tuple[int, str]:
+        """获取用于后写者胜比较的版本 (ts, origin)，无版本的记录为 (0, "")"""
+        return (self.ts or 0, self.origin or "")
 
     def add_time(self, time: int, reason: str | None = None):
         """
@@ -204,7 +465,7 @@ class BaseModelList(list):
         此类虽继承 list 类，但并未重写所有增删改方法，使用此类未重写的方法可能会导致一些问题
         请注意不要使用此类未重写的 list 方法
         若您需要用到未重写的方法，请：
-            1. 自行维护 _ids 变量
+            1. 自行维护 _index 变量（ID -> 记录）
             2. 新建Issue
             3. 新建Pull Request
         当前可用的已重写方法：
@@ -218,9 +479,9 @@ class BaseModelList(list):
     def __init__(self, model_class: type[BaseDataModel], iterable: list | None = None):
         super().__init__()
         self.model_class = model_class
-        self._ids: set[str] = set()
+        # ID -> 记录 索引，使按 ID 查找为 O(1)
+        self._index: dict[str, BaseDataModel] = {}
         self._lock = threading.RLock()
-        MODEL_LIST_REGISTRY.register(self)
         if iterable:
             self.extend(iterable)
 
@@ -247,8 +508,8 @@ class BaseModelList(list):
             rm_item = self.find_by_id(value._get_id_field_value(), no_copy=True)
             if rm_item == self[key]:
                 rm_item = None
-            self._ids.remove(self[key]._get_id_field_value())
-            self._ids.add(value._get_id_field_value())
+            del self._index[self[key]._get_id_field_value()]
+            self._index[value._get_id_field_value()] = value
             super().__setitem__(key, value)
             if rm_item in self:
                 super().remove(rm_item)
@@ -256,7 +517,7 @@ class BaseModelList(list):
     def __delitem__(self, key):
         with self._lock:
             key = self._resolve_key(key)
-            self._ids.remove(self[key]._get_id_field_value())
+            del self._index[self[key]._get_id_field_value()]
             super().__delitem__(key)
 
     def __getitem__(self, key):
@@ -275,7 +536,7 @@ class BaseModelList(list):
     def remove(self, value):
         with self._lock:
             super().remove(value)
-            self._ids.remove(value._get_id_field_value())
+            del self._index[value._get_id_field_value()]
 
     def append(self, value):
         with self._lock:
@@ -284,9 +545,9 @@ class BaseModelList(list):
                     f"{self.__class__.__name__} can only hold instances of {self.model_class.__name__}, but {type(value)} was passed in."
                 )
 
-            if value._get_id_field_value() in self._ids:
+            if value._get_id_field_value() in self._index:
                 self.remove_by_id(value._get_id_field_value())
-            self._ids.add(value._get_id_field_value())
+            self._index[value._get_id_field_value()] = value
             super().append(value)
 
     def extend(self, iterable):
@@ -296,20 +557,19 @@ class BaseModelList(list):
 
     def find_by_id(self, id_value: str, no_copy: bool = False) -> BaseDataModel | None:
         """根据ID查找数据"""
-        with self._lock:
-            for item in self:
-                if item._get_id_field_value() == id_value:
-                    return item if no_copy else copy.copy(item)
+        item = self._index.get(id_value)
+        if item is None:
             return None
+        return item if no_copy else copy.copy(item)
 
     def remove_by_id(self, id_value: str) -> bool:
         """根据ID移除数据"""
         with self._lock:
-            for idx, item in enumerate(self):
-                if item._get_id_field_value() == id_value:
-                    del self[idx]
-                    return True
-            return False
+            item = self._index.get(id_value)
+            if item is None:
+                return False
+            self.remove(item)
+            return True
 
     def update_data(
         self, id_value: str, time: int | None = None, reason: str | None = None
@@ -352,14 +612,30 @@ class BaseModelList(list):
 class UserDataModel(BaseDataModel):
     """用户数据模型，继承自 BaseDataModel，使用 uid 作为主键"""
 
-    def __init__(self, uid: str, time: int, reason: str | None = None):
-        super().__init__(id_field="uid", id_value=uid, time=time, reason=reason)
+    def __init__(
+        self,
+        uid: str,
+        time: int,
+        reason: str | None = None,
+        ts: int | None = None,
+        origin: str | None = None,
+    ):
+        super().__init__(
+            id_field="uid",
+            id_value=uid,
+            time=time,
+            reason=reason,
+            ts=ts,
+            origin=origin,
+        )
 
     def __copy__(self):
         return self.__class__(
             uid=self._get_id_field_value(),
             time=self.time,
             reason=self.reason,
+            ts=self.ts or 0,
+            origin=self.origin,
         )
 
 
@@ -379,14 +655,30 @@ class UserDataList(BaseModelList):
 class UmoDataModel(BaseDataModel):
     """用户数据模型，继承自 BaseDataModel，使用 umo 作为主键"""
 
-    def __init__(self, umo: str, time: int, reason: str | None = None):
-        super().__init__(id_field="umo", id_value=umo, time=time, reason=reason)
+    def __init__(
+        self,
+        umo: str,
+        time: int,
+        reason: str | None = None,
+        ts: int | None = None,
+        origin: str | None = None,
+    ):
+        super().__init__(
+            id_field="umo",
+            id_value=umo,
+            time=time,
+            reason=reason,
+            ts=ts,
+            origin=origin,
+        )
 
     def __copy__(self):
         return self.__class__(
             umo=self._get_id_field_value(),
             time=self.time,
             reason=self.reason,
+            ts=self.ts or 0,
+            origin=self.origin,
         )
 
 
@@ -401,3 +693,37 @@ class UmoDataList(BaseModelList):
 
     def __deepcopy__(self, memo):
         return self.__class__(iterable=[copy.copy(m) for m in self])
+
+
+class EmptyModelList(BaseModelList):
+    """
+    只读空列表，用作字典查找的共享默认值（如 ban_data.get(umo, EMPTY_USER_LIST)），
+    避免每次查找都构造新的列表与锁
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} is read-only")
+
+    # 所有修改列表的方法（含 += 与 *= 等未被 BaseModelList 重写的 list 方法）均不可用
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __iadd__ = _read_only
+    __imul__ = _read_only
+    append = _read_only
+    extend = _read_only
+    insert = _read_only
+    remove = _read_only
+    pop = _read_only
+    clear = _read_only
+    sort = _read_only
+    reverse = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+EMPTY_USER_LIST = EmptyModelList(UserDataModel)
+EMPTY_UMO_LIST = EmptyModelList(UmoDataModel)
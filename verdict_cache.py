@@ -0,0 +1,98 @@
+"""
+Verdict cache for ReNeBan plugin
+Bounded LRU of per-(umo, uid) ban verdicts invalidated by data generation and record expiry
+"""
+
+import threading
+from collections import OrderedDict
+
+from .datafile_manager import DatafileManager
+from .metrics import METRICS
+
+_VERDICT_CACHE_HITS = METRICS.counter(
+    "reneban_verdict_cache_hits_total", "判定缓存命中次数"
+)
+_VERDICT_CACHE_MISSES = METRICS.counter(
+    "reneban_verdict_cache_misses_total", "判定缓存未命中次数"
+)
+
+# 判定结果：(是否被禁用, 理由)
+Verdict = tuple[bool, str | None]
+
+
+class VerdictCache:
+    """
+    判定缓存
+
+    以 (UMO, UID) 为键缓存判定结果及其截止时间（决定该结果的记录的到期时间戳，
+    永久记录或未命中任何记录时为无穷大）。数据代数变化时整表失效，
+    当前时间超过截止时间时单条失效，因此临时禁用仍会在到期的那一秒解除。
+    表的容量为 max_entries，超出时淘汰最久未查询的条目。
+    """
+
+    def __init__(self, data_manager: DatafileManager, max_entries: int = 10000):
+        """
+        初始化判定缓存
+
+        Args:
+            data_manager: 数据文件管理器
+            max_entries: 最大条目数，小于等于 0 时关闭
+        """
+        self.data_manager = data_manager
+        self.max_entries = max_entries
+        self._generation: int = -1
+        self._verdicts: OrderedDict[tuple[str, str], tuple[Verdict, float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._verdicts)
+
+    def get(self, umo: str, uid: str, now: float) -> Verdict | None:
+        """
+        获取缓存的判定结果（数据已变更或已过截止时间时返回 None）
+        """
+        key = (umo, uid)
+        with self._lock:
+            if self._generation != self.data_manager.generation:
+                self._verdicts.clear()
+                self._generation = self.data_manager.generation
+                _VERDICT_CACHE_MISSES.inc()
+                return None
+            entry = self._verdicts.get(key)
+            if entry is None or now > entry[1]:
+                _VERDICT_CACHE_MISSES.inc()
+                return None
+            self._verdicts.move_to_end(key)
+        _VERDICT_CACHE_HITS.inc()
+        return entry[0]
+
+    def put(
+        self, umo: str, uid: str, generation: int, verdict: Verdict, deadline: float
+    ) -> None:
+        """
+        缓存判定结果
+
+        Args:
+            generation: 计算判定结果前读取的数据代数（与当前代数不一致时不缓存）
+            verdict: 判定结果
+            deadline: 判定结果的截止时间戳
+        """
+        key = (umo, uid)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._verdicts[key] = (verdict, deadline)
+            self._verdicts.move_to_end(key)
+            if len(self._verdicts) > self.max_entries:
+                self._verdicts.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._verdicts.clear()
+            self._generation = -1